@@ -2,11 +2,13 @@ import asyncio
 import json
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 import tcod
 import tcod.event
 
 from tec.client.keymap import map_key_to_action
+from tec.server.protocol import FRAME_HEADER, PROTO_BIN1, apply_runs, decode_frame
 from tec.settings import SETTINGS
 from tec.shared.actions import Action, ActLogin, ActMove
 
@@ -29,6 +31,11 @@ class ViewModel:
     tiles: list[str] = field(default_factory=list)  # masked visible only
     base: list[str] = field(default_factory=list)  # unmasked true glyphs
     mem: list[str] = field(default_factory=list)  # '0'/'1' explored mask
+    seq: int | None = None  # sequence number of the last VIEW/VIEW_DELTA applied
+    flat: dict[str, str] = field(default_factory=dict)  # row-major layers for delta patching
+    map_version: int | None = None  # version of the cached MAP base layer
+    map_w: int = 0
+    map_base: str = ""  # whole-map '.'/'#' layer from the last MAP message
     log: list[str] = field(default_factory=list)
     speed: float = 1.0
     energy: float = 0.0
@@ -41,6 +48,7 @@ class Client:
         self.reader: asyncio.StreamReader
         self.writer: asyncio.StreamWriter
         self.vm = ViewModel()
+        self.proto = SETTINGS.wire_protocol  # server→client encoding requested at LOGIN
         # Hold-to-move state
         self.hold_move: tuple[int, int] | None = None
         self.hold_since: float | None = None
@@ -48,40 +56,71 @@ class Client:
 
     async def connect(self, host: str, port: int, name: str) -> None:
         self.reader, self.writer = await asyncio.open_connection(host, port)
-        await self.send(ActLogin("LOGIN", name))
+        self.proto = SETTINGS.wire_protocol
+        await self.send(ActLogin("LOGIN", name, self.proto))
         asyncio.create_task(self.recv_loop())
 
     async def send(self, action: Action) -> None:
         self.writer.write((json.dumps(action.__dict__) + "\n").encode())
         await self.writer.drain()
 
+    async def _read_message(self) -> dict[str, Any] | None:
+        """Read one server message in the negotiated encoding; None on EOF."""
+        if self.proto == PROTO_BIN1:
+            try:
+                header = await self.reader.readexactly(FRAME_HEADER.size)
+                (length,) = FRAME_HEADER.unpack(header)
+                body = await self.reader.readexactly(length)
+            except asyncio.IncompleteReadError:
+                return None
+            return decode_frame(body)
+        line = await self.reader.readline()
+        if not line:
+            return None
+        msg: dict[str, Any] = json.loads(line.decode("utf-8"))
+        return msg
+
     async def recv_loop(self) -> None:
         while True:
-            line = await self.reader.readline()
-            if not line:
+            msg = await self._read_message()
+            if msg is None:
                 break
-            msg = json.loads(line.decode("utf-8"))
             mtype = msg.get("type")
             if mtype == "POS":
                 self.vm.x = int(msg["x"])
                 self.vm.y = int(msg["y"])
+            elif mtype == "MAP":
+                self.vm.map_version = int(msg["version"])
+                self.vm.map_w = int(msg["w"])
+                self.vm.map_base = msg["base"]
             elif mtype == "VIEW":
                 self.vm.vx0 = int(msg["x"])
                 self.vm.vy0 = int(msg["y"])
                 self.vm.w = int(msg["w"])
                 self.vm.h = int(msg["h"])
-                tiles_str = msg["tiles"]
-                base_str = msg.get("base", "")
-                mem_str = msg.get("mem", "")
-                self.vm.tiles = [
-                    tiles_str[i : i + self.vm.w] for i in range(0, len(tiles_str), self.vm.w)
-                ]
-                self.vm.base = [
-                    base_str[i : i + self.vm.w] for i in range(0, len(base_str), self.vm.w)
-                ]
-                self.vm.mem = [
-                    mem_str[i : i + self.vm.w] for i in range(0, len(mem_str), self.vm.w)
-                ]
+                self.vm.seq = int(msg["seq"]) if "seq" in msg else None
+                if "base" in msg:
+                    base_str = msg["base"]
+                elif msg.get("base_version") == self.vm.map_version:
+                    base_str = self._base_from_map()
+                else:
+                    base_str = ""
+                self.vm.flat = {
+                    "tiles": msg["tiles"],
+                    "base": base_str,
+                    "mem": msg.get("mem", ""),
+                }
+                self._split_rows()
+            elif mtype == "VIEW_DELTA":
+                # Deltas only apply on top of the exact frame they were built
+                # against; otherwise wait for the next keyframe.
+                if self.vm.seq is None or int(msg["ref"]) != self.vm.seq:
+                    continue
+                for key in ("tiles", "base", "mem"):
+                    if key in msg:
+                        self.vm.flat[key] = apply_runs(self.vm.flat.get(key, ""), msg[key])
+                self.vm.seq = int(msg["seq"])
+                self._split_rows()
             elif mtype == "LOG":
                 self.vm.log.append(str(msg["text"]))
                 self.vm.log = self.vm.log[-LOG_H:]
@@ -91,6 +130,22 @@ class Client:
                 self.vm.aps = float(msg["aps"])
                 self.vm.eta = float(msg["eta"])
 
+    def _base_from_map(self) -> str:
+        """Slice the current VIEW window out of the cached MAP base layer."""
+        mw = self.vm.map_w
+        rows: list[str] = []
+        for r in range(self.vm.h):
+            start = (self.vm.vy0 + r) * mw + self.vm.vx0
+            rows.append(self.vm.map_base[start : start + self.vm.w].ljust(self.vm.w, "#"))
+        return "".join(rows)
+
+    def _split_rows(self) -> None:
+        """Refresh the row lists used by `draw` from the flat VIEW layers."""
+        w = max(1, self.vm.w)
+        for key in ("tiles", "base", "mem"):
+            text = self.vm.flat.get(key, "")
+            setattr(self.vm, key, [text[i : i + w] for i in range(0, len(text), w)])
+
     # ---------- Drawing helpers ----------
     @staticmethod
     def _draw_hline(console: tcod.console.Console, x: int, y: int, w: int, ch: str = "-") -> None:
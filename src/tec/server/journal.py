@@ -0,0 +1,208 @@
+"""Append-only binary journal of simulation inputs.
+
+Every input that changes the simulation from outside (player moves and
+waits, spawns, despawns, map edits) is recorded with the tick it takes
+effect on, so `tec.server.replay` can re-run a session from a world file
+without sockets.
+
+File layout (little-endian)::
+
+    header  b"TECJ"  u32 format version
+    batch   i64 tick  u32 record count, then `count` records of
+            u8 kind  i64 eid  i32 a  i32 b
+
+A batch holds inputs that take effect on `tick`, i.e. that arrived after
+tick `tick - 1` ran (`a`/`b` are dx/dy for moves and x/y for map edits,
+where `eid` carries the new floor flag). A batch with no records marks
+that ticks up to `tick` have run, so replay also reproduces the ticks in
+which nothing happened.
+
+Records are buffered in memory and appended with one `write` per
+`flush()`, normally once per tick batch. A batch cut short by a crash is
+ignored on read and dropped when the file is reopened for writing.
+
+Once a checkpoint of tick `T` is safely on disk, `discard_through(T)`
+rewrites the journal without the batches it covers, so the file only ever
+holds the inputs since the last checkpoint.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+MAGIC = b"TECJ"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sI")
+_BATCH = struct.Struct("<qI")
+_RECORD = struct.Struct("<Bqii")
+
+MOVE = 1
+WAIT = 2
+SPAWN = 3
+DESPAWN = 4
+SET_TILE = 5
+
+Record = tuple[int, int, int, int]  # (kind, eid, a, b)
+
+
+class ActionJournal:
+    """Buffered writer appending input batches to a journal file.
+
+    Attributes:
+        path: Journal file.
+        fsync: Whether `flush()` also forces the data to disk.
+        batches: Batches written by this writer.
+        records: Records written by this writer.
+    """
+
+    def __init__(self, path: str | Path, fsync: bool = False) -> None:
+        """Open `path` for appending, writing the header to a new file.
+
+        Raises:
+            ValueError: If `path` exists but is not a journal of this format.
+        """
+        self.path = Path(path)
+        self.fsync = fsync
+        self.batches = 0
+        self.records = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO = open(self.path, "a+b")  # closed by close()
+        self._file.seek(0)
+        head = self._file.read(_HEADER.size)
+        if not head:
+            self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+            self._file.flush()
+        elif head != _HEADER.pack(MAGIC, FORMAT_VERSION):
+            self._file.close()
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} journal")
+        else:
+            # drop a batch cut short by a crash so new batches stay readable
+            self._file.seek(0)
+            self._file.truncate(_valid_length(self._file.read()))
+        self._tick: int | None = None
+        self._batch = bytearray()
+        self._count = 0
+        self._pending = bytearray()
+        self._marked: int | None = None
+
+    def record(self, tick: int, kind: int, eid: int, a: int = 0, b: int = 0) -> None:
+        """Buffer one input taking effect on `tick` (ticks must not decrease).
+
+        Raises:
+            struct.error: If a field does not fit its record slot; nothing is buffered.
+        """
+        packed = _RECORD.pack(kind, eid, a, b)
+        if tick != self._tick:
+            self._close_batch()
+            self._tick = tick
+        self._batch += packed
+        self._count += 1
+
+    def flush(self, tick: int | None = None) -> int:
+        """Append all buffered batches; return the number of bytes written.
+
+        Args:
+            tick: If given, also mark that ticks up to `tick` have run.
+        """
+        self._close_batch()
+        if tick is not None and tick != self._marked:
+            self._pending += _BATCH.pack(tick, 0)
+            self._marked = tick
+        if not self._pending:
+            return 0
+        self._file.write(self._pending)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        written = len(self._pending)
+        self._pending.clear()
+        return written
+
+    def reset(self) -> None:
+        """Drop everything journaled so far, e.g. right after saving the world."""
+        self._close_batch()
+        self._pending.clear()
+        self._file.truncate(_HEADER.size)
+        self._file.flush()
+
+    def discard_through(self, tick: int) -> int:
+        """Drop written batches for ticks up to `tick`, e.g. once a checkpoint of it is saved.
+
+        The remaining batches go to a new file that atomically replaces the
+        journal, so a crash meanwhile leaves one of the two, and either
+        replays correctly over that checkpoint. Buffered records are kept.
+
+        Returns:
+            Number of bytes dropped.
+        """
+        self._file.seek(0)
+        data = self._file.read()
+        kept = b"".join(
+            data[start - _BATCH.size : end] for t, start, end in _batches(data) if t > tick
+        )
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, FORMAT_VERSION) + kept)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._file.close()
+        self._file = open(self.path, "a+b")  # closed by close()
+        return len(data) - _HEADER.size - len(kept)
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def _close_batch(self) -> None:
+        if not self._count or self._tick is None:
+            return
+        self._pending += _BATCH.pack(self._tick, self._count)
+        self._pending += self._batch
+        self.batches += 1
+        self.records += self._count
+        self._batch.clear()
+        self._count = 0
+
+
+def read_batches(path: str | Path) -> Iterator[tuple[int, list[Record]]]:
+    """Yield `(tick, records)` per batch, stopping at a truncated tail.
+
+    Raises:
+        ValueError: If `path` is not a journal of this format.
+    """
+    data = Path(path).read_bytes()
+    if data[: _HEADER.size] != _HEADER.pack(MAGIC, FORMAT_VERSION):
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} journal")
+    for tick, start, end in _batches(data):
+        yield tick, list(_RECORD.iter_unpack(data[start:end]))
+
+
+def _batches(data: bytes) -> Iterator[tuple[int, int, int]]:
+    """Yield `(tick, records start, records end)` for each complete batch."""
+    pos = _HEADER.size
+    while pos + _BATCH.size <= len(data):
+        tick, count = _BATCH.unpack_from(data, pos)
+        start = pos + _BATCH.size
+        pos = start + count * _RECORD.size
+        if pos > len(data):
+            return
+        yield tick, start, pos
+
+
+def _valid_length(data: bytes) -> int:
+    """Return the length of `data` up to the end of its last complete batch."""
+    return max((end for _, _, end in _batches(data)), default=_HEADER.size)
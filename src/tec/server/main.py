@@ -1,26 +1,106 @@
 import asyncio
+import os
 from contextlib import suppress
+from functools import partial
 
+from tec.server import persist
+from tec.server.journal import ActionJournal
 from tec.server.net import JsonServer
+from tec.server.persist import Checkpointer
+from tec.server.replay import replay
+from tec.server.runner import SimThread
+from tec.server.scheduler import FixedStepLoop
 from tec.server.sim import Simulation
+from tec.settings import SETTINGS
 
 
-async def sim_loop(sim: Simulation) -> None:
+async def sim_loop(
+    sim: Simulation, server: JsonServer | None = None, checkpointer: Checkpointer | None = None
+) -> None:
+    def after() -> None:
+        _persist_step(sim, checkpointer)
+        if server is not None:
+            server.broadcast()
+
+    loop = FixedStepLoop(
+        sim.tick_len,
+        sim.tick,
+        after,
+        max_catchup=SETTINGS.tick_max_catchup,
+        stats=sim.tick_stats,
+    )
     try:
-        while True:
-            sim.tick()
-            await asyncio.sleep(sim.tick_len)
+        await loop.run()
     except asyncio.CancelledError:
         # graceful exit on shutdown
         return
 
 
+def _open_world() -> tuple[Simulation, Checkpointer | None]:
+    """Restore the world file if configured and present; otherwise start fresh."""
+    path = SETTINGS.world_file
+    if path is None:
+        return Simulation(), None
+    sim = persist.load(path) if os.path.exists(path) else Simulation()
+    every = round(SETTINGS.checkpoint_every_s / sim.tick_len)
+    return sim, Checkpointer(sim, path, every)
+
+
+def _open_journal(sim: Simulation) -> None:
+    """Replay inputs journaled since the world file was saved, then keep journaling."""
+    path = SETTINGS.journal_file
+    if path is None:
+        return
+    if os.path.exists(path):
+        replay(sim, path)  # recover from a crash between checkpoints
+    sim.journal = ActionJournal(path)
+
+
+def _persist_step(sim: Simulation, checkpointer: Checkpointer | None) -> None:
+    """After a tick batch: append the journaled inputs, then checkpoint if due."""
+    if sim.journal is not None:
+        sim.journal.flush(sim.ticks)
+    if checkpointer is not None:
+        checkpointer.poll()
+
+
+def _final_save(sim: Simulation, checkpointer: Checkpointer | None) -> None:
+    """Save the world on a clean shutdown; the journal then has nothing left to replay."""
+    if checkpointer is not None:
+        persist.save(sim, checkpointer.path)
+    if sim.journal is not None:
+        sim.journal.reset()
+        sim.journal.close()
+
+
 async def main() -> None:
-    sim = Simulation()
+    sim, checkpointer = _open_world()
+    _open_journal(sim)
+
+    if SETTINGS.sim_thread:
+        # tick on a dedicated thread; the event loop only serves sockets
+        runner = SimThread(
+            sim,
+            asyncio.get_running_loop(),
+            after_batch=partial(_persist_step, sim, checkpointer),
+        )
+        server = JsonServer(sim, runner)
+        runner.on_publish = server.broadcast
+        runner.start()
+        with suppress(asyncio.CancelledError):
+            await server.start()
+        if runner.stop():
+            _final_save(sim, checkpointer)
+        elif checkpointer is not None:
+            # the sim thread is still mid-tick: save its last published tick, and keep
+            # the journal (still owned by that thread) for the inputs that came after
+            persist.save(persist.from_snapshot(runner.snapshot, sim.tick_len), checkpointer.path)
+        return
+
     server = JsonServer(sim)
 
     # start the simulation ticking
-    tick_task = asyncio.create_task(sim_loop(sim))
+    tick_task = asyncio.create_task(sim_loop(sim, server, checkpointer))
 
     # start the TCP server (serve_forever inside)
     # this call will block until cancelled (Ctrl-C)
@@ -31,6 +111,11 @@ async def main() -> None:
     tick_task.cancel()
     with suppress(asyncio.CancelledError):
         await tick_task
+    if checkpointer is not None:
+        # final checkpoint, after any background write has landed
+        await checkpointer.flush()
+    _final_save(sim, checkpointer)
+    sim.close()
 
 
 if __name__ == "__main__":
@@ -1,59 +1,172 @@
 import asyncio
 import json
-import math
+from contextlib import suppress
+from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
-from tec.server.protocol import derive_stats, ev_pos, ev_stats, ev_view, ev_welcome
+from tec.server.outbox import Outbox
+from tec.server.protocol import (
+    JsonCodec,
+    ViewFrame,
+    build_view,
+    can_delta,
+    codec_for,
+    derive_stats,
+    ev_map,
+    ev_view_delta,
+    ev_welcome,
+)
+from tec.server.runner import SimThread
 from tec.server.sim import Simulation
+from tec.server.snapshot import WorldView
 from tec.settings import SETTINGS
-from tec.shared.actions import MOVE_COST
-from tec.shared.components import Actor, Position
-from tec.shared.fov import shadowcast
+from tec.shared.actions import MOVE_COST, is_step
+from tec.shared.chunks import ChunkedMap
+
+_JSON_CODEC = JsonCodec()
+
+
+@dataclass
+class ViewCache:
+    """Last view frame sent to one session, used to build VIEW_DELTA messages.
+
+    Attributes:
+        frame: Last frame sent (full or patched), or None before the first VIEW.
+        seq: Sequence number of `frame`.
+        since_key: Frames sent since the last full VIEW keyframe.
+        pos: Last POS sent, so idle pumps can skip it.
+        map_version: Map version the client holds from its last MAP message.
+    """
+
+    frame: ViewFrame | None = None
+    seq: int = 0
+    since_key: int = 0
+    pos: tuple[int, int] | None = None
+    map_version: int | None = None
 
 
 class JsonServer:
-    def __init__(self, sim: Simulation) -> None:
+    def __init__(self, sim: Simulation, runner: SimThread | None = None) -> None:
         self.sim = sim
+        self.runner = runner  # set when the sim ticks on its own thread
         self.sessions: dict[asyncio.StreamWriter, int] = {}
-        self.explored: dict[int, set[tuple[int, int]]] = {}  # per-entity explored cells
+        self.views: dict[int, ViewCache] = {}  # per-entity last-sent frame
+        self.codecs: dict[int, JsonCodec] = {}  # per-entity wire encoding (LOGIN "proto")
+        self.stats_due: set[int] = set()  # entities whose input since the last broadcast owes STATS
+        self.outboxes: dict[int, Outbox] = {}  # per-entity send queue (see tec.server.outbox)
 
     # ---------- helpers ----------
 
-    def _ambient_factor(self) -> float:
-        """Return ambient light factor in [0,1] based on time of day."""
-        if SETTINGS.day_seconds <= 0:
-            return 1.0
-        phase = (self.sim.time_s % SETTINGS.day_seconds) / SETTINGS.day_seconds  # 0..1
-        # Day peaks at factor=1.0 mid-day, night dips to ~0.2 (tweakable)
-        return 0.6 + 0.4 * math.sin(2 * math.pi * (phase - 0.25))  # shift so noon at sin=+1
-
-    def _effective_radius(self, eid: int) -> int:
-        amb = self._ambient_factor()
-        base = round(SETTINGS.fov_night + (SETTINGS.fov_day - SETTINGS.fov_night) * amb)
-        # TODO: add carried light sources, e.g., torch_bonus
-        torch_bonus = 0
-        return max(1, base + torch_bonus)
-
-    def _compute_visible(self, px: int, py: int, radius: int) -> set[tuple[int, int]]:
-        tiles = self.sim.tiles
+    @property
+    def source(self) -> WorldView:
+        """World state to read: the live sim, or the runner's latest snapshot."""
+        return self.runner.snapshot if self.runner is not None else self.sim
 
-        def is_opaque(x: int, y: int) -> bool:
-            if y < 0 or y >= len(tiles) or x < 0 or x >= len(tiles[0]):
-                return True
-            return not tiles[y][x]
-
-        return shadowcast(px, py, radius, is_opaque)
+    def fov_stats(self) -> dict[str, float]:
+        """Return FOV cache counters (hits, misses, size, hit_ratio) for monitoring."""
+        return self.sim.fov_cache.stats()
 
     def _view_origin(self, px: int, py: int) -> tuple[int, int]:
         w, h = SETTINGS.view_w, SETTINGS.view_h
-        map_h = len(self.sim.tiles)
-        map_w = len(self.sim.tiles[0]) if map_h else 0
+        map_w, map_h = self.source.tiles.width, self.source.tiles.height
         vx0 = px - w // 2
         vy0 = py - h // 2
         vx0 = max(0, min(vx0, max(0, map_w - w)))
         vy0 = max(0, min(vy0, max(0, map_h - h)))
         return vx0, vy0
 
+    def _view_size(self) -> tuple[int, int]:
+        """Return the viewport size, shrunk to the map on tiny worlds."""
+        tiles = self.source.tiles
+        return min(SETTINGS.view_w, tiles.width), min(SETTINGS.view_h, tiles.height)
+
+    def _build_frame(self, eid: int) -> ViewFrame:
+        """Return `eid`'s cropped view frame."""
+        src = self.source
+        vis = src.visible_for(eid)
+        vx0, vy0 = self._view_origin(*src.position(eid))
+        vw, vh = self._view_size()
+        return build_view(vx0, vy0, src.tiles, vis, src.explored_for(eid), vw, vh)
+
+    def _view_update(self, eid: int, keyframe: bool = False) -> list[bytes]:
+        """Return the cheapest events bringing `eid`'s client up to date.
+
+        A MAP goes out first whenever the client lacks the current map
+        version; VIEW then omits `base`. A `ChunkedMap` world is never sent
+        whole: there is no MAP, and VIEW carries its own window's `base`
+        (VIEW_DELTA patches it like the other layers).
+
+        The view itself is a full VIEW keyframe when requested, when there
+        is no previous frame, when the window moved, or after
+        `SETTINGS.view_keyframe_every` deltas; otherwise a VIEW_DELTA
+        against the last frame sent, or nothing if the frame is unchanged.
+        TCP delivers in order, so the last frame sent is the one the client
+        holds.
+        """
+        cache = self.views.setdefault(eid, ViewCache())
+        codec = self._codec(eid)
+        tiles = self.source.tiles
+        frame = self._build_frame(eid)
+        events: list[bytes] = []
+        base_version: int | None = None
+        if not isinstance(tiles, ChunkedMap):
+            base_version = tiles.version
+            if cache.map_version != base_version:
+                events.append(codec.wrap(ev_map(tiles)))
+                cache.map_version = base_version
+                keyframe = True
+        prev = cache.frame
+        if (
+            keyframe
+            or prev is None
+            or not can_delta(prev, frame)
+            or cache.since_key >= SETTINGS.view_keyframe_every
+        ):
+            cache.seq += 1
+            cache.frame = frame
+            cache.since_key = 0
+            events.append(codec.view(frame, cache.seq, base_version))
+        elif frame != prev:
+            cache.seq += 1
+            cache.frame = frame
+            cache.since_key += 1
+            events.append(codec.wrap(ev_view_delta(prev, frame, cache.seq - 1, cache.seq)))
+        return events
+
+    def _pos_update(self, eid: int, force: bool = False) -> bytes | None:
+        """Return a POS event if the position changed since the last one sent."""
+        pos = self.source.position(eid)
+        cache = self.views.setdefault(eid, ViewCache())
+        if not force and cache.pos == pos:
+            return None
+        cache.pos = pos
+        return self._codec(eid).pos(*pos)
+
+    def _stats_event(self, eid: int) -> bytes:
+        stats = derive_stats(self.source.actor(eid), MOVE_COST)
+        return self._codec(eid).stats(stats["speed"], stats["energy"], stats["aps"], stats["eta"])
+
+    def _codec(self, eid: int) -> JsonCodec:
+        return self.codecs.get(eid, _JSON_CODEC)
+
+    async def _negotiate(self, reader: asyncio.StreamReader) -> tuple[str, dict[str, Any] | None]:
+        """Read the client's LOGIN and return (proto, first non-LOGIN message).
+
+        Clients send LOGIN right after connecting; its optional `proto` field
+        selects the wire encoding for everything the server sends. A client
+        that stays silent for `SETTINGS.login_timeout_s`, or opens with some
+        other message, gets JSON; that message is handed back for dispatch.
+        """
+        try:
+            line = await asyncio.wait_for(reader.readline(), SETTINGS.login_timeout_s)
+            msg: dict[str, Any] = json.loads(line.decode("utf-8"))
+        except (TimeoutError, ValueError):
+            return "json", None
+        if msg.get("type") == "LOGIN":
+            return str(msg.get("proto", "json")), None
+        return "json", msg
+
     # ---------- protocol ----------
 
     async def handle_client(
@@ -61,28 +174,14 @@ class JsonServer:
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
     ) -> None:
-        eid = self.sim.spawn_player()
-        self.sessions[writer] = eid
-        self.explored[eid] = set()
-        writer.write(ev_welcome("Welcome to TEC (prototype)."))
-        await writer.drain()
-
-        # initial snapshot
-        pos = self.sim.world.get(Position)[eid]
-        actor = self.sim.world.get(Actor)[eid]
-        radius = self._effective_radius(eid)
-        vis = self._compute_visible(pos.x, pos.y, radius)
-        self.explored[eid].update(vis)
-        vx0, vy0 = self._view_origin(pos.x, pos.y)
-        writer.write(ev_pos(pos.x, pos.y))
-        writer.write(ev_view(vx0, vy0, self.sim.tiles, vis, self.explored[eid]))
-        stats = derive_stats(actor, MOVE_COST)
-        writer.write(ev_stats(stats["speed"], stats["energy"], stats["aps"], stats["eta"]))
-        await writer.drain()
-
-        asyncio.create_task(self._snapshot_pump(writer, eid))
+        proto, pending = await self._negotiate(reader)
+        eid = await self.runner.spawn_player() if self.runner else self.sim.spawn_player()
+        outbox = self._attach(writer, eid, proto)
+        send_task = asyncio.create_task(outbox.run())
 
         try:
+            if pending is not None:
+                await self.dispatch(pending, writer, eid)
             while not reader.at_eof():
                 line = await reader.readline()
                 if not line:
@@ -94,25 +193,56 @@ class JsonServer:
                 await self.dispatch(msg, writer, eid)
         finally:
             self.sessions.pop(writer, None)
-            self.explored.pop(eid, None)
-            writer.close()
-            await writer.wait_closed()
+            self.views.pop(eid, None)
+            self.codecs.pop(eid, None)
+            self.outboxes.pop(eid, None)
+            self.stats_due.discard(eid)
+            (self.runner or self.sim).despawn(eid)
+            outbox.close()
+            send_task.cancel()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
 
-    async def _snapshot_pump(self, writer: asyncio.StreamWriter, eid: int) -> None:
-        """Keep client snapshots fresh even without input."""
-        try:
-            while writer in self.sessions:
-                pos = self.sim.world.get(Position)[eid]
-                radius = self._effective_radius(eid)
-                vis = self._compute_visible(pos.x, pos.y, radius)
-                self.explored[eid].update(vis)
-                vx0, vy0 = self._view_origin(pos.x, pos.y)
-                writer.write(ev_pos(pos.x, pos.y))
-                writer.write(ev_view(vx0, vy0, self.sim.tiles, vis, self.explored[eid]))
-                await writer.drain()
-                await asyncio.sleep(0.1)
-        except Exception:
-            pass
+    def _attach(self, writer: asyncio.StreamWriter, eid: int, proto: str) -> Outbox:
+        """Register a session for `eid` and queue its WELCOME and initial snapshot."""
+        self.sessions[writer] = eid
+        codec = self.codecs[eid] = codec_for(proto)
+        outbox = self.outboxes[eid] = Outbox(
+            writer,
+            partial(self._view_update, eid),
+            SETTINGS.send_queue_max,
+            SETTINGS.slow_consumer_policy,
+        )
+        outbox.send(codec.wrap(ev_welcome("Welcome to TEC (prototype).")))
+        pos = self._pos_update(eid, force=True)
+        if pos is not None:
+            outbox.send(pos, key="pos")
+        outbox.mark_view(keyframe=True)
+        outbox.send(self._stats_event(eid), key="stats")
+        return outbox
+
+    def session_stats(self) -> dict[int, dict[str, int]]:
+        """Return per-session send-queue metrics keyed by entity id."""
+        return {eid: outbox.stats() for eid, outbox in self.outboxes.items()}
+
+    def broadcast(self) -> None:
+        """Queue every session's update for the tick that just ran, in one pass.
+
+        Called once per tick right after `Simulation.tick`. POS only goes out
+        when it changed and STATS only to sessions that sent input since the
+        last broadcast; both replace any copy still queued. The view is only
+        flagged: each session's writer task renders it when its socket is
+        ready, so FOV and encoding happen at most once per tick per session,
+        and a slow client never holds up the tick or other clients.
+        """
+        for eid, outbox in list(self.outboxes.items()):
+            pos = self._pos_update(eid)
+            if pos is not None:
+                outbox.send(pos, key="pos")
+            outbox.mark_view()
+            if eid in self.stats_due:
+                outbox.send(self._stats_event(eid), key="stats")
+        self.stats_due.clear()
 
     async def dispatch(
         self,
@@ -124,25 +254,17 @@ class JsonServer:
         if mtype == "MOVE":
             dx = int(msg.get("dx", 0))
             dy = int(msg.get("dy", 0))
-            self.sim.enqueue_move(eid, dx, dy)
+            if is_step(dx, dy):  # anything else is a malformed or hostile client
+                (self.runner or self.sim).enqueue_move(eid, dx, dy)
         elif mtype == "WAIT":
-            self.sim.enqueue_wait(eid)
+            (self.runner or self.sim).enqueue_wait(eid)
         elif mtype == "LOGIN":
             pass
         else:
             pass
 
-        pos = self.sim.world.get(Position)[eid]
-        actor = self.sim.world.get(Actor)[eid]
-        radius = self._effective_radius(eid)
-        vis = self._compute_visible(pos.x, pos.y, radius)
-        self.explored[eid].update(vis)
-        vx0, vy0 = self._view_origin(pos.x, pos.y)
-        writer.write(ev_pos(pos.x, pos.y))
-        writer.write(ev_view(vx0, vy0, self.sim.tiles, vis, self.explored[eid]))
-        stats = derive_stats(actor, MOVE_COST)
-        writer.write(ev_stats(stats["speed"], stats["energy"], stats["aps"], stats["eta"]))
-        await writer.drain()
+        # The reply rides on the next broadcast, coalesced with any other input.
+        self.stats_due.add(eid)
 
     async def start(self) -> None:
         server = await asyncio.start_server(
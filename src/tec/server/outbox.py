@@ -0,0 +1,171 @@
+"""Per-session outbound queues with backpressure and latest-view coalescing.
+
+Each connected client gets an `Outbox` drained by its own writer task, so a
+slow socket only ever delays that client:
+
+- Ordered messages (WELCOME, LOG, ...) queue in order, up to a bound.
+- Keyed messages (POS, STATS) replace any queued message with the same key,
+  so state snapshots never pile up behind a slow reader.
+- The view is not queued at all. `mark_view` raises a flag; the writer task
+  renders the view only when the socket is ready, against the last frame
+  actually sent, so a lagging client skips intermediate frames instead of
+  buffering them.
+
+When the ordered backlog exceeds its bound, the policy decides: "drop"
+discards the new message, "disconnect" closes the connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable
+
+log = logging.getLogger(__name__)
+
+POLICY_DROP = "drop"
+POLICY_DISCONNECT = "disconnect"
+
+RenderView = Callable[[bool], list[bytes]]  # keyframe -> encoded view events
+
+
+class Outbox:
+    """Bounded send queue for one client, flushed by `run()`.
+
+    Attributes:
+        max_queue: Pending messages allowed before `policy` applies.
+        policy: `POLICY_DROP` or `POLICY_DISCONNECT`.
+        sent: Messages written to the socket.
+        dropped: Messages discarded by the drop policy.
+        coalesced: Messages (or view requests) merged into a newer one.
+        max_depth: Deepest the queue has been.
+        closed: True once the outbox stopped (disconnect policy, socket error
+            or a failed writer task).
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        render_view: RenderView,
+        max_queue: int = 64,
+        policy: str = POLICY_DROP,
+    ) -> None:
+        """Create an outbox for `writer`.
+
+        Args:
+            writer: Client stream to write to.
+            render_view: Called with `keyframe` when the socket is ready; returns
+                the view events to send (possibly none).
+            max_queue: Pending-message bound (>= 1).
+            policy: What to do on overflow: `POLICY_DROP` or `POLICY_DISCONNECT`.
+
+        Raises:
+            ValueError: If `policy` is unknown.
+        """
+        if policy not in (POLICY_DROP, POLICY_DISCONNECT):
+            raise ValueError(f"unknown slow-consumer policy {policy!r}")
+        self.writer = writer
+        self.render_view = render_view
+        self.max_queue = max(1, max_queue)
+        self.policy = policy
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.closed = False
+        self._queue: deque[tuple[str | None, bytes]] = deque()
+        self._view_due = False
+        self._keyframe_due = False
+        self._wake = asyncio.Event()
+
+    @property
+    def depth(self) -> int:
+        """Messages waiting to be written (a pending view counts as one)."""
+        return len(self._queue) + self._view_due
+
+    def send(self, data: bytes, key: str | None = None) -> None:
+        """Queue one encoded message; a `key` replaces the pending message with that key."""
+        if self.closed:
+            return
+        queue = self._queue
+        if key is not None:
+            for i, (k, _) in enumerate(queue):
+                if k == key:
+                    del queue[i]
+                    self.coalesced += 1
+                    break
+        if len(queue) >= self.max_queue:
+            if self.policy == POLICY_DISCONNECT:
+                self.close()
+                return
+            self.dropped += 1
+            return
+        queue.append((key, data))
+        self.max_depth = max(self.max_depth, self.depth)
+        self._wake.set()
+
+    def mark_view(self, keyframe: bool = False) -> None:
+        """Ask for the view to be rendered and sent at the next write opportunity."""
+        if self.closed:
+            return
+        if self._view_due:
+            self.coalesced += 1
+        self._view_due = True
+        self._keyframe_due |= keyframe
+        self.max_depth = max(self.max_depth, self.depth)
+        self._wake.set()
+
+    async def flush(self) -> None:
+        """Write everything pending (rendering the view now if due), then drain."""
+        batch = [data for _, data in self._queue]
+        self._queue.clear()
+        if self._view_due:
+            keyframe = self._keyframe_due
+            self._view_due = self._keyframe_due = False
+            batch.extend(self.render_view(keyframe))
+        if not batch:
+            return
+        for data in batch:
+            self.writer.write(data)
+        self.sent += len(batch)
+        await self.writer.drain()
+
+    async def run(self) -> None:
+        """Flush whenever something is pending, until closed or the socket fails.
+
+        However the loop ends (socket error, a failing `render_view`,
+        cancellation), the outbox is closed, so the session is torn down
+        instead of queueing for a writer that is gone.
+        """
+        try:
+            while not self.closed:
+                await self._wake.wait()
+                self._wake.clear()
+                await self.flush()
+        except (ConnectionError, RuntimeError):
+            pass  # the socket went away
+        except Exception:
+            log.exception("session writer failed; closing the connection")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop sending and close the connection (the client's reader then sees EOF)."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._view_due = False
+        self._wake.set()
+        self.writer.close()
+
+    def stats(self) -> dict[str, int]:
+        """Return per-session counters: depth, max_depth, sent, dropped, coalesced."""
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
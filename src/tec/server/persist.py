@@ -0,0 +1,395 @@
+"""Save and restore the simulation as one memory-mappable binary file.
+
+A world file is a small directory followed by raw, 8-byte aligned sections:
+
+    header     b"TECW"  u32 format version  u32 section count
+    directory  per section: 24-byte name, u64 offset, u64 length
+    sections   "meta"            JSON: clock, map size, component schemas, ...
+               "tiles"           `TileGrid.data` as-is, or for a `ChunkedMap`
+               "chunks/keys"     edited chunk coordinates (int64 cx, cy pairs)
+               "chunks/data"     those chunks' cells, `chunk * chunk` bytes each
+               "world/..."       entity generations and free list (int64)
+               "comp/<C>/<f>"    one typed array per numeric component field,
+                                 plus "comp/<C>/eid" (the same order)
+               "explored/..."    viewer ids, then each bitmap's rows packed
+                                 little-endian, `row_bytes` per row
+
+`load` maps the file, reads the directory and copies each section straight
+into its final buffer (`bytearray`, `array.frombytes`), so there is no
+per-cell parsing. A chunked world stores only its edited chunks; the rest
+regenerate from the seed. Non-numeric components (e.g. `PlayerTag`) are few and
+travel as JSON inside "meta", as do pending action queues.
+
+`Checkpointer` takes periodic checkpoints without stalling the tick loop:
+`capture` copies the state into bytes on the sim thread (memory copies,
+no I/O), and the file is written on a worker thread via `asyncio.to_thread`.
+Once it is on disk, the simulation's input journal drops the batches the
+checkpoint already contains (meta "ticks" is the checkpoint tick), so crash
+recovery only replays what came after it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections import deque
+from collections.abc import Mapping, MutableMapping
+from pathlib import Path
+from time import perf_counter
+from typing import Any, cast
+
+from tec.server.sim import Simulation
+from tec.server.snapshot import Snapshot
+from tec.settings import SETTINGS
+from tec.shared.bitmap import Bitmap
+from tec.shared.chunks import ChunkedMap, WorldMap
+from tec.shared.columns import ColumnTable, typecodes
+from tec.shared.components import Actor, Needs, PlayerTag, Position
+from tec.shared.grid import TileGrid
+from tec.shared.world import EID, World
+
+MAGIC = b"TECW"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_ENTRY = struct.Struct("<24sQQ")
+_ALIGN = 8
+
+# Component classes a world file may name, by class name.
+COMPONENTS: dict[str, type[Any]] = {c.__name__: c for c in (Position, Actor, Needs, PlayerTag)}
+
+Sections = dict[str, bytes]
+
+
+def capture(sim: Simulation) -> Sections:
+    """Copy everything `load` needs out of `sim` into immutable byte sections.
+
+    Call on the thread that ticks `sim`; the result can then be written from
+    any thread while the simulation keeps running.
+    """
+    world = sim.world
+    tiles = sim.tiles
+    sections: Sections = {}
+    chunked: dict[str, int] | None = None
+    if isinstance(tiles, ChunkedMap):
+        edited = tiles.edited_chunks()
+        sections["chunks/keys"] = array("q", [v for key in edited for v in key]).tobytes()
+        sections["chunks/data"] = b"".join(edited.values())
+        chunked = {"seed": tiles.seed, "chunk": tiles.chunk}
+    else:
+        sections["tiles"] = bytes(tiles.data)
+    sections["world/generations"] = array("q", world.generations).tobytes()
+    sections["world/free"] = array("q", world.free).tobytes()
+
+    schemas: list[dict[str, Any]] = []
+    objects: dict[str, list[tuple[EID, dict[str, Any]]]] = {}
+    for ctype, table in world.tables.items():
+        name = ctype.__name__
+        if COMPONENTS.get(name) is not ctype:
+            raise TypeError(f"component {name} is not registered in persist.COMPONENTS")
+        try:
+            codes = typecodes(ctype)
+        except TypeError:
+            objects[name] = [(eid, dataclasses.asdict(cast(Any, c))) for eid, c in table.items()]
+            continue
+        schemas.append({"name": name, "fields": list(codes.items()), "count": len(table)})
+        prefix = f"comp/{name}/"
+        if isinstance(table, ColumnTable):
+            sections[prefix + "eid"] = table.eids.tobytes()
+            for field, col in table.columns.items():
+                sections[prefix + field] = col.tobytes()
+            continue
+        sections[prefix + "eid"] = array("q", table.keys()).tobytes()
+        comps = list(table.values())
+        for field, code in codes.items():
+            sections[prefix + field] = array(code, [getattr(c, field) for c in comps]).tobytes()
+
+    row_bytes = (tiles.width + 7) // 8
+    explored = sim.explored
+    sections["explored/eid"] = array("q", explored.keys()).tobytes()
+    sections["explored/rows"] = b"".join(
+        row.to_bytes(row_bytes, "little") for bm in explored.values() for row in bm.rows
+    )
+
+    meta = {
+        "byteorder": sys.byteorder,
+        "ticks": sim.ticks,
+        "time_s": sim.time_s,
+        "tick_len": sim.tick_len,
+        "map": [tiles.width, tiles.height],
+        "chunked": chunked,
+        "next_id": world.next_id,
+        "components": schemas,
+        "objects": objects,
+        "row_bytes": row_bytes,
+        "queues": [[eid, list(q)] for eid, q in sim.action_queues.items()],
+    }
+    sections["meta"] = json.dumps(meta).encode()
+    return sections
+
+
+def write_sections(path: str | Path, sections: Mapping[str, bytes]) -> None:
+    """Write `sections` as a world file, atomically replacing `path`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    offset = _align(_HEADER.size + _ENTRY.size * len(sections))
+    entries: list[bytes] = []
+    layout: list[tuple[int, bytes]] = []
+    for name, data in sections.items():
+        if len(name.encode()) > 24:
+            raise ValueError(f"section name {name!r} longer than 24 bytes")
+        entries.append(_ENTRY.pack(name.encode(), offset, len(data)))
+        layout.append((offset, data))
+        offset = _align(offset + len(data))
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+            f.write(b"".join(entries))
+            for start, data in layout:
+                f.write(bytes(start - f.tell()))
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def save(sim: Simulation, path: str | Path) -> None:
+    """Write `sim` to `path` (`capture` + `write_sections`)."""
+    write_sections(path, capture(sim))
+
+
+def load(path: str | Path) -> Simulation:
+    """Rebuild a `Simulation` from a world file written by `save`.
+
+    Numeric components are restored straight into `ColumnTable`s when
+    `SETTINGS.columnar_components` is on. Derived state (opacity layer,
+    spatial index, FOV) is rebuilt. Pending action queues are restored in
+    their original order, so the restored simulation ticks identically.
+
+    Raises:
+        ValueError: If `path` is not a world file this version can read.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        directory = _directory(mm)
+
+        def section(name: str) -> bytes:
+            start, length = directory[name]
+            return mm[start : start + length]
+
+        meta = json.loads(section("meta"))
+        swap = meta["byteorder"] != sys.byteorder
+
+        def ints(name: str) -> array[int]:
+            return _array("q", section(name), swap)
+
+        width, height = meta["map"]
+        tiles: WorldMap
+        if meta.get("chunked") is not None:
+            size = meta["chunked"]["chunk"]
+            tiles = ChunkedMap(
+                width, height, meta["chunked"]["seed"], size, SETTINGS.max_resident_chunks
+            )
+            keys, cells = ints("chunks/keys"), section("chunks/data")
+            for i in range(len(keys) // 2):
+                span = size * size
+                tiles.restore_chunk(keys[2 * i], keys[2 * i + 1], cells[i * span : (i + 1) * span])
+        else:
+            tiles = TileGrid(width, height, bytearray(section("tiles")))
+        world = World(
+            next_id=meta["next_id"],
+            generations=ints("world/generations").tolist(),
+            free=deque(ints("world/free").tolist()),
+        )
+        for schema in meta["components"]:
+            ctype = _component(schema["name"])
+            fields = [(str(n), str(c)) for n, c in schema["fields"]]
+            if fields != list(typecodes(ctype).items()):
+                raise ValueError(f"{ctype.__name__} fields changed since the file was written")
+            prefix = f"comp/{ctype.__name__}/"
+            eids = ints(prefix + "eid")
+            cols = {n: _array(c, section(prefix + n), swap) for n, c in fields}
+            world.tables[ctype] = _table(ctype, eids, cols)
+        for name, rows in meta["objects"].items():
+            ctype = _component(name)
+            world.tables[ctype] = {int(eid): ctype(**kw) for eid, kw in rows}
+
+        row_bytes = meta["row_bytes"]
+        packed = section("explored/rows")
+        explored: dict[EID, Bitmap] = {}
+        for i, eid in enumerate(ints("explored/eid")):
+            base = i * height * row_bytes
+            rows = [
+                int.from_bytes(packed[base + y * row_bytes : base + (y + 1) * row_bytes], "little")
+                for y in range(height)
+            ]
+            explored[eid] = Bitmap(width, height, rows)
+
+    sim = Simulation(
+        world=world,
+        tiles=tiles,
+        tick_len=meta["tick_len"],
+        time_s=meta["time_s"],
+        ticks=meta["ticks"],
+    )
+    sim.explored.update(explored)
+    for eid, actions in meta["queues"]:
+        sim.action_queues[eid] = deque(
+            (kind, None if payload is None else (payload[0], payload[1]))
+            for kind, payload in actions
+        )
+    return sim
+
+
+def from_snapshot(snap: Snapshot, tick_len: float) -> Simulation:
+    """Rebuild a `Simulation` from a `Snapshot` published by `SimThread`.
+
+    Used to save a world whose sim thread cannot be stopped in time: the
+    snapshot is a consistent tick, the live `World` may be mid-update.
+    Entity ids, positions, actors, needs, map and explored cells carry
+    over; pending action queues and non-numeric components do not.
+    """
+    world = World(
+        next_id=len(snap.generations),
+        generations=list(snap.generations),
+        free=deque(snap.free),
+    )
+    for eid, (x, y) in snap.positions.items():
+        world.add(eid, Position(x, y))
+    for eid, act in snap.actors.items():
+        world.add(eid, dataclasses.replace(act))
+    for eid, needs in snap.needs.items():
+        world.add(eid, dataclasses.replace(needs))
+    sim = Simulation(
+        world=world,
+        tiles=snap.tiles.copy(),
+        tick_len=tick_len,
+        time_s=snap.time_s,
+        ticks=snap.tick,
+    )
+    sim.explored.update((eid, bm.copy()) for eid, bm in snap.explored.items())
+    return sim
+
+
+class Checkpointer:
+    """Writes periodic checkpoints of a simulation without blocking its ticks.
+
+    Call `poll()` after each tick batch, on the thread and event loop that
+    run the simulation (e.g. as or from a `FixedStepLoop` `after` hook), and
+    before inputs for the next tick are queued: a checkpoint taken after
+    tick N must not contain inputs journaled for tick N + 1, or replaying
+    the journal over it would apply them twice. After a checkpoint of tick
+    N is written, `sim.journal` (if any) discards its batches up to N.
+
+    Attributes:
+        sim: Simulation to checkpoint.
+        path: World file to (re)write.
+        every_ticks: Minimum ticks between checkpoints.
+        written: Checkpoints written so far.
+        skipped: Checkpoints due while the previous write was still running.
+        errors: Writes (or journal rotations) that failed with an `OSError` (see `last_error`).
+        last_capture_s: Time the last `capture` took on the sim thread.
+    """
+
+    def __init__(self, sim: Simulation, path: str | Path, every_ticks: int) -> None:
+        self.sim = sim
+        self.path = Path(path)
+        self.every_ticks = max(1, every_ticks)
+        self.written = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_error: OSError | None = None
+        self.last_capture_s = 0.0
+        self._last_tick = sim.ticks
+        self._task: asyncio.Task[None] | None = None
+
+    def poll(self) -> None:
+        """Start a checkpoint if one is due and none is being written."""
+        if self.sim.ticks - self._last_tick < self.every_ticks:
+            return
+        if self._task is not None and not self._task.done():
+            self.skipped += 1
+            return
+        self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Capture now and write in the background (see `flush`)."""
+        start = perf_counter()
+        sections = capture(self.sim)
+        self.last_capture_s = perf_counter() - start
+        self._last_tick = self.sim.ticks
+        self._task = asyncio.get_running_loop().create_task(self._write(sections, self._last_tick))
+
+    async def flush(self) -> None:
+        """Wait for the checkpoint being written, if any."""
+        if self._task is not None:
+            await self._task
+
+    async def _write(self, sections: Sections, tick: int) -> None:
+        try:
+            await asyncio.to_thread(write_sections, self.path, sections)
+            self.written += 1
+            # back on the sim's loop, so the journal is not being appended to concurrently
+            if self.sim.journal is not None:
+                self.sim.journal.discard_through(tick)
+        except OSError as exc:
+            self.errors += 1
+            self.last_error = exc
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _directory(mm: mmap.mmap) -> dict[str, tuple[int, int]]:
+    if len(mm) < _HEADER.size:
+        raise ValueError("not a world file (too short)")
+    magic, version, count = _HEADER.unpack_from(mm)
+    if magic != MAGIC:
+        raise ValueError("not a world file (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"world file format {version}, expected {FORMAT_VERSION}")
+    directory: dict[str, tuple[int, int]] = {}
+    for i in range(count):
+        raw, start, length = _ENTRY.unpack_from(mm, _HEADER.size + i * _ENTRY.size)
+        if start + length > len(mm):
+            raise ValueError("world file is truncated")
+        directory[raw.rstrip(b"\0").decode()] = (start, length)
+    return directory
+
+
+def _array(code: str, data: bytes, swap: bool) -> array[Any]:
+    out = array(code)
+    out.frombytes(data)
+    if swap:
+        out.byteswap()
+    return out
+
+
+def _component(name: str) -> type[Any]:
+    ctype = COMPONENTS.get(name)
+    if ctype is None:
+        raise ValueError(f"unknown component {name!r} in world file")
+    return ctype
+
+
+def _table(
+    ctype: type[Any], eids: array[int], cols: dict[str, array[Any]]
+) -> MutableMapping[EID, Any]:
+    """Return a component table for restored columns (columnar if configured)."""
+    if SETTINGS.columnar_components:
+        table: ColumnTable[Any] = ColumnTable(ctype)
+        table.eids = eids
+        table.columns = cols
+        table.slots = dict(zip(eids, range(len(eids)), strict=True))
+        return table
+    return {eid: ctype(*vals) for eid, *vals in zip(eids, *cols.values(), strict=True)}
@@ -3,21 +3,35 @@ r"""JSONL wire protocol helpers.
 All messages are UTF-8 JSON objects terminated by a newline (b"\n").
 Unknown keys MUST be ignored by clients for forward compatibility.
 
+A connection may instead negotiate length-prefixed binary frames at LOGIN
+(`"proto":"bin1"`); see the "binary framing" section at the end of this module.
+
 Message types (examples):
 - WELCOME: {"type":"WELCOME","msg":"..."}
+- MAP: {"type":"MAP","version":3,"w":100,"h":40,"base":"##..#...."}
 - POS: {"type":"POS","x":10,"y":5}
 - VIEW: {"type":"VIEW","x":0,"y":0,"w":80,"h":45,
          "tiles":"....##....", "base":"....##....", "mem":"0000111100"}
+- VIEW_DELTA: {"type":"VIEW_DELTA","seq":8,"ref":7,
+               "tiles":[[12,".."]], "mem":[[12,"11"]]}
 - STATS: {"type":"STATS","speed":1.0,"energy":0.4,"aps":0.5,"eta":3.2}
 """
 
 from __future__ import annotations
 
 import json
+import struct
+from dataclasses import dataclass
 from typing import Any
 
 from tec.settings import SETTINGS
+from tec.shared.bitmap import Bitmap
+from tec.shared.chunks import ChunkedMap
 from tec.shared.components import Actor
+from tec.shared.grid import TileGrid, TileLike, as_grid
+
+# Cell collections accepted for visibility/exploration: plain sets or bitmaps.
+Cells = set[tuple[int, int]] | Bitmap
 
 
 def ev_welcome(msg: str) -> bytes:
@@ -50,8 +64,8 @@ def _encode_tile(
     wx: int,
     wy: int,
     mask: bool,
-    visible: set[tuple[int, int]],
-    explored: set[tuple[int, int]],
+    visible: Cells,
+    explored: Cells,
 ) -> str:
     """Return a single-character glyph for a world tile.
 
@@ -67,88 +81,277 @@ def _encode_tile(
     return " "
 
 
-def _build_base_str(tiles: list[list[bool]]) -> str:
-    """Return unmasked '.'/'#' map (row-major) as a single string."""
-    chars: list[str] = []
-    for row in tiles:
-        for is_floor in row:
-            chars.append("." if is_floor else "#")
-    return "".join(chars)
+# Masked glyph per code `floor | visible << 1 | explored << 2`:
+#   unseen -> ' ', visible -> '#'/'.', explored-only -> '%'/','.
+_MASKED_GLYPHS = b"  #.%,#.".ljust(256, b" ")
+_MEM_GLYPHS = bytes.maketrans(b"\x00\x01", b"01")
+
 
+def _window_bits(cells: Cells, x0: int, y0: int, w: int, h: int) -> bytes:
+    """Return a window of `cells` as row-major bytes: 1 where present, else 0."""
+    if isinstance(cells, Bitmap):
+        return cells.window_bytes(x0, y0, w, h)
+    local = Bitmap(w, h)
+    for x, y in cells:
+        local.add((x - x0, y - y0))
+    return local.window_bytes(0, 0, w, h)
 
-def _build_mem_str(w: int, h: int, x0: int, y0: int, explored: set[tuple[int, int]]) -> str:
+
+def _build_mem_str(w: int, h: int, x0: int, y0: int, explored: Cells) -> str:
     """Return memory string (row-major): '1' if explored tile else '0'."""
-    chars: list[str] = []
-    for r in range(h):
-        wy = y0 + r
-        for c in range(w):
-            wx = x0 + c
-            chars.append("1" if (wx, wy) in explored else "0")
-    return "".join(chars)
+    return _window_bits(explored, x0, y0, w, h).translate(_MEM_GLYPHS).decode("ascii")
 
 
-def ev_view(
+def _encode_window(floor: bytes, visible: bytes, explored: bytes) -> bytes:
+    """Encode masked glyphs for a whole window in a few buffer operations.
+
+    Each input holds one 0/1 byte per cell. Treating them as big integers,
+    `floor + 2*visible + 4*explored` combines all cells at once (every byte
+    stays below 8, so nothing carries into its neighbour), and one
+    `translate` maps the 3-bit codes through `_MASKED_GLYPHS`. The output
+    matches `_encode_tile` cell for cell.
+    """
+    n = len(floor)
+    codes = (
+        int.from_bytes(floor, "big")
+        + (int.from_bytes(visible, "big") << 1)
+        + (int.from_bytes(explored, "big") << 2)
+    )
+    return codes.to_bytes(n, "big").translate(_MASKED_GLYPHS)
+
+
+@dataclass(frozen=True)
+class ViewFrame:
+    """One encoded viewport, ready to serialize as a VIEW message.
+
+    Attributes:
+        x: World-space x of the top-left tile.
+        y: World-space y of the top-left tile.
+        w: Viewport width in tiles.
+        h: Viewport height in tiles.
+        tiles: Masked glyphs, row-major, `w * h` characters.
+        base: Unmasked '.'/'#' glyphs, row-major.
+        mem: '1' where explored, '0' otherwise, row-major.
+    """
+
+    x: int
+    y: int
+    w: int
+    h: int
+    tiles: str
+    base: str
+    mem: str
+
+
+def build_view(
     x0: int,
     y0: int,
-    tiles: list[list[bool]],
-    visible: set[tuple[int, int]] | None = None,
-    explored: set[tuple[int, int]] | None = None,
-) -> bytes:
-    """Build a VIEW event containing a rectangular viewport.
-
-    Encodes the viewport as row-major strings:
-    - tiles: masked glyphs ('.','#',',','%',' ')
-    - base: unmasked '.'/'#' floor/wall map
-    - mem: '1' where explored, '0' otherwise
+    tiles: TileLike | ChunkedMap,
+    visible: Cells | None = None,
+    explored: Cells | None = None,
+    w: int | None = None,
+    h: int | None = None,
+) -> ViewFrame:
+    """Crop the world map to a viewport and encode its glyph strings.
+
+    Only the `w`×`h` window at (x0, y0) is encoded, so the cost scales with
+    the viewport rather than the world. Cells of the window that hang over
+    the map edge encode as walls.
 
     Args:
         x0: World-space x of the top-left tile of the viewport.
         y0: World-space y of the top-left tile of the viewport.
-        tiles: Row-major 2D array of booleans; True=floor, False=wall.
+        tiles: World tile grid, `ChunkedMap` (only the window's chunks are
+            read), or legacy nested list of booleans.
         visible: Set of world (x, y) currently visible. If None, no masking
             is applied (all tiles rendered as visible glyphs).
         explored: Set of world (x, y) previously explored (dim glyphs / mem).
+        w: Viewport width in tiles; defaults to the map width right of `x0`.
+        h: Viewport height in tiles; defaults to the map height below `y0`.
 
     Returns:
-        Newline-terminated JSON bytes encoding the viewport payload.
+        The encoded viewport frame.
     """
-    h = len(tiles)
-    w = len(tiles[0]) if h else 0
-
-    vis = visible or set()
-    exp = explored or set()
+    grid = tiles if isinstance(tiles, ChunkedMap) else as_grid(tiles)
+    if w is None:
+        w = max(0, grid.width - x0)
+    if h is None:
+        h = max(0, grid.height - y0)
+    window = grid.crop(x0, y0, w, h)
+
+    vis: Cells = visible if visible is not None else set()
+    exp: Cells = explored if explored is not None else set()
     mask = visible is not None  # only mask when visibility set is provided
 
-    # tiles: possibly masked glyphs
-    glyphs: list[str] = []
-    for r in range(h):
-        wy = y0 + r
-        row = tiles[r]
-        for c in range(w):
-            wx = x0 + c
-            is_floor = row[c]
-            glyphs.append(_encode_tile(is_floor, wx, wy, mask, vis, exp))
-    tiles_str = "".join(glyphs)
+    # base: unmasked '.'/'#' glyphs for the window, sliced from the cached map layer
+    if isinstance(grid, ChunkedMap):  # no whole-map glyph cache: encode the window itself
+        base_str = window.base_glyphs().decode("ascii")
+    else:
+        base_str = grid.base_window(x0, y0, w, h).decode("ascii")
+
+    # mem: per-tile explored mask, also reused by the glyph encoder
+    exp_bits = _window_bits(exp, x0, y0, w, h)
+    mem_str = exp_bits.translate(_MEM_GLYPHS).decode("ascii")
+
+    # tiles: possibly masked glyphs; unmasked views are just the base layer
+    if mask:
+        vis_bits = _window_bits(vis, x0, y0, w, h)
+        tiles_str = _encode_window(bytes(window.data), vis_bits, exp_bits).decode("ascii")
+    else:
+        tiles_str = base_str
+
+    return ViewFrame(x0, y0, w, h, tiles_str, base_str, mem_str)
 
-    # base: always full '.'/'#' map
-    base_str = _build_base_str(tiles)
 
-    # mem: per-tile explored mask ('1' or '0')
-    mem_str = _build_mem_str(w, h, x0, y0, exp)
+def ev_map(grid: TileGrid) -> bytes:
+    """Build a MAP event carrying the whole unmasked base layer once.
 
+    Clients cache it per `version` and slice their viewport's `base` from
+    it, so VIEW messages can drop `base` (see `ev_view_frame`).
+
+    Args:
+        grid: World tile grid; its cached `base_glyphs()` are sent as-is.
+
+    Returns:
+        Newline-terminated JSON bytes.
+    """
+    payload = {
+        "type": "MAP",
+        "version": grid.version,
+        "w": grid.width,
+        "h": grid.height,
+        "base": grid.base_glyphs().decode("ascii"),
+    }
+    return (json.dumps(payload) + "\n").encode()
+
+
+def ev_view_frame(
+    frame: ViewFrame, seq: int | None = None, base_version: int | None = None
+) -> bytes:
+    """Serialize a `ViewFrame` as a full VIEW event (a keyframe).
+
+    Args:
+        frame: Encoded viewport.
+        seq: Frame sequence number; included so later VIEW_DELTA messages can
+            reference this frame. Omitted from the payload when None.
+        base_version: Map version the client already holds from a MAP
+            message. When given, `base` is omitted and `base_version` sent
+            instead; the client slices `base` from its cached map.
+
+    Returns:
+        Newline-terminated JSON bytes encoding the viewport payload.
+    """
     payload: dict[str, Any] = {
         "type": "VIEW",
-        "x": x0,
-        "y": y0,
-        "w": w,
-        "h": h,
-        "tiles": tiles_str,
-        "base": base_str,
-        "mem": mem_str,
+        "x": frame.x,
+        "y": frame.y,
+        "w": frame.w,
+        "h": frame.h,
+        "tiles": frame.tiles,
+        "base": frame.base,
+        "mem": frame.mem,
     }
+    if base_version is not None:
+        del payload["base"]
+        payload["base_version"] = base_version
+    if seq is not None:
+        payload["seq"] = seq
+    return (json.dumps(payload) + "\n").encode()
+
+
+Run = tuple[int, str]  # (start index, replacement characters)
+
+
+def diff_runs(old: str, new: str) -> list[Run]:
+    """Return the changed spans turning `old` into `new` (equal lengths).
+
+    Each run is `(start, chars)`: overwrite `len(chars)` characters at
+    `start`. Adjacent changed cells merge into one run.
+    """
+    if old == new:
+        return []
+    runs: list[Run] = []
+    start = -1
+    for i, (a, b) in enumerate(zip(old, new, strict=True)):
+        if a != b:
+            if start < 0:
+                start = i
+        elif start >= 0:
+            runs.append((start, new[start:i]))
+            start = -1
+    if start >= 0:
+        runs.append((start, new[start:]))
+    return runs
+
+
+def apply_runs(text: str, runs: list[Run] | list[list[Any]]) -> str:
+    """Apply runs produced by `diff_runs` (or decoded from JSON) to `text`."""
+    if not runs:
+        return text
+    chars = list(text)
+    for start, repl in runs:
+        i = int(start)
+        chars[i : i + len(repl)] = repl
+    return "".join(chars)
+
+
+def can_delta(prev: ViewFrame | None, cur: ViewFrame) -> bool:
+    """Return True if `cur` can be sent as a VIEW_DELTA against `prev`.
+
+    Deltas patch strings in place, so the window must not have moved or
+    resized; otherwise a full VIEW keyframe is required.
+    """
+    return prev is not None and (prev.x, prev.y, prev.w, prev.h) == (cur.x, cur.y, cur.w, cur.h)
+
+
+def ev_view_delta(prev: ViewFrame, cur: ViewFrame, ref: int, seq: int) -> bytes:
+    """Build a VIEW_DELTA event patching frame `ref` into frame `seq`.
+
+    Only changed spans of `tiles` and `mem` (and `base`, should the map
+    change under the window) are sent; unchanged layers are omitted.
+
+    Args:
+        prev: Frame the client already holds (sequence number `ref`).
+        cur: New frame; must cover the same window as `prev` (see `can_delta`).
+        ref: Sequence number of `prev`.
+        seq: Sequence number assigned to `cur`.
+
+    Returns:
+        Newline-terminated JSON bytes.
+    """
+    payload: dict[str, Any] = {"type": "VIEW_DELTA", "seq": seq, "ref": ref}
+    for key in ("tiles", "base", "mem"):
+        runs = diff_runs(getattr(prev, key), getattr(cur, key))
+        if runs:
+            payload[key] = runs
     return (json.dumps(payload) + "\n").encode()
 
 
+def ev_view(
+    x0: int,
+    y0: int,
+    tiles: TileLike,
+    visible: Cells | None = None,
+    explored: Cells | None = None,
+    w: int | None = None,
+    h: int | None = None,
+) -> bytes:
+    """Build a VIEW event containing a rectangular viewport.
+
+    Encodes the viewport as row-major strings:
+    - tiles: masked glyphs ('.','#',',','%',' ')
+    - base: unmasked '.'/'#' floor/wall map
+    - mem: '1' where explored, '0' otherwise
+
+    Arguments match `build_view`; pass `w`/`h` to crop to the client's
+    viewport instead of sending the rest of the map.
+
+    Returns:
+        Newline-terminated JSON bytes encoding the viewport payload.
+    """
+    return ev_view_frame(build_view(x0, y0, tiles, visible, explored, w, h))
+
+
 def ev_stats(speed: float, energy: float, aps: float, eta: float) -> bytes:
     """Build a STATS event for the sidebar.
 
@@ -181,3 +384,191 @@ def derive_stats(actor: Actor, move_cost: float) -> dict[str, float]:
     denom = actor.speed * tick_rate
     eta = 0.0 if denom <= 0 else max(0.0, (move_cost - actor.energy) / denom)
     return {"speed": actor.speed, "energy": actor.energy, "aps": aps, "eta": eta}
+
+
+# ---------- binary framing ("bin1") ----------
+#
+# Negotiated per connection with {"type":"LOGIN",...,"proto":"bin1"}. Every
+# server→client message is then one frame: a little-endian u32 body length,
+# followed by the body. body[0] is a message code; POS, STATS and VIEW use
+# fixed struct layouts, anything else is the JSON object as UTF-8.
+# Client→server messages stay JSONL.
+
+PROTO_JSON = "json"
+PROTO_BIN1 = "bin1"
+
+FRAME_HEADER = struct.Struct("<I")
+_MSG_JSON = 0
+_MSG_POS = 1
+_MSG_STATS = 2
+_MSG_VIEW = 3
+_POS = struct.Struct("<Bii")
+_STATS = struct.Struct("<Bdddd")
+# code, flags, x, y, w, h, seq, base_version
+_VIEW = struct.Struct("<BBiiHHIQ")
+_VIEW_HAS_SEQ = 0x01
+_VIEW_HAS_BASE = 0x02
+
+# Masked glyph <-> 4-bit code.
+_GLYPHS = " .#,%"
+_GLYPH_TO_CODE = bytes(_GLYPHS.index(chr(b)) if chr(b) in _GLYPHS else 0 for b in range(256))
+_CODE_TO_GLYPH = _GLYPHS.encode("ascii") + bytes(256 - len(_GLYPHS))
+# base/mem cell <-> 2-bit code: bit0 = floor ('.'), bit1 = explored ('1').
+_BASE_TO_BIT = bytes(1 if b == ord(".") else 0 for b in range(256))
+_MEM_TO_BIT = bytes(2 if b == ord("1") else 0 for b in range(256))
+_BIT_TO_BASE = bytes(ord(".") if b & 1 else ord("#") for b in range(256))
+_BIT_TO_MEM = bytes(ord("1") if b & 2 else ord("0") for b in range(256))
+
+
+def _pack_codes(codes: bytes, bits: int) -> bytes:
+    """Pack one small code per byte into `bits` (2 or 4) bits per code.
+
+    Works on whole strided slices as big integers, so no per-cell Python
+    loop: each slice holds codes < 2**bits, so shifting and OR-ing the
+    slices never carries between bytes.
+    """
+    per_byte = 8 // bits
+    n = -(-len(codes) // per_byte)
+    codes = codes.ljust(n * per_byte, b"\0")
+    acc = 0
+    for k in range(per_byte):
+        acc = (acc << bits) | int.from_bytes(codes[k::per_byte], "big")
+    return acc.to_bytes(n, "big")
+
+
+def _unpack_codes(packed: bytes, bits: int, count: int) -> bytes:
+    """Inverse of `_pack_codes`: return `count` codes, one per byte."""
+    per_byte = 8 // bits
+    mask = (1 << bits) - 1
+    out = bytearray(len(packed) * per_byte)
+    for k in range(per_byte):
+        shift = 8 - bits * (k + 1)
+        table = bytes((b >> shift) & mask for b in range(256))
+        out[k::per_byte] = packed.translate(table)
+    return bytes(out[:count])
+
+
+def _frame(body: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def bin_json(event: bytes) -> bytes:
+    """Wrap an already-encoded JSONL event in a binary frame."""
+    return _frame(bytes((_MSG_JSON,)) + event.rstrip(b"\n"))
+
+
+def bin_pos(x: int, y: int) -> bytes:
+    """Binary counterpart of `ev_pos`."""
+    return _frame(_POS.pack(_MSG_POS, x, y))
+
+
+def bin_stats(speed: float, energy: float, aps: float, eta: float) -> bytes:
+    """Binary counterpart of `ev_stats` (float64 fields, exact round trip)."""
+    return _frame(_STATS.pack(_MSG_STATS, speed, energy, aps, eta))
+
+
+def bin_view(frame: ViewFrame, seq: int | None = None, base_version: int | None = None) -> bytes:
+    """Binary counterpart of `ev_view_frame`.
+
+    Layout after the `_VIEW` header: masked glyphs at 4 bits per cell, then
+    base/mem at 2 bits per cell (bit0 floor, bit1 explored). When
+    `base_version` is given the floor bit is left clear, as VIEW omits `base`.
+    """
+    flags = 0
+    if seq is not None:
+        flags |= _VIEW_HAS_SEQ
+    mem = int.from_bytes(frame.mem.encode("ascii").translate(_MEM_TO_BIT), "big")
+    if base_version is None:
+        flags |= _VIEW_HAS_BASE
+        mem += int.from_bytes(frame.base.encode("ascii").translate(_BASE_TO_BIT), "big")
+    cells = frame.w * frame.h
+    header = _VIEW.pack(
+        _MSG_VIEW, flags, frame.x, frame.y, frame.w, frame.h, seq or 0, base_version or 0
+    )
+    tiles = _pack_codes(frame.tiles.encode("ascii").translate(_GLYPH_TO_CODE), 4)
+    layers = _pack_codes(mem.to_bytes(cells, "big"), 2)
+    return _frame(header + tiles + layers)
+
+
+def decode_frame(body: bytes) -> dict[str, Any]:
+    """Decode one binary frame body into the equivalent JSON message dict.
+
+    Raises:
+        ValueError: On an unknown message code.
+    """
+    code = body[0]
+    if code == _MSG_JSON:
+        msg: dict[str, Any] = json.loads(body[1:].decode("utf-8"))
+        return msg
+    if code == _MSG_POS:
+        _, x, y = _POS.unpack(body)
+        return {"type": "POS", "x": x, "y": y}
+    if code == _MSG_STATS:
+        _, speed, energy, aps, eta = _STATS.unpack(body)
+        return {"type": "STATS", "speed": speed, "energy": energy, "aps": aps, "eta": eta}
+    if code == _MSG_VIEW:
+        _, flags, x, y, w, h, seq, base_version = _VIEW.unpack_from(body)
+        cells = w * h
+        tiles_len = -(-cells // 2)
+        pos = _VIEW.size
+        tiles = _unpack_codes(body[pos : pos + tiles_len], 4, cells)
+        layers = _unpack_codes(body[pos + tiles_len :], 2, cells)
+        view: dict[str, Any] = {
+            "type": "VIEW",
+            "x": x,
+            "y": y,
+            "w": w,
+            "h": h,
+            "tiles": tiles.translate(_CODE_TO_GLYPH).decode("ascii"),
+        }
+        if flags & _VIEW_HAS_BASE:
+            view["base"] = layers.translate(_BIT_TO_BASE).decode("ascii")
+        else:
+            view["base_version"] = base_version
+        view["mem"] = layers.translate(_BIT_TO_MEM).decode("ascii")
+        if flags & _VIEW_HAS_SEQ:
+            view["seq"] = seq
+        return view
+    raise ValueError(f"unknown binary message code {code}")
+
+
+class JsonCodec:
+    """Encode outgoing events as JSON lines (the default protocol)."""
+
+    name = PROTO_JSON
+
+    def pos(self, x: int, y: int) -> bytes:
+        return ev_pos(x, y)
+
+    def stats(self, speed: float, energy: float, aps: float, eta: float) -> bytes:
+        return ev_stats(speed, energy, aps, eta)
+
+    def view(self, frame: ViewFrame, seq: int | None, base_version: int | None) -> bytes:
+        return ev_view_frame(frame, seq, base_version)
+
+    def wrap(self, event: bytes) -> bytes:
+        """Pass through an event that has no dedicated encoding."""
+        return event
+
+
+class BinaryCodec(JsonCodec):
+    """Encode outgoing events as length-prefixed `bin1` frames."""
+
+    name = PROTO_BIN1
+
+    def pos(self, x: int, y: int) -> bytes:
+        return bin_pos(x, y)
+
+    def stats(self, speed: float, energy: float, aps: float, eta: float) -> bytes:
+        return bin_stats(speed, energy, aps, eta)
+
+    def view(self, frame: ViewFrame, seq: int | None, base_version: int | None) -> bytes:
+        return bin_view(frame, seq, base_version)
+
+    def wrap(self, event: bytes) -> bytes:
+        return bin_json(event)
+
+
+def codec_for(proto: object) -> JsonCodec:
+    """Return the codec for a LOGIN `proto` value; unknown values fall back to JSON."""
+    return BinaryCodec() if proto == PROTO_BIN1 else JsonCodec()
@@ -0,0 +1,111 @@
+"""Re-run journaled inputs against a simulation, as fast as it can tick.
+
+`replay` feeds the batches of an `ActionJournal` file into a `Simulation`
+restored from a world file (or a fresh one built from the same settings),
+ticking between batches exactly as the live server did. No sockets, no
+sleeping: it is used for crash recovery (world file + journal written
+since), for reproducing a recorded session offline, and as the driver of
+`tools/bench_ticks.py`.
+
+The simulation is deterministic given its inputs, so the replayed state
+matches the live one tick for tick; a spawn that yields a different entity
+id than the recorded one means the two have diverged and stops the replay.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+
+from tec.server.journal import DESPAWN, MOVE, SET_TILE, SPAWN, WAIT, Record, read_batches
+from tec.server.sim import Simulation
+
+
+@dataclass(frozen=True)
+class ReplayStats:
+    """Outcome of one `replay` call.
+
+    Attributes:
+        ticks: Ticks simulated.
+        inputs: Journal records applied.
+        elapsed_s: Wall-clock time spent.
+    """
+
+    ticks: int
+    inputs: int
+    elapsed_s: float
+
+    @property
+    def ticks_per_s(self) -> float:
+        """Return simulated ticks per wall-clock second."""
+        return self.ticks / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def replay(sim: Simulation, path: str | Path, until_tick: int | None = None) -> ReplayStats:
+    """Apply the journal at `path` to `sim`, ticking in between.
+
+    Batches for ticks `sim` has already run (e.g. before the world file was
+    saved) are skipped. `sim.journal` is detached for the duration so the
+    replayed inputs are not journaled again.
+
+    Args:
+        sim: Simulation to drive; it is modified in place.
+        path: Journal file written by `ActionJournal`.
+        until_tick: Stop once `sim.ticks` reaches this tick, ticking on past
+            the journal's end if needed. None replays the whole journal and
+            leaves the last batch's inputs queued, as the live server had them.
+
+    Returns:
+        Ticks simulated, inputs applied and the time it took.
+
+    Raises:
+        ValueError: If `path` is not a journal, or a record does not apply
+            the way it did when it was written.
+    """
+    journal, sim.journal = sim.journal, None
+    start_tick, inputs = sim.ticks, 0
+    start = perf_counter()
+    try:
+        for tick, records in read_batches(path):
+            if until_tick is not None and tick > until_tick:
+                break
+            if not records:
+                _run_to(sim, tick)
+                continue
+            if tick <= sim.ticks:
+                continue  # already part of the saved state
+            _run_to(sim, tick - 1)
+            for record in records:
+                _apply(sim, record)
+            inputs += len(records)
+        if until_tick is not None:
+            _run_to(sim, until_tick)
+    finally:
+        sim.journal = journal
+    return ReplayStats(sim.ticks - start_tick, inputs, perf_counter() - start)
+
+
+def _run_to(sim: Simulation, tick: int) -> None:
+    while sim.ticks < tick:
+        sim.tick()
+
+
+def _apply(sim: Simulation, record: Record) -> None:
+    kind, eid, a, b = record
+    if kind == MOVE:
+        sim.enqueue_move(eid, a, b)
+    elif kind == WAIT:
+        sim.enqueue_wait(eid)
+    elif kind == SPAWN:
+        spawned = sim.spawn_player()
+        if spawned != eid:
+            raise ValueError(
+                f"replay diverged at tick {sim.ticks + 1}: spawned {spawned}, not {eid}"
+            )
+    elif kind == DESPAWN:
+        sim.despawn(eid)
+    elif kind == SET_TILE:
+        sim.set_tile(a, b, bool(eid))
+    else:
+        raise ValueError(f"unknown journal record kind {kind}")
@@ -0,0 +1,190 @@
+"""Run the simulation on a dedicated thread, off the network event loop.
+
+`SimThread` owns the `Simulation` once started; no other thread touches it:
+
+- Inputs go in through a `queue.SimpleQueue` of commands, drained at the
+  start of every tick on the sim thread. A command that raises is logged
+  (or handed to its caller's future) and dropped; the thread keeps ticking.
+- State comes out as an immutable `Snapshot`, swapped into `snapshot` after
+  each tick batch with a single assignment. Readers on the event loop just
+  take the current reference.
+- After publishing, `on_publish` (e.g. `JsonServer.broadcast`) is scheduled
+  on the event loop with `call_soon_threadsafe`.
+
+Ticks therefore never wait on socket writes, and socket reads never wait on
+a long tick.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from functools import partial
+from typing import Any
+
+from tec.server.scheduler import FixedStepLoop
+from tec.server.sim import Simulation
+from tec.server.snapshot import Snapshot
+from tec.settings import SETTINGS
+from tec.shared.actions import is_step
+from tec.shared.world import EID
+
+log = logging.getLogger(__name__)
+
+Command = tuple[Callable[[], Any], "Future[Any] | None"]
+
+
+class SimThread:
+    """Ticks a `Simulation` on its own thread and publishes snapshots.
+
+    Attributes:
+        sim: The simulation; owned by the sim thread after `start()`.
+        snapshot: Latest published state (replaced, never mutated).
+        on_publish: Called on the event loop after each published snapshot.
+        after_batch: Called on the sim thread, inside its event loop, after
+            each tick batch and before queued commands are applied (e.g.
+            `Checkpointer.poll`, which must not see inputs for the next tick).
+    """
+
+    def __init__(
+        self,
+        sim: Simulation,
+        loop: asyncio.AbstractEventLoop,
+        on_publish: Callable[[], None] | None = None,
+        after_batch: Callable[[], None] | None = None,
+    ) -> None:
+        """Prepare a runner; the thread starts with `start()`.
+
+        Args:
+            sim: Simulation to run.
+            loop: Event loop that receives `on_publish` calls.
+            on_publish: Called on `loop` after each published snapshot.
+            after_batch: Called on the sim thread after each tick batch.
+        """
+        self.sim = sim
+        self.snapshot: Snapshot = sim.snapshot()
+        self._loop = loop
+        self.on_publish = on_publish
+        self.after_batch = after_batch
+        self._inbox: queue.SimpleQueue[Command] = queue.SimpleQueue()
+        self._replies: list[tuple[Future[Any], Any]] = []
+        self._thread: threading.Thread | None = None
+        self._sim_loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    # ---------- inputs (any thread) ----------
+
+    def enqueue_move(self, eid: EID, dx: int, dy: int) -> None:
+        """Queue a move for the next tick.
+
+        Raises:
+            ValueError: If a delta is outside -1..1 (checked here, not on the sim thread).
+        """
+        if not is_step(dx, dy):
+            raise ValueError(f"move delta must be in -1..1, got ({dx}, {dy})")
+        self._inbox.put((partial(self.sim.enqueue_move, eid, dx, dy), None))
+
+    def enqueue_wait(self, eid: EID) -> None:
+        """Queue a wait for the next tick."""
+        self._inbox.put((partial(self.sim.enqueue_wait, eid), None))
+
+    def despawn(self, eid: EID) -> None:
+        """Queue `eid`'s removal for the next tick."""
+        self._inbox.put((partial(self.sim.despawn, eid), None))
+
+    async def spawn_player(self) -> EID:
+        """Spawn a player on the sim thread; resolves once a snapshot includes it."""
+        future: Future[EID] = Future()
+        self._inbox.put((self.sim.spawn_player, future))
+        return await asyncio.wrap_future(future)
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        """Start ticking on a daemon thread."""
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._main, args=(ready,), name="tec-sim")
+        self._thread.daemon = True
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """Stop ticking and wait up to `timeout` seconds for the thread to exit.
+
+        Returns:
+            True if the thread has exited (or never ran). False means it is
+            still finishing a tick and `sim` must not be read yet; use
+            `snapshot` instead.
+        """
+        if self._thread is None:
+            return True
+        if self._sim_loop is not None and self._task is not None:
+            self._sim_loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return False
+        self._thread = None
+        return True
+
+    # ---------- sim thread ----------
+
+    def _main(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        self._sim_loop = loop
+        stepper = FixedStepLoop(
+            self.sim.tick_len,
+            self._step,
+            self._publish,
+            max_catchup=SETTINGS.tick_max_catchup,
+            stats=self.sim.tick_stats,
+        )
+        self._task = loop.create_task(stepper.run())
+        ready.set()
+        try:
+            loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # let background work started on this loop (e.g. checkpoint writes) finish
+            loop.run_until_complete(loop.shutdown_default_executor())
+            self.sim.close()
+            loop.close()
+
+    def _drain_inbox(self) -> None:
+        while True:
+            try:
+                command, future = self._inbox.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                result = command()
+            except Exception as exc:
+                # one bad input must not stop the world for every other player
+                if future is not None:
+                    future.set_exception(exc)
+                else:
+                    log.exception("dropped a command that failed on the sim thread")
+                continue
+            if future is not None:
+                self._replies.append((future, result))
+
+    def _step(self) -> None:
+        self._drain_inbox()
+        self.sim.tick()
+
+    def _publish(self) -> None:
+        if self.after_batch is not None:
+            self.after_batch()
+        self._drain_inbox()  # e.g. spawns that arrived mid-batch show up right away
+        self.snapshot = self.sim.snapshot()
+        replies, self._replies = self._replies, []
+        for future, result in replies:
+            future.set_result(result)
+        if self.on_publish is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.on_publish)
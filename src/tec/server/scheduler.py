@@ -0,0 +1,133 @@
+"""Fixed-timestep tick scheduling with drift compensation and overrun accounting.
+
+`FixedStepLoop` runs the simulation against absolute deadlines
+(`start + n * step`) instead of sleeping `step` after each tick, so tick cost
+does not stretch the period and `Simulation.time_s` tracks wall time. When a
+tick batch runs late the loop catches up with up to `max_catchup` ticks in a
+row; anything beyond that is skipped and counted, so a saturated server
+degrades visibly instead of spiralling.
+
+Timing is recorded in `TickStats`: per-tick duration, overruns (batches that
+ended past the next deadline), skipped ticks and a histogram of wake-up
+lateness (jitter).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+# Upper edges (ms) of the jitter histogram buckets; the last bucket is open-ended.
+JITTER_EDGES_MS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+
+@dataclass
+class TickStats:
+    """Tick timing counters.
+
+    Attributes:
+        ticks: Ticks executed.
+        skipped: Ticks dropped because catch-up exceeded `max_catchup`.
+        overruns: Batches that finished after the following deadline.
+        last_duration_s: Wall time of the most recent tick.
+        max_duration_s: Longest tick seen.
+        total_duration_s: Sum of all tick durations.
+        jitter_counts: Wake-ups per lateness bucket (see `JITTER_EDGES_MS`).
+    """
+
+    ticks: int = 0
+    skipped: int = 0
+    overruns: int = 0
+    last_duration_s: float = 0.0
+    max_duration_s: float = 0.0
+    total_duration_s: float = 0.0
+    jitter_counts: list[int] = field(default_factory=lambda: [0] * (len(JITTER_EDGES_MS) + 1))
+
+    def record_tick(self, duration_s: float) -> None:
+        """Add one tick's wall time."""
+        self.ticks += 1
+        self.last_duration_s = duration_s
+        self.total_duration_s += duration_s
+        self.max_duration_s = max(self.max_duration_s, duration_s)
+
+    def record_jitter(self, late_s: float) -> None:
+        """Add one wake-up that happened `late_s` seconds after its deadline."""
+        self.jitter_counts[bisect.bisect_left(JITTER_EDGES_MS, late_s * 1000.0)] += 1
+
+    def load(self, step_s: float) -> float:
+        """Return mean tick time as a fraction of the period (>= 1.0 means saturated)."""
+        return self.total_duration_s / self.ticks / step_s if self.ticks and step_s > 0 else 0.0
+
+
+class FixedStepLoop:
+    """Call `tick` every `step_s` seconds of wall time, on absolute deadlines.
+
+    Attributes:
+        step_s: Tick period in seconds.
+        max_catchup: Most ticks run back to back when behind schedule.
+        stats: Timing counters, updated as the loop runs.
+    """
+
+    def __init__(
+        self,
+        step_s: float,
+        tick: Callable[[], None],
+        after: Callable[[], None] | None = None,
+        max_catchup: int = 5,
+        stats: TickStats | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """Create a loop; nothing runs until `run()`.
+
+        Args:
+            step_s: Tick period in seconds (> 0).
+            tick: Advances the simulation by one step.
+            after: Called once after each batch of ticks (e.g. the network broadcast).
+            max_catchup: Ticks allowed per batch when late (>= 1).
+            stats: Counters to update (a fresh `TickStats` by default).
+            clock: Monotonic time source in seconds.
+            sleep: Awaitable sleep; injectable for tests.
+
+        Raises:
+            ValueError: If `step_s` is not positive.
+        """
+        if step_s <= 0:
+            raise ValueError(f"tick period must be > 0, got {step_s}")
+        self.step_s = step_s
+        self.max_catchup = max(1, max_catchup)
+        self.stats = stats if stats is not None else TickStats()
+        self._tick = tick
+        self._after = after
+        self._clock = clock
+        self._sleep = sleep
+
+    async def run(self, max_batches: int | None = None) -> None:
+        """Tick forever (or for `max_batches` wake-ups); cancel the task to stop."""
+        clock, step, stats = self._clock, self.step_s, self.stats
+        deadline = clock() + step
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            now = clock()
+            if now < deadline:
+                await self._sleep(deadline - now)
+                now = clock()
+            stats.record_jitter(max(0.0, now - deadline))
+
+            due = int((now - deadline) // step) + 1
+            run = min(due, self.max_catchup)
+            stats.skipped += due - run
+            for _ in range(run):
+                start = clock()
+                self._tick()
+                stats.record_tick(clock() - start)
+            if self._after is not None:
+                self._after()
+
+            deadline += due * step
+            if clock() > deadline:
+                stats.overruns += 1
+            batches += 1
@@ -5,40 +5,130 @@ applied at the start of each tick. Network I/O is handled elsewhere; this
 module owns world state and game rules.
 """
 
+import math
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from functools import partial
 
+from tec.server.journal import DESPAWN, MOVE, SET_TILE, SPAWN, WAIT, ActionJournal
+from tec.server.scheduler import TickStats
+from tec.server.snapshot import Snapshot
 from tec.settings import SETTINGS
-from tec.shared.actions import MOVE_COST, WAIT_COST
+from tec.shared.actions import MOVE_COST, WAIT_COST, is_step
+from tec.shared.bitmap import Bitmap
+from tec.shared.chunks import ChunkedMap, WorldMap
 from tec.shared.components import Actor, Needs, Position
+from tec.shared.fov import FovCache, FovDelta, FovKey, FovTracker, shadowcast_grid
+from tec.shared.grid import TileGrid
+from tec.shared.mapcache import cached_map
 from tec.shared.mapgen import generate_map
+from tec.shared.opacity import ChunkedOpacity, OpacityLayer
+from tec.shared.spatial import SpatialHash
+from tec.shared.systems.energy import accrue_energy
 from tec.shared.systems.movement import try_move
-from tec.shared.systems.needs import tick_needs
+from tec.shared.systems.needs import tick_needs_many
 from tec.shared.world import EID, World
 
 Action = tuple[str, tuple[int, int] | None]  # ("move",(dx,dy)) or ("wait", None)
+Origin = tuple[int, int, int]  # (x, y, radius)
 
 
-def _new_map() -> list[list[bool]]:
+def _new_map() -> WorldMap:
+    if SETTINGS.chunked_map:
+        return ChunkedMap(
+            SETTINGS.map_width,
+            SETTINGS.map_height,
+            SETTINGS.seed,
+            SETTINGS.map_chunk,
+            SETTINGS.max_resident_chunks,
+        )
+    if SETTINGS.map_cache_dir is not None:
+        return cached_map(
+            SETTINGS.map_width, SETTINGS.map_height, SETTINGS.seed, SETTINGS.map_cache_dir
+        )
     return generate_map(SETTINGS.map_width, SETTINGS.map_height, SETTINGS.seed)
 
 
+def _new_fov_cache() -> FovCache[Bitmap]:
+    return FovCache(SETTINGS.fov_cache_size)
+
+
+def _fov_batch(width: int, height: int, data: bytes, origins: list[Origin]) -> list[list[int]]:
+    """Worker entry point: shadowcast several origins over one map snapshot.
+
+    Returns `Bitmap.rows` lists (plain ints pickle cheaply) in `origins` order.
+    """
+    grid = TileGrid(width, height, bytearray(data))
+    return [shadowcast_grid(x, y, r, grid, Bitmap(width, height)).rows for x, y, r in origins]
+
+
 @dataclass
 class Simulation:
     """World state plus tick-advancement routines.
 
     Attributes:
         world: ECS-style storage for components.
-        tiles: 2D map of walkable tiles; True=floor, False=wall.
+        tiles: Grid of walkable tiles; 1=floor, 0=wall. Edit through `set_tile`.
+            A `ChunkedMap` when `SETTINGS.chunked_map` is on; each tick then
+            evicts the chunks no entity is near.
+        opacity: Transparency layer over `tiles` (a padded `OpacityLayer`, or a
+            `ChunkedOpacity` for chunked maps), read by FOV and movement; its
+            dirty-rect feed limits FOV invalidation after edits.
+        spatial: Entity positions by tile/chunk, updated on spawn, moves and despawn.
         time_s: Simulated seconds since world start.
+        ticks: Ticks run since world start.
         tick_len: Seconds per tick (1 / Settings.tick_rate_hz).
+        tick_stats: Tick timing (durations, overruns, skips, jitter) from the scheduler.
+        fov_cache: Shared FOV results keyed by (origin, radius, opacity version).
+        visible: Per-entity visible cells, refreshed once per tick by `update_fov`.
+            Bitmaps may be shared between entities and must be treated as read-only.
+        explored: Per-entity cells ever seen, grown from each FOV update's added cells.
+        fov_trackers: Per-entity `FovTracker`s (previous origin and visible cells).
+        fov_deltas: Per-entity result of the last FOV update (added/removed cells).
+        journal: If set, records every external input (moves, waits, spawns,
+            despawns, map edits) for `tec.server.replay`.
     """
 
     world: World = field(default_factory=World)
-    tiles: list[list[bool]] = field(default_factory=_new_map)
+    tiles: WorldMap = field(default_factory=_new_map)
     action_queues: dict[EID, deque[Action]] = field(default_factory=dict)
     tick_len: float = field(default=1.0 / SETTINGS.tick_rate_hz)
     time_s: float = 0.0  # simulated seconds since world start
+    ticks: int = 0  # ticks run since world start
+    tick_stats: TickStats = field(default_factory=TickStats)
+    fov_cache: FovCache[Bitmap] = field(default_factory=_new_fov_cache)
+    visible: dict[EID, Bitmap] = field(default_factory=dict)
+    explored: dict[EID, Bitmap] = field(default_factory=dict)
+    fov_trackers: dict[EID, FovTracker] = field(default_factory=dict, repr=False)
+    fov_deltas: dict[EID, FovDelta] = field(default_factory=dict, repr=False)
+    journal: ActionJournal | None = field(default=None, repr=False)
+    opacity: OpacityLayer | ChunkedOpacity = field(init=False, repr=False)
+    spatial: SpatialHash = field(init=False, repr=False)
+    _fov_pool: ProcessPoolExecutor | None = field(default=None, init=False, repr=False)
+    _snapshot_tiles: tuple[int, TileGrid] | None = field(default=None, init=False, repr=False)
+    _snapshot_explored: dict[EID, tuple[FovDelta | None, Bitmap]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        self.opacity = (
+            ChunkedOpacity(self.tiles)
+            if isinstance(self.tiles, ChunkedMap)
+            else OpacityLayer(self.tiles)
+        )
+        self.spatial = SpatialHash()
+        self.spatial.rebuild((eid, (pos.x, pos.y)) for eid, pos in self.world.get(Position).items())
+        if SETTINGS.columnar_components:
+            self.world.use_columns(Position, Actor, Needs)
+
+    def set_tile(self, x: int, y: int, floor: bool) -> None:
+        """Change one map cell and publish it to the opacity layer's change feed."""
+        self.opacity.sync(self.tiles)  # fold in any edits made directly on `tiles`
+        self.tiles.set(x, y, floor)
+        self.opacity.refresh(self.tiles, (x, y, x + 1, y + 1))
+        if self.journal is not None:
+            self.journal.record(self.ticks + 1, SET_TILE, int(floor), x, y)
 
     def ensure_queue(self, eid: EID) -> deque[Action]:
         """Return (and create if missing) the action queue for an entity."""
@@ -47,12 +137,41 @@ class Simulation:
     def spawn_player(self) -> EID:
         """Create a new player entity at world center and return its id."""
         eid = self.world.create()
-        self.world.add(eid, Position(SETTINGS.map_width // 2, SETTINGS.map_height // 2))
+        if isinstance(self.tiles, ChunkedMap):
+            x, y = self.tiles.start()
+        else:
+            x, y = SETTINGS.map_width // 2, SETTINGS.map_height // 2
+        self.world.add(eid, Position(x, y))
+        self.spatial.insert(eid, x, y)
         self.world.add(eid, Actor())
         self.world.add(eid, Needs())
         self.ensure_queue(eid)
+        if self.journal is not None:
+            self.journal.record(self.ticks + 1, SPAWN, eid)
         return eid
 
+    def despawn(self, eid: EID) -> bool:
+        """Destroy `eid` and drop every per-entity record the simulation keeps.
+
+        Returns:
+            False if `eid` was already gone.
+        """
+        if not self.world.destroy(eid):
+            return False
+        if self.journal is not None:
+            self.journal.record(self.ticks + 1, DESPAWN, eid)
+        self.spatial.remove(eid)
+        for table in (
+            self.action_queues,
+            self.visible,
+            self.explored,
+            self.fov_trackers,
+            self.fov_deltas,
+            self._snapshot_explored,
+        ):
+            table.pop(eid, None)
+        return True
+
     def enqueue_move(self, eid: EID, dx: int, dy: int) -> None:
         """Queue a relative move for an entity.
 
@@ -60,11 +179,20 @@ class Simulation:
             eid: Entity id to move.
             dx: Delta x in tiles (-1, 0, +1).
             dy: Delta y in tiles (-1, 0, +1).
+
+        Raises:
+            ValueError: If a delta is outside -1..1.
         """
+        if not is_step(dx, dy):
+            raise ValueError(f"move delta must be in -1..1, got ({dx}, {dy})")
+        if self.journal is not None:  # journal first: a rejected record must not act live
+            self.journal.record(self.ticks + 1, MOVE, eid, dx, dy)
         self.ensure_queue(eid).append(("move", (dx, dy)))
 
     def enqueue_wait(self, eid: EID) -> None:
         """Queue a no-op action (advance time and accrue energy)."""
+        if self.journal is not None:
+            self.journal.record(self.ticks + 1, WAIT, eid)
         self.ensure_queue(eid).append(("wait", None))
 
     def tick(self) -> None:
@@ -72,19 +200,29 @@ class Simulation:
 
         Steps:
             1) Increase `time_s` by `tick_len`.
-            2) For each entity with queued input, apply one action.
-            3) Update any systems that progress every tick (e.g., needs).
+            2) Accrue energy for every actor (`accrue_energy`, one pass).
+            3) For each entity in `world.query(Actor, Position)` with queued
+               input and enough energy, apply one action; those entities then
+               progress their needs in one batch.
+            4) On a chunked map, evict chunks more than one chunk away from
+               every entity.
+            5) Recompute FOV for every viewer (`update_fov`).
         """
         self.time_s += self.tick_len
+        self.ticks += 1
+        self.opacity.sync(self.tiles)
 
         actors = self.world.get(Actor)
         positions = self.world.get(Position)
         needz = self.world.get(Needs)
-        for eid, act in list(actors.items()):
-            act.energy += act.speed
-            q = self.action_queues.get(eid)
+        accrue_energy(actors)
+        queues = self.action_queues
+        acted: list[EID] = []
+        for eid in self.world.query(Actor, Position):
+            q = queues.get(eid)
             if not q:
                 continue
+            act = actors[eid]
             kind, payload = q[0]  # peek
             cost = MOVE_COST if kind == "move" else WAIT_COST
             if act.energy < cost:
@@ -92,7 +230,204 @@ class Simulation:
             q.popleft()
             if kind == "move" and payload is not None:
                 dx, dy = payload
-                try_move(positions[eid], dx, dy, self.tiles)
+                pos = positions[eid]
+                if try_move(pos, dx, dy, self.opacity):
+                    self.spatial.move(eid, pos.x, pos.y)
             act.energy -= cost
             if eid in needz:
-                tick_needs(needz[eid], act)
+                acted.append(eid)
+        tick_needs_many(needz, acted)
+        if isinstance(self.tiles, ChunkedMap):
+            self.tiles.evict_far(((pos.x, pos.y) for pos in positions.values()), margin=1)
+        self.update_fov()
+
+    # ---------- read API (WorldView) ----------
+
+    def position(self, eid: EID) -> tuple[int, int]:
+        """Return `eid`'s tile position."""
+        pos = self.world.get(Position)[eid]
+        return pos.x, pos.y
+
+    def actor(self, eid: EID) -> Actor:
+        """Return `eid`'s live Actor component."""
+        return self.world.get(Actor)[eid]
+
+    def explored_for(self, eid: EID) -> Bitmap:
+        """Return `eid`'s explored cells, including what it sees right now."""
+        self.visible_for(eid)
+        return self.explored[eid]
+
+    def snapshot(self) -> Snapshot:
+        """Return an immutable copy of the state the network layer reads.
+
+        The tile grid is copied only after a map edit, and an explored
+        bitmap only after its viewer's FOV changed; everything else is small.
+
+        Raises:
+            ValueError: On a chunked map, which is never copied whole.
+        """
+        if isinstance(self.tiles, ChunkedMap):
+            raise ValueError("chunked maps cannot be snapshotted; run the simulation in-loop")
+        if self._snapshot_tiles is None or self._snapshot_tiles[0] != self.tiles.version:
+            self._snapshot_tiles = (self.tiles.version, self.tiles.copy())
+        positions = {eid: (pos.x, pos.y) for eid, pos in self.world.get(Position).items()}
+        visible = {eid: self.visible_for(eid) for eid in positions}
+        explored: dict[EID, Bitmap] = {}
+        copies = self._snapshot_explored
+        for eid in positions:
+            delta = self.fov_deltas.get(eid)
+            cached = copies.get(eid)
+            if cached is None or cached[0] is not delta:
+                cached = copies[eid] = (delta, self.explored[eid].copy())
+            explored[eid] = cached[1]
+        return Snapshot(
+            tick=self.ticks,
+            time_s=self.time_s,
+            tiles=self._snapshot_tiles[1],
+            positions=positions,
+            actors={eid: self.world.detached(Actor, eid) for eid in self.world.get(Actor)},
+            visible=visible,
+            explored=explored,
+            needs={eid: self.world.detached(Needs, eid) for eid in self.world.get(Needs)},
+            generations=tuple(self.world.generations),
+            free=tuple(self.world.free),
+        )
+
+    # ---------- field of view ----------
+
+    def ambient_factor(self) -> float:
+        """Return ambient light factor in [0,1] based on time of day."""
+        if SETTINGS.day_seconds <= 0:
+            return 1.0
+        phase = (self.time_s % SETTINGS.day_seconds) / SETTINGS.day_seconds  # 0..1
+        # Day peaks at factor=1.0 mid-day, night dips to ~0.2 (tweakable)
+        return 0.6 + 0.4 * math.sin(2 * math.pi * (phase - 0.25))  # shift so noon at sin=+1
+
+    def effective_radius(self, eid: EID) -> int:
+        """Return the sight radius of `eid` for the current time of day."""
+        amb = self.ambient_factor()
+        base = round(SETTINGS.fov_night + (SETTINGS.fov_day - SETTINGS.fov_night) * amb)
+        # TODO: add carried light sources, e.g., torch_bonus
+        torch_bonus = 0
+        return max(1, base + torch_bonus)
+
+    def _fov_key(self, pos: Position, radius: int) -> FovKey:
+        return (pos.x, pos.y, radius, self.opacity.version)
+
+    def _needs_cast(self, eid: EID, key: FovKey) -> bool:
+        """Return True unless `eid`'s tracked result still holds for `key`.
+
+        A result from an older opacity version still holds when no dirty
+        rectangle since then overlaps the viewer's radius box; it is re-tagged
+        with the new version instead of being recast.
+        """
+        tracker = self.fov_trackers.get(eid)
+        if tracker is None or tracker.key is None:
+            return True
+        if tracker.key == key:
+            return False
+        x, y, r, _ = key
+        old_x, old_y, old_r, old_version = tracker.key
+        if (old_x, old_y, old_r) == (x, y, r) and not self.opacity.dirty_since(
+            old_version, x - r, y - r, x + r + 1, y + r + 1
+        ):
+            tracker.retag(key)
+            return False
+        return True
+
+    def update_fov(self) -> None:
+        """Refresh `visible` and `explored` for every entity with a Position, in one batch.
+
+        Viewers whose origin and radius are unchanged, and whose radius box
+        no map edit has touched since, keep their published result. The rest
+        are grouped by origin so each distinct (x, y, radius) is shadowcast at
+        most once per tick, and cached results from earlier ticks are reused.
+        With `SETTINGS.fov_workers > 0` and at least `SETTINGS.fov_parallel_min`
+        uncached origins, the casts fan out to a process pool. Explored memory
+        only ORs in the cells each viewer's `FovTracker` reports as newly visible.
+        """
+        self.opacity.sync(self.tiles)
+        pending: dict[FovKey, list[EID]] = {}
+        for eid, pos in self.world.get(Position).items():
+            key = self._fov_key(pos, self.effective_radius(eid))
+            if self._needs_cast(eid, key):
+                pending.setdefault(key, []).append(eid)
+
+        computed = self._cast_many([key for key in pending if key not in self.fov_cache])
+        for key, eids in pending.items():
+            x, y, r, version = key
+            cast = partial(computed.pop, key) if key in computed else partial(self._cast, key)
+            vis = self.fov_cache.lookup(x, y, r, version, cast)
+            for eid in eids:
+                self._apply_fov(eid, key, vis)
+
+    def visible_for(self, eid: EID) -> Bitmap:
+        """Return `eid`'s visible cells, recomputing only if stale since the last pass.
+
+        Covers entities spawned, moved or affected by map edits since the
+        last tick; otherwise this is a dictionary lookup. Also brings
+        `explored[eid]` up to date.
+        """
+        self.opacity.sync(self.tiles)
+        key = self._fov_key(self.world.get(Position)[eid], self.effective_radius(eid))
+        if self._needs_cast(eid, key):
+            x, y, r, version = key
+            vis = self.fov_cache.lookup(x, y, r, version, partial(self._cast, key))
+            self._apply_fov(eid, key, vis)
+        return self.visible[eid]
+
+    def fov_delta(self, eid: EID) -> FovDelta | None:
+        """Return the change in `eid`'s visibility from its last FOV update, if any."""
+        return self.fov_deltas.get(eid)
+
+    def _apply_fov(self, eid: EID, key: FovKey, vis: Bitmap) -> None:
+        tracker = self.fov_trackers.get(eid)
+        if tracker is None:
+            tracker = self.fov_trackers[eid] = FovTracker()
+        delta = tracker.update(key, lambda: vis)
+        self.visible[eid] = delta.visible
+        self.fov_deltas[eid] = delta
+        explored = self.explored.get(eid)
+        if explored is None:
+            explored = self.explored[eid] = Bitmap(self.tiles.width, self.tiles.height)
+        explored.update(delta.added)
+
+    def _cast(self, key: FovKey) -> Bitmap:
+        x, y, r, _ = key
+        return shadowcast_grid(x, y, r, self.opacity, Bitmap(self.tiles.width, self.tiles.height))
+
+    def _cast_many(self, keys: list[FovKey]) -> dict[FovKey, Bitmap]:
+        """Shadowcast `keys` on a process pool when configured and worth it.
+
+        Chunked maps always cast inline: workers would need the whole map.
+        """
+        workers = SETTINGS.fov_workers
+        if (
+            workers <= 0
+            or len(keys) < max(1, SETTINGS.fov_parallel_min)
+            or isinstance(self.tiles, ChunkedMap)
+        ):
+            return {}
+        if self._fov_pool is None:
+            self._fov_pool = ProcessPoolExecutor(max_workers=workers)
+        grid = self.tiles
+        data = bytes(grid.data)
+        chunks = [keys[i::workers] for i in range(workers)]
+        futures = [
+            self._fov_pool.submit(
+                _fov_batch, grid.width, grid.height, data, [(x, y, r) for x, y, r, _ in chunk]
+            )
+            for chunk in chunks
+            if chunk
+        ]
+        out: dict[FovKey, Bitmap] = {}
+        for chunk, future in zip((c for c in chunks if c), futures, strict=True):
+            for key, rows in zip(chunk, future.result(), strict=True):
+                out[key] = Bitmap(grid.width, grid.height, rows)
+        return out
+
+    def close(self) -> None:
+        """Release background resources (the FOV process pool, if started)."""
+        if self._fov_pool is not None:
+            self._fov_pool.shutdown(cancel_futures=True)
+            self._fov_pool = None
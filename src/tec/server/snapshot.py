@@ -0,0 +1,85 @@
+"""Read-only views of simulation state for the network layer.
+
+`JsonServer` never touches `Simulation` internals directly; it reads through
+the `WorldView` protocol. Two implementations exist:
+
+- `Simulation` itself, when the sim ticks on the event-loop thread.
+- `Snapshot`, an immutable copy published once per tick by `SimThread`
+  (`tec.server.runner`) when the sim runs on its own thread. Publishing is a
+  single attribute assignment, so readers never lock and never see a
+  half-updated tick. Chunked maps are never copied whole, so they run
+  with `Simulation` as the view only.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Protocol
+
+from tec.shared.bitmap import Bitmap
+from tec.shared.chunks import WorldMap
+from tec.shared.components import Actor, Needs
+from tec.shared.grid import TileGrid
+from tec.shared.world import EID
+
+
+class WorldView(Protocol):
+    """What the network layer reads about the world."""
+
+    @property
+    def tiles(self) -> WorldMap: ...
+
+    def position(self, eid: EID) -> tuple[int, int]: ...
+
+    def actor(self, eid: EID) -> Actor: ...
+
+    def visible_for(self, eid: EID) -> Bitmap: ...
+
+    def explored_for(self, eid: EID) -> Bitmap: ...
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Immutable per-tick copy of everything `WorldView` exposes.
+
+    Containers are fresh per snapshot and their values are never mutated
+    after publication. Unchanged bitmaps and the tile grid are shared
+    between consecutive snapshots.
+
+    Attributes:
+        tick: Simulation tick this snapshot was taken after.
+        time_s: Simulated seconds at that tick.
+        tiles: Map as of this tick (a private copy, replaced on map edits).
+        positions: Entity positions.
+        actors: Copies of entity `Actor` components.
+        visible: Visible cells per viewer.
+        explored: Explored cells per viewer.
+        needs: Copies of entity `Needs` components.
+        generations: `World.generations` at this tick.
+        free: `World.free` at this tick (reuse order), so `persist` can
+            rebuild an identical world from the snapshot alone.
+    """
+
+    tick: int
+    time_s: float
+    tiles: TileGrid
+    positions: Mapping[EID, tuple[int, int]]
+    actors: Mapping[EID, Actor]
+    visible: Mapping[EID, Bitmap]
+    explored: Mapping[EID, Bitmap]
+    needs: Mapping[EID, Needs]
+    generations: tuple[int, ...]
+    free: tuple[int, ...]
+
+    def position(self, eid: EID) -> tuple[int, int]:
+        return self.positions[eid]
+
+    def actor(self, eid: EID) -> Actor:
+        return self.actors[eid]
+
+    def visible_for(self, eid: EID) -> Bitmap:
+        return self.visible[eid]
+
+    def explored_for(self, eid: EID) -> Bitmap:
+        return self.explored[eid]
@@ -18,16 +18,47 @@ class Settings:
     """
 
     tick_rate_hz: int = 10
+    # most ticks run back to back to catch up after a stall; the rest are skipped
+    tick_max_catchup: int = 5
+    # tick the simulation on its own thread and serve sockets from published snapshots
+    sim_thread: bool = False
+    # store Position/Actor/Needs as packed typed-array columns instead of one object each
+    # (less memory, slower per-tick systems on CPython; see tools/bench_systems.py)
+    columnar_components: bool = False
     map_width: int = 100
     map_height: int = 40
     seed: int = 1337
+    # build the world as lazily generated, evictable chunks (tec.shared.chunks) instead of
+    # one materialised grid; for very large worlds (no MAP message, no sim_thread snapshots)
+    chunked_map: bool = False
+    map_chunk: int = 64  # chunk edge length in tiles (a power of two)
+    max_resident_chunks: int = 256  # generated chunks kept in memory besides edited ones
+    # directory for generated maps keyed by (size, seed, generator version); None = no cache
+    map_cache_dir: str | None = None
+    # world file restored at startup and rewritten by periodic checkpoints; None = no persistence
+    world_file: str | None = None
+    checkpoint_every_s: float = 60.0
+    # append-only input journal replayed over the world file after a crash; None = no journal
+    journal_file: str | None = None
     listen_host: str = "127.0.0.1"  # change to 0.0.0.0 to accept LAN
     listen_port: int = 4000
 
+    # wire encoding the client asks for at LOGIN: "json" (JSONL) or "bin1" (binary frames)
+    wire_protocol: str = "json"
+    # seconds the server waits for LOGIN before falling back to JSON
+    login_timeout_s: float = 2.0
+    # per-session send queue bound and what happens to a client that falls behind it:
+    # "drop" (discard new messages) or "disconnect"
+    send_queue_max: int = 64
+    slow_consumer_policy: str = "drop"
+
     # viewport size
     view_w: int = 73  # server-sent viewport window width (odd number)
     view_h: int = 31  # height (odd number)
 
+    # send a full VIEW every N view frames; VIEW_DELTA patches in between
+    view_keyframe_every: int = 50
+
     # field of view distance
     fov_radius: int = 8
 
@@ -35,6 +66,13 @@ class Settings:
     fov_day: int = 9
     fov_night: int = 4
 
+    # shared FOV result cache size (entries keyed by origin, radius, map version)
+    fov_cache_size: int = 1024
+    # processes for the per-tick FOV pass (0 = compute inline on the sim thread)
+    fov_workers: int = 0
+    # uncached origins in one tick needed before fanning out to the pool
+    fov_parallel_min: int = 32
+
     # simple day/night cycle for now: number of seconds per full day
     day_seconds: int = 300  # 5 minutes for testing purposes
 
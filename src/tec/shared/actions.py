@@ -6,6 +6,7 @@ from typing import Literal
 class ActLogin:
     type: Literal["LOGIN"]
     name: str
+    proto: str = "json"  # server→client encoding: "json" or "bin1"
 
 
 @dataclass
@@ -25,3 +26,8 @@ Action = ActLogin | ActMove | ActWait
 # Action costs (server-side authoritative semantics)
 MOVE_COST = 1.0
 WAIT_COST = 1.0
+
+
+def is_step(dx: int, dy: int) -> bool:
+    """Return True if (dx, dy) is a one-tile move (each delta in -1..1)."""
+    return dx in (-1, 0, 1) and dy in (-1, 0, 1)
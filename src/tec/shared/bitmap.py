@@ -0,0 +1,152 @@
+"""Compact one-bit-per-cell sets of map coordinates.
+
+`Bitmap` replaces `set[tuple[int, int]]` for visibility and exploration.
+Each map row is a Python `int` used as a bit field (bit `x` = cell (x, y)):
+
+- Memory is one bit per cell, and rows nobody has touched stay at 0.
+- Union is a row-wise `|`, done in C, touching only non-empty rows.
+- A viewport row is one shift and mask, and renders to a '0'/'1' string
+  with a single `format` call, so encoders never loop per cell.
+
+It also supports the `in` / `add` / `update` / iteration subset of the
+`set` API, so code written against coordinate sets keeps working.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+Coord = tuple[int, int]
+
+_ASCII_BITS = bytes.maketrans(b"01", b"\x00\x01")  # '0'/'1' text -> 0/1 bytes
+
+
+class Bitmap:
+    """Set of in-bounds cells of a `width`×`height` map, one bit per cell.
+
+    Cells outside the map are silently ignored by `add`, so FOV results that
+    spill over the map edge can be collected directly.
+
+    Attributes:
+        width: Map width in tiles.
+        height: Map height in tiles.
+        rows: One int per row; bit `x` of `rows[y]` is cell (x, y).
+    """
+
+    __slots__ = ("width", "height", "rows")
+
+    def __init__(self, width: int, height: int, rows: list[int] | None = None) -> None:
+        """Create an empty bitmap, or wrap existing row ints (not copied)."""
+        if rows is not None and len(rows) != height:
+            raise ValueError(f"got {len(rows)} rows, expected {height}")
+        self.width = width
+        self.height = height
+        self.rows = rows if rows is not None else [0] * height
+
+    @classmethod
+    def from_cells(cls, width: int, height: int, cells: Iterable[Coord]) -> Bitmap:
+        """Build a bitmap from coordinates; out-of-bounds cells are dropped."""
+        bm = cls(width, height)
+        bm.update(cells)
+        return bm
+
+    def copy(self) -> Bitmap:
+        """Return an independent copy."""
+        return Bitmap(self.width, self.height, list(self.rows))
+
+    # ---------- set-like API ----------
+
+    def add(self, cell: Coord) -> None:
+        """Add one cell; ignored when outside the map."""
+        x, y = cell
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.rows[y] |= 1 << x
+
+    def discard(self, cell: Coord) -> None:
+        """Remove one cell if present."""
+        x, y = cell
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.rows[y] &= ~(1 << x)
+
+    def update(self, other: Bitmap | Iterable[Coord]) -> None:
+        """Add every cell of `other` (row-wise OR when shapes match)."""
+        if isinstance(other, Bitmap) and other.height == self.height:
+            rows = self.rows
+            for y, bits in enumerate(other.rows):
+                if bits:
+                    rows[y] |= bits
+            if other.width > self.width:
+                self._clip()
+            return
+        for cell in other:
+            self.add(cell)
+
+    def clear(self) -> None:
+        """Remove all cells."""
+        self.rows = [0] * self.height
+
+    def __contains__(self, cell: object) -> bool:
+        if not isinstance(cell, tuple) or len(cell) != 2:
+            return False
+        x, y = cell
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return bool((self.rows[y] >> x) & 1)
+        return False
+
+    def __len__(self) -> int:
+        return sum(bits.bit_count() for bits in self.rows)
+
+    def __bool__(self) -> bool:
+        return any(self.rows)
+
+    def __iter__(self) -> Iterator[Coord]:
+        for y, bits in enumerate(self.rows):
+            x = 0
+            while bits:
+                if bits & 1:
+                    yield (x, y)
+                # skip runs of zero bits in one step
+                step = 1 if bits & 1 else (bits & -bits).bit_length() - 1
+                bits >>= step
+                x += step
+
+    def __or__(self, other: Bitmap) -> Bitmap:
+        out = self.copy()
+        out.update(other)
+        return out
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Bitmap):
+            return (self.width, self.height, self.rows) == (other.width, other.height, other.rows)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Bitmap({self.width}x{self.height}, {len(self)} cells)"
+
+    # ---------- viewport extraction ----------
+
+    def row_bits(self, y: int, x0: int, w: int) -> int:
+        """Return cells `[x0, x0 + w)` of row `y` as an int (bit i = cell x0 + i)."""
+        if not 0 <= y < self.height or w <= 0:
+            return 0
+        bits = self.rows[y]
+        bits = bits >> x0 if x0 >= 0 else bits << -x0
+        return bits & ((1 << w) - 1)
+
+    def row_str(self, y: int, x0: int, w: int) -> str:
+        """Return cells `[x0, x0 + w)` of row `y` as a '0'/'1' string."""
+        if w <= 0:
+            return ""
+        return format(self.row_bits(y, x0, w), f"0{w}b")[::-1]
+
+    def window_str(self, x0: int, y0: int, w: int, h: int) -> str:
+        """Return a `w`×`h` window as a row-major '0'/'1' string."""
+        return "".join(self.row_str(y, x0, w) for y in range(y0, y0 + h))
+
+    def window_bytes(self, x0: int, y0: int, w: int, h: int) -> bytes:
+        """Return a `w`×`h` window as row-major bytes, 1 where set and 0 elsewhere."""
+        return self.window_str(x0, y0, w, h).encode("ascii").translate(_ASCII_BITS)
+
+    def _clip(self) -> None:
+        mask = (1 << self.width) - 1
+        self.rows = [bits & mask for bits in self.rows]
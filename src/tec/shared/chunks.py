@@ -0,0 +1,276 @@
+"""Chunked world map generated lazily, one fixed-size chunk at a time.
+
+`ChunkedMap` covers a `width`×`height` world without building it up front:
+
+- The world is split into `chunk`×`chunk` tiles. A chunk is generated the
+  first time a cell in it is read, from `chunk_seed(seed, cx, cy)`, so the
+  same world seed always yields the same chunk regardless of visiting order.
+- Generated chunks live in an LRU of at most `max_resident` entries;
+  `evict_far` drops the ones nobody is near. An evicted chunk is simply
+  regenerated on its next read.
+- Edited chunks (`set`) are kept aside and never regenerated, so edits
+  survive eviction.
+
+Each chunk is the `generate_map` cave for its seed with a plus-shaped
+corridor from its centre to the midpoint of each side, so neighbouring
+chunks always connect. The outermost world cells stay walls.
+
+The read API mirrors `TileGrid` (`is_floor`, `is_opaque`, `row_span`,
+`crop`, `base_window`, `version`). With `SETTINGS.chunked_map` on,
+`Simulation` builds its world as a `ChunkedMap`: movement and FOV read it
+through `ChunkedOpacity` (FOV crops the radius box), VIEW messages carry
+their window's base layer instead of a whole-map MAP, and each tick
+evicts chunks no player is near.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from tec.shared.grid import FLOOR, WALL, TileGrid, next_version
+from tec.shared.mapgen import generate_map
+
+ChunkKey = tuple[int, int]
+
+_MASK64 = (1 << 64) - 1
+
+
+def chunk_seed(seed: int, cx: int, cy: int) -> int:
+    """Return the generator seed for chunk (cx, cy) of a world seeded `seed`."""
+    h = (seed * 0x9E3779B97F4A7C15 + cx * 0xBF58476D1CE4E5B9 + cy * 0x94D049BB133111EB) & _MASK64
+    h ^= h >> 31
+    h = (h * 0xD6E8FEB86659FD93) & _MASK64
+    return h ^ (h >> 32)
+
+
+def generate_chunk(size: int, seed: int) -> bytearray:
+    """Return one `size`×`size` chunk (row-major, 1=floor) for `seed`."""
+    data = generate_map(size, size, seed).data
+    mid = size // 2
+    data[mid * size : (mid + 1) * size] = b"\x01" * size
+    data[mid::size] = b"\x01" * size
+    return data
+
+
+class ChunkedMap:
+    """World map made of lazily generated, evictable chunks.
+
+    Attributes:
+        width: World width in tiles.
+        height: World height in tiles.
+        seed: World seed; chunk seeds derive from it.
+        chunk: Chunk edge length in tiles (a power of two).
+        max_resident: Generated chunks kept in memory (edited chunks aside).
+        version: Map version; changes on every `set()`.
+        generated: Chunks generated so far (including regenerations).
+        evicted: Chunks dropped from the LRU so far.
+    """
+
+    def __init__(
+        self, width: int, height: int, seed: int, chunk: int = 64, max_resident: int = 256
+    ) -> None:
+        """Describe a world; nothing is generated until a cell is read.
+
+        Raises:
+            ValueError: If dimensions are negative, `chunk` is not a power of
+                two >= 4, or `max_resident` < 1.
+        """
+        if width < 0 or height < 0:
+            raise ValueError(f"map dimensions must be >= 0, got {width}x{height}")
+        if chunk < 4 or chunk & (chunk - 1):
+            raise ValueError(f"chunk must be a power of two >= 4, got {chunk}")
+        if max_resident < 1:
+            raise ValueError(f"max_resident must be >= 1, got {max_resident}")
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.chunk = chunk
+        self.max_resident = max_resident
+        self.version = next_version()
+        self.generated = 0
+        self.evicted = 0
+        self._shift = chunk.bit_length() - 1
+        self._resident: OrderedDict[ChunkKey, bytearray] = OrderedDict()
+        self._edited: dict[ChunkKey, bytearray] = {}
+
+    # ---------- chunks ----------
+
+    def chunk_data(self, cx: int, cy: int) -> bytearray:
+        """Return chunk (cx, cy)'s cells, generating it if needed.
+
+        Raises:
+            IndexError: If the chunk lies outside the world.
+        """
+        key = (cx, cy)
+        data = self._edited.get(key)
+        if data is not None:
+            return data
+        data = self._resident.get(key)
+        if data is not None:
+            self._resident.move_to_end(key)
+            return data
+        size = self.chunk
+        if not (0 <= cx * size < self.width and 0 <= cy * size < self.height):
+            raise IndexError(f"chunk {key} outside {self.width}x{self.height} map")
+        data = generate_chunk(size, chunk_seed(self.seed, cx, cy))
+        self._seal_border(cx, cy, data)
+        self.generated += 1
+        self._resident[key] = data
+        while len(self._resident) > self.max_resident:
+            self._resident.popitem(last=False)
+            self.evicted += 1
+        return data
+
+    def resident(self) -> list[ChunkKey]:
+        """Return the keys of generated chunks in memory, least recent first."""
+        return list(self._resident)
+
+    def evict_far(self, points: Iterable[tuple[int, int]], margin: int = 1) -> int:
+        """Drop resident chunks more than `margin` chunks away from every point.
+
+        Args:
+            points: Tile positions to keep chunks around (e.g. players).
+            margin: Chebyshev distance, in chunks, that counts as near.
+
+        Returns:
+            Number of chunks evicted.
+        """
+        s = self._shift
+        near = {
+            (cx + dx, cy + dy)
+            for cx, cy in {(x >> s, y >> s) for x, y in points}
+            for dx in range(-margin, margin + 1)
+            for dy in range(-margin, margin + 1)
+        }
+        far = [key for key in self._resident if key not in near]
+        for key in far:
+            del self._resident[key]
+        self.evicted += len(far)
+        return len(far)
+
+    def stats(self) -> dict[str, int]:
+        """Return chunk counters (resident, edited, generated, evicted)."""
+        return {
+            "resident": len(self._resident),
+            "edited": len(self._edited),
+            "generated": self.generated,
+            "evicted": self.evicted,
+        }
+
+    def edited_chunks(self) -> dict[ChunkKey, bytes]:
+        """Return a copy of every edited chunk's cells, e.g. for saving the world."""
+        return {key: bytes(data) for key, data in self._edited.items()}
+
+    def restore_chunk(self, cx: int, cy: int, data: bytes) -> None:
+        """Install saved cells for chunk (cx, cy) as an edited chunk.
+
+        Raises:
+            IndexError: If the chunk lies outside the world.
+            ValueError: If `data` is not one chunk's worth of cells.
+        """
+        size = self.chunk
+        if not (0 <= cx * size < self.width and 0 <= cy * size < self.height):
+            raise IndexError(f"chunk {(cx, cy)} outside {self.width}x{self.height} map")
+        if len(data) != size * size:
+            raise ValueError(f"chunk data is {len(data)} bytes, expected {size * size}")
+        self._resident.pop((cx, cy), None)
+        self._edited[cx, cy] = bytearray(data)
+        self.version = next_version()
+
+    def _seal_border(self, cx: int, cy: int, data: bytearray) -> None:
+        """Wall the world's outermost cells that fall inside chunk (cx, cy)."""
+        size = self.chunk
+        x0, y0 = cx * size, cy * size
+        for y in range(y0, min(y0 + size, self.height)):
+            for x in (0, self.width - 1):
+                if x0 <= x < x0 + size:
+                    data[(y - y0) * size + x - x0] = WALL
+        for y in (0, self.height - 1):
+            if y0 <= y < y0 + size:
+                row = (y - y0) * size
+                lo, hi = max(0, -x0), min(size, self.width - x0)
+                data[row + lo : row + hi] = bytes(hi - lo)
+
+    # ---------- lookup ----------
+
+    def start(self) -> tuple[int, int]:
+        """Return a floor cell near the world centre: the centre chunk's corridor crossing."""
+        s, half = self._shift, self.chunk // 2
+        x = min((((self.width // 2) >> s) << s) + half, self.width - 2)
+        y = min((((self.height // 2) >> s) << s) + half, self.height - 2)
+        return max(0, x), max(0, y)
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """Return True if (x, y) lies inside the world."""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_floor(self, x: int, y: int) -> bool:
+        """Return True if (x, y) is walkable; out-of-bounds cells are walls."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        s, m = self._shift, self.chunk - 1
+        return self.chunk_data(x >> s, y >> s)[((y & m) << s) + (x & m)] != WALL
+
+    def is_opaque(self, x: int, y: int) -> bool:
+        """Return True if (x, y) blocks light; out-of-bounds cells are opaque."""
+        return not self.is_floor(x, y)
+
+    def set(self, x: int, y: int, floor: bool) -> None:
+        """Set one cell; its chunk is then kept for good (never regenerated).
+
+        Raises:
+            IndexError: If (x, y) is out of bounds.
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"cell ({x}, {y}) outside {self.width}x{self.height} map")
+        s, m = self._shift, self.chunk - 1
+        key = (x >> s, y >> s)
+        data = self.chunk_data(*key)
+        if key not in self._edited:
+            self._edited[key] = data
+            self._resident.pop(key, None)
+        data[((y & m) << s) + (x & m)] = FLOOR if floor else WALL
+        self.version = next_version()
+
+    # ---------- slicing ----------
+
+    def row_span(self, y: int, x0: int, w: int) -> bytes:
+        """Return cells `[x0, x0 + w)` of row `y`, padding off-map cells with walls."""
+        if w <= 0:
+            return b""
+        lo, hi = max(0, x0), min(self.width, x0 + w)
+        if not 0 <= y < self.height or lo >= hi:
+            return bytes(w)
+        s, size = self._shift, self.chunk
+        cy, row = y >> s, (y & (size - 1)) << s
+        parts: list[bytes | bytearray] = [bytes(lo - x0)]
+        x = lo
+        while x < hi:
+            cx = x >> s
+            end = min(hi, (cx + 1) << s)
+            start = row + x - (cx << s)
+            parts.append(self.chunk_data(cx, cy)[start : start + end - x])
+            x = end
+        parts.append(bytes(x0 + w - hi))
+        return b"".join(parts)
+
+    def crop(self, x0: int, y0: int, w: int, h: int) -> TileGrid:
+        """Return a `TileGrid` copy of the `w`×`h` window at (x0, y0); off-map cells are walls."""
+        w, h = max(0, w), max(0, h)
+        return TileGrid(
+            w, h, bytearray(b"".join(self.row_span(y, x0, w) for y in range(y0, y0 + h)))
+        )
+
+    def base_window(self, x0: int, y0: int, w: int, h: int) -> bytes:
+        """Return the '.'/'#' glyphs of a window (see `TileGrid.base_window`)."""
+        return self.crop(x0, y0, w, h).base_glyphs()
+
+    def __repr__(self) -> str:
+        return (
+            f"ChunkedMap({self.width}x{self.height}, chunk={self.chunk}, "
+            f"{len(self._resident)} resident)"
+        )
+
+
+WorldMap = TileGrid | ChunkedMap  # either kind of world map a `Simulation` runs on
@@ -0,0 +1,181 @@
+"""Struct-of-arrays storage for numeric components.
+
+`ColumnTable` stores every instance of one numeric dataclass component as
+parallel `array.array` columns (one per field) indexed by a dense slot:
+
+- `slots` maps eid -> slot (the sparse side), `eids` maps slot -> eid
+  (the dense side); removal swaps the last slot into the hole, so columns
+  stay packed and iteration order is slot order.
+- A float field costs 8 bytes per entity instead of a Python object, and
+  whole columns can be processed at C speed (`map`, `sum`, slicing).
+
+It is a `MutableMapping[EID, T]`, so `World.get` callers keep working:
+`table[eid]` returns a live row view whose attributes read and write the
+columns, and `table[eid] = comp` copies the component's fields in. Unlike
+dict tables, the stored value is not the object passed in; mutate through
+`table[eid]`.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import struct
+from array import array
+from collections.abc import Iterable, Iterator, MutableMapping
+from typing import Any, Generic, TypeVar, cast
+
+from tec.shared.world import EID
+
+T = TypeVar("T")
+
+_TYPECODES: dict[object, str] = {int: "q", float: "d", "int": "q", "float": "d"}
+
+
+def typecodes(ctype: type[Any]) -> dict[str, str]:
+    """Return the `array` typecode of each field of a numeric dataclass, in order.
+
+    Raises:
+        TypeError: If `ctype` is not a dataclass of int/float fields.
+    """
+    if not dataclasses.is_dataclass(ctype):
+        raise TypeError(f"{ctype.__name__} is not a dataclass")
+    codes: dict[str, str] = {}
+    for f in dataclasses.fields(ctype):
+        code = _TYPECODES.get(f.type)
+        if code is None:
+            raise TypeError(f"{ctype.__name__}.{f.name}: {f.type!r} is not int or float")
+        codes[f.name] = code
+    return codes
+
+
+def overwrite(col: array[Any], values: Iterable[Any]) -> None:
+    """Write `len(col)` new `values` into `col` in place with one `struct.pack_into`.
+
+    The column keeps its buffer; no intermediate list or array is built.
+
+    Raises:
+        struct.error: If `values` does not yield exactly `len(col)` items.
+    """
+    _packer(col.typecode, len(col)).pack_into(col, 0, *values)
+
+
+@functools.lru_cache(maxsize=64)
+def _packer(code: str, count: int) -> struct.Struct:
+    return struct.Struct(f"={count}{code}")
+
+
+class ColumnTable(MutableMapping[EID, T], Generic[T]):
+    """Columnar table for a dataclass whose fields are all `int` or `float`.
+
+    Attributes:
+        ctype: Component class stored here.
+        names: Field names, in declaration order.
+        columns: One typed array per field, indexed by slot.
+        eids: Entity id stored in each slot.
+        slots: Slot of each stored entity.
+    """
+
+    def __init__(self, ctype: type[T]) -> None:
+        """Create an empty table for `ctype`.
+
+        Raises:
+            TypeError: If `ctype` is not a dataclass of int/float fields.
+        """
+        codes = typecodes(ctype)
+        self.ctype = ctype
+        self.names: tuple[str, ...] = tuple(codes)
+        self.columns: dict[str, array[Any]] = {name: array(code) for name, code in codes.items()}
+        self.eids: array[int] = array("q")
+        self.slots: dict[EID, int] = {}
+        self._row_type = _row_class(ctype, self.names)
+
+    # ---------- mapping API ----------
+
+    def __getitem__(self, eid: EID) -> T:
+        if eid not in self.slots:
+            raise KeyError(eid)
+        return cast(T, self._row_type(self, eid))
+
+    def __setitem__(self, eid: EID, comp: T) -> None:
+        slot = self.slots.get(eid)
+        if slot is None:
+            self.slots[eid] = len(self.eids)
+            self.eids.append(eid)
+            for name in self.names:
+                self.columns[name].append(getattr(comp, name))
+            return
+        for name in self.names:
+            self.columns[name][slot] = getattr(comp, name)
+
+    def __delitem__(self, eid: EID) -> None:
+        slot = self.slots.pop(eid)
+        last = len(self.eids) - 1
+        if slot != last:
+            moved = self.eids[last]
+            self.eids[slot] = moved
+            self.slots[moved] = slot
+            for col in self.columns.values():
+                col[slot] = col[last]
+        self.eids.pop()
+        for col in self.columns.values():
+            col.pop()
+
+    def __iter__(self) -> Iterator[EID]:
+        return iter(self.eids.tolist())
+
+    def __len__(self) -> int:
+        return len(self.eids)
+
+    def __contains__(self, eid: object) -> bool:
+        return eid in self.slots
+
+    # ---------- columnar API ----------
+
+    def column(self, name: str) -> array[Any]:
+        """Return the live array for field `name` (slot order, see `eids`)."""
+        return self.columns[name]
+
+    def detach(self, eid: EID) -> T:
+        """Return an independent `ctype` instance with `eid`'s current values."""
+        slot = self.slots[eid]
+        return self.ctype(**{name: self.columns[name][slot] for name in self.names})
+
+
+def _row_class(ctype: type[Any], names: tuple[str, ...]) -> type[Any]:
+    """Build a proxy class exposing each column of one entity as an attribute."""
+
+    def make_property(name: str) -> property:
+        def get(self: Any) -> Any:
+            table = self._table
+            return table.columns[name][table.slots[self._eid]]
+
+        def set_(self: Any, value: Any) -> None:
+            table = self._table
+            table.columns[name][table.slots[self._eid]] = value
+
+        return property(get, set_)
+
+    def init(self: Any, table: ColumnTable[Any], eid: EID) -> None:
+        self._table = table
+        self._eid = eid
+
+    def repr_(self: Any) -> str:
+        body = ", ".join(f"{name}={getattr(self, name)!r}" for name in names)
+        return f"{ctype.__name__}({body})"
+
+    def eq(self: Any, other: object) -> bool:
+        if not (isinstance(other, ctype) or type(other) is type(self)):
+            return False
+        return all(getattr(self, n) == getattr(other, n) for n in names)
+
+    namespace: dict[str, Any] = {
+        "__slots__": ("_table", "_eid"),
+        "__init__": init,
+        "__repr__": repr_,
+        "__eq__": eq,
+        "__hash__": None,
+    }
+    for name in names:
+        namespace[name] = make_property(name)
+    return type(f"{ctype.__name__}Row", (), namespace)
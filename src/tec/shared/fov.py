@@ -1,17 +1,57 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from math import isqrt
+from typing import Generic, Protocol, TypeVar, overload
+
+from tec.shared.bitmap import Bitmap
+from tec.shared.grid import TileGrid
+from tec.shared.opacity import ChunkedOpacity, OpacityLayer
 
 Coord = tuple[int, int]
 OpaqueFn = Callable[[int, int], bool]  # (x, y) -> True if this cell BLOCKS light
 
 
-def shadowcast(px: int, py: int, radius: int, is_opaque: OpaqueFn) -> set[Coord]:
+class CellSink(Protocol):
+    """Anything that collects visible cells: a `set` or a `Bitmap`."""
+
+    def add(self, cell: Coord, /) -> None: ...
+
+
+S = TypeVar("S", bound=CellSink)
+
+
+@overload
+def shadowcast(px: int, py: int, radius: int, is_opaque: OpaqueFn) -> set[Coord]: ...
+
+
+@overload
+def shadowcast(px: int, py: int, radius: int, is_opaque: OpaqueFn, out: S) -> S: ...
+
+
+def shadowcast(
+    px: int, py: int, radius: int, is_opaque: OpaqueFn, out: CellSink | None = None
+) -> CellSink:
     """Symmetric Shadowcasting with a Euclidean cutoff (rounded FOV).
 
     The blocking cells themselves are considered visible.
+
+    Args:
+        px: Viewer x in tiles.
+        py: Viewer y in tiles.
+        radius: Euclidean sight radius in tiles.
+        is_opaque: Returns True for cells that block light.
+        out: Collector for visible cells, e.g. a `Bitmap` sized to the map.
+            Defaults to a fresh `set`.
+
+    Returns:
+        `out` (or the new set) holding every visible cell.
     """
-    visible: set[Coord] = {(px, py)}
+    visible: CellSink = set() if out is None else out
+    visible.add((px, py))
 
     octants = (
         (+1, 0, 0, -1),  # NNE
@@ -40,7 +80,7 @@ def _cast_octant(
     radius: int,
     is_opaque: OpaqueFn,
     octant: tuple[int, int, int, int],
-    out: set[Coord],
+    out: CellSink,
 ) -> None:
     xx, xy, yx, yy = octant
     start_slope = -1.0
@@ -103,7 +143,7 @@ def _cast_deeper(
     octant: tuple[int, int, int, int],
     start_slope: float,
     end_slope: float,
-    out: set[Coord],
+    out: CellSink,
 ) -> None:
     xx, xy, yx, yy = octant
 
@@ -145,3 +185,394 @@ def _cast_deeper(
 
         if prev_blocked:
             break
+
+
+# ---------- iterative kernel ----------
+
+_OCTANTS = (
+    (+1, 0, 0, -1),  # NNE
+    (0, +1, +1, 0),  # ENE
+    (0, +1, -1, 0),  # ESE
+    (+1, 0, 0, +1),  # SSE
+    (-1, 0, 0, +1),  # SSW
+    (0, -1, -1, 0),  # WSW
+    (0, -1, +1, 0),  # WNW
+    (-1, 0, 0, -1),  # NNW
+)
+
+
+@lru_cache(maxsize=64)
+def _radius_limits(radius: int) -> tuple[int, ...]:
+    """Return, per row 0..radius, the largest |col| with col² + row² <= radius²."""
+    r2 = radius * radius
+    return tuple(isqrt(r2 - row * row) for row in range(radius + 1))
+
+
+GridSource = TileGrid | OpacityLayer | ChunkedOpacity
+
+
+@overload
+def shadowcast_grid(px: int, py: int, radius: int, grid: GridSource) -> set[Coord]: ...
+
+
+@overload
+def shadowcast_grid(px: int, py: int, radius: int, grid: GridSource, out: S) -> S: ...
+
+
+def shadowcast_grid(
+    px: int, py: int, radius: int, grid: GridSource, out: CellSink | None = None
+) -> CellSink:
+    """Iterative, allocation-light `shadowcast` reading opacity straight from a grid.
+
+    Produces exactly the same cells as `shadowcast(px, py, radius,
+    grid.is_opaque, out)`, including its scan quirks, but:
+
+    - recursion is replaced by an explicit stack of pending scans;
+    - slopes are integer fractions compared by cross-multiplication (row
+      bounds still round the same float products as `shadowcast`, which
+      keeps rounding ties identical);
+    - the Euclidean cutoff is a precomputed per-row column limit instead
+      of a `_within_euclid` call per cell;
+    - each scanned row is read from `grid.data` as one byte slice, and only
+      wall/floor boundaries (found with `bytes.find`) are visited in Python;
+    - visible cells of a row form one interval and are marked as a bit mask.
+
+    Args:
+        px: Viewer x in tiles.
+        py: Viewer y in tiles.
+        radius: Euclidean sight radius in tiles.
+        grid: World tile grid (0 = wall, 1 = floor), the simulation's padded
+            `OpacityLayer`, whose border lets edge rows be sliced directly, or
+            a `ChunkedOpacity`, of which only the radius box is read (via
+            `crop`). Off-map cells are opaque in every case.
+        out: Collector for visible cells (a `set` by default, or a `Bitmap`).
+
+    Returns:
+        `out` (or the new set) holding every visible cell.
+    """
+    visible: CellSink = set() if out is None else out
+    if radius < 0:
+        visible.add((px, py))
+        return visible
+    limits = _radius_limits(radius)
+    # Read cells from `src` at (rx, ry)-relative coordinates; report at (px, py).
+    if isinstance(grid, OpacityLayer):
+        src, rx, ry = grid.padded, px + 1, py + 1
+    elif isinstance(grid, ChunkedOpacity):
+        side = 2 * radius + 3
+        src, rx, ry = (
+            grid.crop(px - radius - 1, py - radius - 1, side, side),
+            radius + 1,
+            radius + 1,
+        )
+    else:
+        src, rx, ry = grid, px, py
+    width, height, data = src.width, src.height, src.data
+    # acc[dy + radius] bit (dx + radius) marks cell (px + dx, py + dy) visible.
+    acc = [0] * (2 * radius + 1)
+    acc[radius] = 1 << radius
+
+    for xx, xy, yx, yy in _OCTANTS:
+        horizontal = yx == 0  # octant rows run along x (else along y)
+        # Scan state: (first row, start num/den, end num/den, is top-level scan).
+        # The top-level scan carries its narrowed start slope into the next
+        # row; deeper scans (the old `_cast_deeper`) keep their bounds fixed.
+        stack: list[tuple[int, int, int, int, int, bool]] = [(1, -1, 1, 1, 1, True)]
+        while stack:
+            first, sn, sd, en, ed, top = stack.pop()
+            for row in range(first, radius + 1):
+                if sn * ed > en * sd:
+                    break
+                two_row = 2 * row
+                lim = limits[row]
+                col_lo = int(round(row * (sn / sd)))
+                if col_lo < -lim:
+                    col_lo = -lim
+                col_hi = int(round(row * (en / ed)))
+                if col_hi > lim:
+                    col_hi = lim
+                if col_lo > col_hi:
+                    continue
+                n = col_hi - col_lo + 1
+                seg: bytes | bytearray
+                bx = rx + row * xy
+                by = ry + row * yy
+
+                # Visible: right slope >= start and left slope <= end. Both are
+                # monotone in col, so the visible cells form one interval.
+                a = -((sd - two_row * sn) // (2 * sd))
+                if a < col_lo:
+                    a = col_lo
+                b = (two_row * en + ed) // (2 * ed)
+                if b > col_hi:
+                    b = col_hi
+
+                if horizontal:
+                    if a <= b:
+                        lo = bx - rx + (a if xx > 0 else -b) + radius
+                        acc[by - ry + radius] |= ((1 << (b - a + 1)) - 1) << lo
+                    x0 = bx + col_lo if xx > 0 else bx - col_hi  # leftmost buffer x
+                    if 0 <= by < height and x0 >= 0 and x0 + n <= width:
+                        start = by * width + x0
+                        seg = data[start : start + n]
+                        if xx < 0:
+                            seg.reverse()
+                    else:
+                        seg = _line(src, bx + col_lo * xx, by, xx, 0, n)
+                else:
+                    if a <= b:
+                        bit = 1 << (bx - rx + radius)
+                        for col in range(a, b + 1):
+                            acc[by - ry + col * yx + radius] |= bit
+                    seg = _line(src, bx, by + col_lo * yx, 0, yx, n)
+
+                # Walk wall runs: a wall after floor opens a deeper scan, the
+                # first floor after walls moves the running start slope.
+                cn, cd = sn, sd
+                prev_blocked = False
+                i = seg.find(0)
+                while i >= 0:
+                    rn = 2 * (col_lo + i) + 1
+                    stack.append((row + 1, cn, cd, rn, two_row, False))
+                    cn, cd = rn, two_row
+                    j = seg.find(1, i + 1)
+                    if j < 0:
+                        prev_blocked = True
+                        break
+                    cn = 2 * (col_lo + j) - 1
+                    i = seg.find(0, j + 1)
+                if top:
+                    sn, sd = cn, cd
+                if prev_blocked:
+                    break
+
+    _flush_rows(acc, px - radius, py - radius, visible)
+    return visible
+
+
+def _line(grid: TileGrid, x: int, y: int, dx: int, dy: int, n: int) -> bytes | bytearray:
+    """Return `n` cells from (x, y) stepping by (dx, dy), off-map cells as walls.
+
+    Exactly one of `dx`/`dy` is ±1. Rows are plain slices of the grid
+    buffer; columns are strided slices.
+    """
+    width, height = grid.width, grid.height
+    if dy == 0:
+        if not 0 <= y < height:
+            return bytes(n)
+        lo_x = x if dx > 0 else x - n + 1  # leftmost world x of the run
+        lo = max(0, lo_x)
+        hi = min(width, lo_x + n)
+        if lo >= hi:
+            return bytes(n)
+        base = y * width
+        cells = bytes(lo - lo_x) + grid.data[base + lo : base + hi] + bytes(lo_x + n - hi)
+    else:
+        if not 0 <= x < width:
+            return bytes(n)
+        lo_y = y if dy > 0 else y - n + 1  # topmost world y of the run
+        lo = max(0, lo_y)
+        hi = min(height, lo_y + n)
+        if lo >= hi:
+            return bytes(n)
+        cells = (
+            bytes(lo - lo_y)
+            + grid.data[lo * width + x : (hi - 1) * width + x + 1 : width]
+            + bytes(lo_y + n - hi)
+        )
+    return cells if (dx if dy == 0 else dy) > 0 else cells[::-1]
+
+
+def _flush_rows(acc: list[int], x0: int, y0: int, out: CellSink) -> None:
+    """Copy per-row hit masks (bit i = cell x0 + i) into `out`."""
+    if isinstance(out, Bitmap):
+        width_mask = (1 << out.width) - 1
+        for i, bits in enumerate(acc):
+            y = y0 + i
+            if bits and 0 <= y < out.height:
+                out.rows[y] |= (bits << x0 if x0 >= 0 else bits >> -x0) & width_mask
+        return
+    for i, bits in enumerate(acc):
+        y = y0 + i
+        x = x0
+        while bits:
+            if bits & 1:
+                out.add((x, y))
+            bits >>= 1
+            x += 1
+
+
+V = TypeVar("V")
+FovKey = tuple[int, int, int, int]  # (x, y, radius, map version)
+
+
+class FovCache(Generic[V]):
+    """LRU cache of FOV results keyed by (origin, radius, map version).
+
+    Players standing still, or several players on the same tile, share one
+    shadowcast. Entries for an old map version are never hit again and age
+    out through LRU eviction. Cached results are shared between callers and
+    must be treated as read-only.
+
+    Attributes:
+        capacity: Maximum number of cached results.
+        hits: Lookups answered from the cache.
+        misses: Lookups that had to compute.
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity = max(1, capacity)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[FovKey, V] = OrderedDict()
+
+    def lookup(self, px: int, py: int, radius: int, version: int, compute: Callable[[], V]) -> V:
+        """Return the cached result for the key, calling `compute()` on a miss.
+
+        Args:
+            px: Viewer x in tiles.
+            py: Viewer y in tiles.
+            radius: Sight radius in tiles.
+            version: Map version the result depends on (`TileGrid.version`).
+            compute: Zero-argument callable producing the FOV result.
+
+        Returns:
+            The (possibly shared) FOV result.
+        """
+        key = (px, py, radius, version)
+        entries = self._entries
+        hit = entries.get(key)
+        if hit is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return hit
+        self.misses += 1
+        result = compute()
+        entries[key] = result
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        """True if an `(x, y, radius, version)` key is cached (no LRU/counter update)."""
+        return key in self._entries
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache (0.0 before any lookup)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, float]:
+        """Return counters for monitoring: hits, misses, size, hit_ratio."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "hit_ratio": self.hit_ratio,
+        }
+
+
+@dataclass(frozen=True)
+class FovDelta:
+    """One viewer's visible cells plus what changed since its previous result.
+
+    Attributes:
+        visible: Current visible cells (possibly shared; read-only).
+        added: Cells visible now but not before.
+        removed: Cells visible before but not now.
+        full: True when there was no comparable previous result (first cast,
+            radius change, map edit, or a jump of more than one tile).
+    """
+
+    visible: Bitmap
+    added: Bitmap
+    removed: Bitmap
+    full: bool
+
+
+class FovTracker:
+    """Per-viewer FOV state that turns successive results into `FovDelta`s.
+
+    Shadowcasting from a new origin changes every slope, so no octant of the
+    previous result can be reused soundly; a step is recast with
+    `shadowcast_grid` (usually through `FovCache`). What a step does bound is
+    the set of rows that can differ: only rows within `radius` of the old or
+    new origin, so the added/removed diff touches at most `2 * radius + 2`
+    rows instead of the whole map.
+
+    Attributes:
+        key: `(x, y, radius, map version)` of `visible`, or None before the first update.
+        visible: Last visible cells returned.
+        steps: Updates handled as a single-tile step.
+        full: Updates that diffed against no comparable previous result.
+        reused: Updates whose key was unchanged (no cast at all).
+    """
+
+    __slots__ = ("key", "visible", "steps", "full", "reused")
+
+    def __init__(self) -> None:
+        self.key: FovKey | None = None
+        self.visible: Bitmap | None = None
+        self.steps = 0
+        self.full = 0
+        self.reused = 0
+
+    def retag(self, key: FovKey) -> None:
+        """Re-key the current result after a map edit that provably cannot affect it."""
+        self.key = key
+
+    def update(self, key: FovKey, compute: Callable[[], Bitmap]) -> FovDelta:
+        """Return the visibility for `key`, computing it only if the key changed.
+
+        Args:
+            key: `(x, y, radius, map version)` of the viewer now.
+            compute: Zero-argument callable producing the visible `Bitmap` for `key`.
+
+        Returns:
+            The new visible cells and the cells added/removed since the last update.
+        """
+        prev, prev_key = self.visible, self.key
+        if prev is not None and key == prev_key:
+            self.reused += 1
+            empty = Bitmap(prev.width, prev.height)
+            return FovDelta(prev, empty, empty, False)
+        cur = compute()
+        self.key, self.visible = key, cur
+        x, y, radius, version = key
+        if (
+            prev is None
+            or prev_key is None
+            or (prev.width, prev.height) != (cur.width, cur.height)
+            or prev_key[2:] != (radius, version)
+            or max(abs(prev_key[0] - x), abs(prev_key[1] - y)) > 1
+        ):
+            self.full += 1
+            if prev is None or (prev.width, prev.height) != (cur.width, cur.height):
+                return FovDelta(cur, cur, Bitmap(cur.width, cur.height), True)
+            added, removed = diff_rows(prev, cur, 0, cur.height)
+            return FovDelta(cur, added, removed, True)
+        self.steps += 1
+        y0, y1 = min(y, prev_key[1]) - radius, max(y, prev_key[1]) + radius + 1
+        added, removed = diff_rows(prev, cur, y0, y1)
+        return FovDelta(cur, added, removed, False)
+
+
+def diff_rows(prev: Bitmap, cur: Bitmap, y0: int, y1: int) -> tuple[Bitmap, Bitmap]:
+    """Return (added, removed) between two same-shape bitmaps, comparing rows `[y0, y1)`."""
+    added = Bitmap(cur.width, cur.height)
+    removed = Bitmap(cur.width, cur.height)
+    old_rows, new_rows = prev.rows, cur.rows
+    for y in range(max(0, y0), min(cur.height, y1)):
+        old, new = old_rows[y], new_rows[y]
+        if old != new:
+            added.rows[y] = new & ~old
+            removed.rows[y] = old & ~new
+    return added, removed
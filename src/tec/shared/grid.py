@@ -0,0 +1,234 @@
+"""Compact tile grid backed by one contiguous byte buffer.
+
+`TileGrid` stores the world map as a row-major `bytearray` with one byte per
+cell (1 = floor, 0 = wall). It replaces the old `list[list[bool]]` layout:
+
+- `grid[y]` returns a zero-copy `memoryview` of row `y`, so legacy
+  `tiles[y][x]` / `len(tiles)` / `len(tiles[0])` code keeps working.
+- Viewport extraction and glyph encoding become buffer slices and
+  `bytes.translate` calls instead of per-cell Python indexing.
+
+Coordinates follow the rest of the engine: (0, 0) is the top-left tile.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Iterator, Sequence
+
+FLOOR = 1
+WALL = 0
+
+# Lookup tables for `bytes.translate`: cell byte -> glyph byte.
+_BASE_GLYPHS = bytes([ord("#"), ord(".")]) + bytes(254)
+_WALL_GLYPH = b"#"
+
+# Versions are drawn from one process-wide counter so a replaced grid can
+# never reuse a version a client already cached.
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    """Return a fresh map version from the shared counter (see `TileGrid.version`)."""
+    return next(_versions)
+
+
+class TileGrid:
+    """Row-major grid of walkable cells stored in a single `bytearray`.
+
+    Attributes:
+        width: Number of columns.
+        height: Number of rows.
+        data: Row-major cell buffer; index `y * width + x`. Write through
+            `set()` so `version` and cached layers stay in sync.
+        version: Map version; changes on every `set()`.
+    """
+
+    __slots__ = ("width", "height", "data", "version", "_base_cache")
+
+    def __init__(self, width: int, height: int, data: bytearray | None = None) -> None:
+        """Create a grid, all walls unless `data` is given.
+
+        Args:
+            width: Number of columns (>= 0).
+            height: Number of rows (>= 0).
+            data: Optional pre-filled buffer of exactly `width * height` bytes.
+
+        Raises:
+            ValueError: If dimensions are negative or `data` has the wrong size.
+        """
+        if width < 0 or height < 0:
+            raise ValueError(f"grid dimensions must be >= 0, got {width}x{height}")
+        if data is None:
+            data = bytearray(width * height)
+        elif len(data) != width * height:
+            raise ValueError(f"buffer holds {len(data)} cells, expected {width * height}")
+        self.width = width
+        self.height = height
+        self.data = data
+        self.version = next(_versions)
+        self._base_cache: tuple[int, bytes] | None = None
+
+    # ---------- construction ----------
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[bool]]) -> TileGrid:
+        """Build a grid from a legacy nested list (True=floor, False=wall)."""
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        data = bytearray(width * height)
+        for y, row in enumerate(rows):
+            if len(row) != width:
+                raise ValueError(f"row {y} has {len(row)} cells, expected {width}")
+            data[y * width : (y + 1) * width] = bytes(1 if cell else 0 for cell in row)
+        return cls(width, height, data)
+
+    def to_rows(self) -> list[list[bool]]:
+        """Return a nested-list copy (True=floor) for debugging and tests."""
+        return [[bool(c) for c in self.row(y)] for y in range(self.height)]
+
+    def copy(self) -> TileGrid:
+        """Return an independent copy of this grid."""
+        return TileGrid(self.width, self.height, bytearray(self.data))
+
+    # ---------- lookup ----------
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """Return True if (x, y) lies inside the grid."""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_floor(self, x: int, y: int) -> bool:
+        """Return True if (x, y) is walkable; out-of-bounds cells are walls."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.data[y * self.width + x] != WALL
+        return False
+
+    def is_opaque(self, x: int, y: int) -> bool:
+        """Return True if (x, y) blocks light; out-of-bounds cells are opaque.
+
+        Matches the `OpaqueFn` signature so it can be handed to `shadowcast`.
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.data[y * self.width + x] == WALL
+        return True
+
+    def set(self, x: int, y: int, floor: bool) -> None:
+        """Set one cell; raises IndexError when (x, y) is out of bounds."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"cell ({x}, {y}) outside {self.width}x{self.height} grid")
+        self.data[y * self.width + x] = FLOOR if floor else WALL
+        self.version = next(_versions)
+
+    # ---------- slicing ----------
+
+    def row(self, y: int) -> memoryview:
+        """Return a zero-copy view of row `y` (one byte per cell)."""
+        if not 0 <= y < self.height:
+            raise IndexError(f"row {y} outside grid of height {self.height}")
+        start = y * self.width
+        return memoryview(self.data)[start : start + self.width]
+
+    def column(self, x: int) -> bytes:
+        """Return column `x` as bytes (strided copy; columns are not contiguous)."""
+        if not 0 <= x < self.width:
+            raise IndexError(f"column {x} outside grid of width {self.width}")
+        return bytes(self.data[x :: self.width])
+
+    def row_span(self, y: int, x0: int, w: int) -> bytes:
+        """Return cells `[x0, x0 + w)` of row `y`, padding off-map cells with walls.
+
+        Useful for viewports that hang over the map edge.
+        """
+        if w <= 0:
+            return b""
+        if not 0 <= y < self.height:
+            return bytes(w)
+        lo = max(0, x0)
+        hi = min(self.width, x0 + w)
+        if lo >= hi:
+            return bytes(w)
+        start = y * self.width
+        return bytes(lo - x0) + self.data[start + lo : start + hi] + bytes(x0 + w - hi)
+
+    def crop(self, x0: int, y0: int, w: int, h: int) -> TileGrid:
+        """Return a compact copy of the `w`×`h` window at (x0, y0).
+
+        Cells outside the map are walls, so the result always has the
+        requested size.
+        """
+        w = max(0, w)
+        h = max(0, h)
+        data = bytearray(w * h)
+        for r in range(h):
+            data[r * w : (r + 1) * w] = self.row_span(y0 + r, x0, w)
+        return TileGrid(w, h, data)
+
+    def base_glyphs(self) -> bytes:
+        """Return the unmasked '.'/'#' map, row-major, one byte per cell.
+
+        Encoded once per `version` and cached; repeated calls are free until
+        the map changes.
+        """
+        cache = self._base_cache
+        if cache is None or cache[0] != self.version:
+            cache = (self.version, bytes(self.data.translate(_BASE_GLYPHS)))
+            self._base_cache = cache
+        return cache[1]
+
+    def base_window(self, x0: int, y0: int, w: int, h: int) -> bytes:
+        """Return the '.'/'#' glyphs of a window, sliced from the cached base layer.
+
+        Off-map cells read as walls ('#').
+        """
+        base = self.base_glyphs()
+        rows: list[bytes] = []
+        lo = max(0, x0)
+        hi = min(self.width, x0 + w)
+        for y in range(y0, y0 + h):
+            if not 0 <= y < self.height or lo >= hi:
+                rows.append(_WALL_GLYPH * w)
+                continue
+            start = y * self.width
+            rows.append(
+                _WALL_GLYPH * (lo - x0)
+                + base[start + lo : start + hi]
+                + _WALL_GLYPH * (x0 + w - hi)
+            )
+        return b"".join(rows)
+
+    # ---------- nested-list compatibility ----------
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __getitem__(self, y: int) -> memoryview:
+        return self.row(y)
+
+    def __iter__(self) -> Iterator[memoryview]:
+        view = memoryview(self.data)
+        for y in range(self.height):
+            yield view[y * self.width : (y + 1) * self.width]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TileGrid):
+            return NotImplemented
+        return (self.width, self.height) == (other.width, other.height) and (
+            self.data == other.data
+        )
+
+    def __repr__(self) -> str:
+        return f"TileGrid({self.width}x{self.height})"
+
+
+# Anything accepted where a tile map is expected: a grid or a legacy nested list.
+TileLike = TileGrid | Sequence[Sequence[bool]]
+
+
+def as_grid(tiles: TileLike) -> TileGrid:
+    """Return `tiles` as a `TileGrid`, converting legacy nested lists.
+
+    A `TileGrid` is returned unchanged (no copy).
+    """
+    if isinstance(tiles, TileGrid):
+        return tiles
+    return TileGrid.from_rows(tiles)
@@ -0,0 +1,89 @@
+"""Content-addressed on-disk cache of generated maps.
+
+A generated map is fully determined by (width, height, seed,
+`GENERATOR_VERSION`), so `cached_map` stores it under a file named after
+the SHA-256 of that key and reuses it on later starts instead of rerunning
+the generator.
+
+File layout (little-endian)::
+
+    b"TECM"  u32 width  u32 height  32-byte key digest  width*height cell bytes
+
+Files are read through `mmap`: the header is checked in place and the
+cells are copied out with one slice, so a missing, truncated or foreign
+file just means "regenerate". Writes go to a temporary file that is then
+renamed over the target, so readers never see a partial map.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+from tec.shared.grid import TileGrid
+from tec.shared.mapgen import GENERATOR_VERSION, generate_map
+
+MAGIC = b"TECM"
+_HEADER = struct.Struct("<4sII32s")
+
+
+def cache_key(width: int, height: int, seed: int, version: int = GENERATOR_VERSION) -> bytes:
+    """Return the SHA-256 digest identifying one generated map."""
+    return hashlib.sha256(f"tec-map:{version}:{width}x{height}:{seed}".encode()).digest()
+
+
+def cache_path(cache_dir: str | Path, width: int, height: int, seed: int) -> Path:
+    """Return where the map for (width, height, seed) is cached under `cache_dir`."""
+    return Path(cache_dir) / f"map-{cache_key(width, height, seed).hex()[:32]}.bin"
+
+
+def load_map(path: str | Path, width: int, height: int, seed: int) -> TileGrid | None:
+    """Read a cached map, or return None if `path` doesn't hold exactly that map."""
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if len(mm) != _HEADER.size + width * height:
+                return None
+            magic, w, h, digest = _HEADER.unpack_from(mm)
+            if (magic, w, h, digest) != (MAGIC, width, height, cache_key(width, height, seed)):
+                return None
+            return TileGrid(width, height, bytearray(mm[_HEADER.size :]))
+    except (OSError, ValueError):  # missing file; mmap of an empty file raises ValueError
+        return None
+
+
+def save_map(path: str | Path, grid: TileGrid, seed: int) -> None:
+    """Write `grid` (generated from `seed`) to `path` atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = _HEADER.pack(MAGIC, grid.width, grid.height, cache_key(grid.width, grid.height, seed))
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(grid.data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def cached_map(width: int, height: int, seed: int, cache_dir: str | Path) -> TileGrid:
+    """Return `generate_map(width, height, seed)`, from `cache_dir` when possible.
+
+    A cache miss generates the map and stores it; failing to store it (e.g. a
+    read-only directory) is not an error.
+    """
+    path = cache_path(cache_dir, width, height, seed)
+    grid = load_map(path, width, height, seed)
+    if grid is not None:
+        return grid
+    grid = generate_map(width, height, seed)
+    try:
+        save_map(path, grid, seed)
+    except OSError:
+        pass
+    return grid
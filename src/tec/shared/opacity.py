@@ -0,0 +1,216 @@
+"""Shared transparency layer with a one-cell opaque border and a change feed.
+
+`OpacityLayer` mirrors a `TileGrid` into a padded buffer of
+`(width + 2) × (height + 2)` cells (1 = transparent, 0 = opaque) whose outer
+ring is always opaque:
+
+- Every in-map cell and its eight neighbours are addressable with one index
+  computation, so movement and pathfinding probes need no bounds checks, and
+  the FOV kernel can slice rows that touch the map edge directly.
+- Edits go through `refresh`, which bumps `version` and logs the dirty
+  rectangle, so consumers (e.g. per-viewer FOV) can tell whether a change can
+  affect them instead of invalidating everything on any edit.
+
+`ChunkedOpacity` offers the same probes and change feed over a `ChunkedMap`
+without copying it: cells are read from the chunks, and the FOV kernel
+crops its radius box through `ChunkedMap.crop`.
+
+Transparency and walkability coincide today (floor is both); things like
+doors or glass would need a separate walk layer.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+
+from tec.shared.chunks import ChunkedMap, WorldMap
+from tec.shared.grid import TileGrid
+
+Rect = tuple[int, int, int, int]  # (x0, y0, x1, y1), half-open, map coordinates
+
+
+class ChangeFeed:
+    """Version counter with a bounded log of dirty rectangles.
+
+    Attributes:
+        version: Bumped on every logged change; FOV results are keyed by it.
+    """
+
+    __slots__ = ("version", "_log")
+
+    def __init__(self, log_size: int = 256) -> None:
+        """Start at version 0 with an empty log of at most `log_size` rectangles."""
+        self.version = 0
+        self._log: deque[tuple[int, Rect]] = deque(maxlen=max(1, log_size))
+
+    def _mark(self, rect: Rect) -> None:
+        """Bump `version` and log `rect` as dirty."""
+        self.version += 1
+        self._log.append((self.version, rect))
+
+    def changes_since(self, version: int) -> list[Rect] | None:
+        """Return dirty rectangles logged after `version`, or None if history was dropped."""
+        if version >= self.version:
+            return []
+        log = self._log
+        if not log or log[0][0] > version + 1:
+            return None
+        return [rect for v, rect in log if v > version]
+
+    def dirty_since(self, version: int, x0: int, y0: int, x1: int, y1: int) -> bool:
+        """Return True if any change after `version` overlaps the half-open box."""
+        changes = self.changes_since(version)
+        if changes is None:
+            return True
+        return any(
+            rx0 < x1 and x0 < rx1 and ry0 < y1 and y0 < ry1 for rx0, ry0, rx1, ry1 in changes
+        )
+
+
+class OpacityLayer(ChangeFeed):
+    """Padded transparency buffer kept in sync with a `TileGrid`.
+
+    Attributes:
+        width: Map width in tiles (without the border).
+        height: Map height in tiles (without the border).
+        stride: Row length of the padded buffer (`width + 2`).
+        padded: Padded cells as a `TileGrid`; map cell (x, y) is (x + 1, y + 1).
+        version: Bumped on every `refresh`; FOV results are keyed by it.
+        source_version: `TileGrid.version` this layer was last synced from.
+    """
+
+    __slots__ = ("width", "height", "stride", "padded", "source_version")
+
+    def __init__(self, grid: WorldMap, log_size: int = 256) -> None:
+        """Build the layer from `grid`.
+
+        Args:
+            grid: World map (1 = floor/transparent, 0 = wall/opaque); a
+                `ChunkedMap` is materialised in full, see `ChunkedOpacity`.
+            log_size: Dirty rectangles kept for `changes_since`; older history
+                collapses to "everything changed".
+        """
+        super().__init__(log_size)
+        self.width = grid.width
+        self.height = grid.height
+        self.stride = grid.width + 2
+        self.padded = TileGrid(self.stride, grid.height + 2)
+        self.source_version = -1
+        self.refresh(grid)
+
+    # ---------- probes ----------
+
+    def is_opaque(self, x: int, y: int) -> bool:
+        """Return True if (x, y) blocks light; valid for -1 <= x <= width, -1 <= y <= height."""
+        return not self.padded.data[(y + 1) * self.stride + x + 1]
+
+    def is_clear(self, x: int, y: int) -> bool:
+        """Return True if (x, y) is transparent/walkable; same range as `is_opaque`."""
+        return self.padded.data[(y + 1) * self.stride + x + 1] != 0
+
+    # ---------- updates ----------
+
+    def refresh(self, grid: WorldMap, rect: Rect | None = None) -> None:
+        """Copy `rect` (default: the whole map) from `grid` and log it as dirty.
+
+        Raises:
+            ValueError: If `grid` has a different size than the layer.
+        """
+        _check_size(grid, self.width, self.height)
+        x0, y0, x1, y1 = _clip(rect, self.width, self.height)
+        cells, stride = self.padded.data, self.stride
+        if isinstance(grid, TileGrid):
+            src, width = grid.data, self.width
+            for y in range(y0, y1):
+                dst = (y + 1) * stride + 1
+                cells[dst + x0 : dst + x1] = src[y * width + x0 : y * width + x1]
+        else:
+            for y in range(y0, y1):
+                dst = (y + 1) * stride + 1
+                cells[dst + x0 : dst + x1] = grid.row_span(y, x0, x1 - x0)
+        self.source_version = grid.version
+        self._mark((x0, y0, x1, y1))
+
+    def sync(self, grid: WorldMap) -> bool:
+        """Re-copy the whole map if `grid` was edited behind the layer's back.
+
+        Returns:
+            True if a full refresh happened.
+        """
+        if grid.version == self.source_version:
+            return False
+        self.refresh(grid)
+        return True
+
+
+class ChunkedOpacity(ChangeFeed):
+    """Transparency view of a `ChunkedMap` with the `OpacityLayer` change feed.
+
+    Nothing is copied up front, so building it costs the same for any world
+    size. Probes are bounds-checked reads of the map's chunks (generating
+    them on demand); `crop` hands the FOV kernel a padded `TileGrid` window.
+
+    Attributes:
+        map: The chunked world map this layer reads.
+        width: Map width in tiles.
+        height: Map height in tiles.
+        source_version: `ChunkedMap.version` this layer was last synced from.
+    """
+
+    __slots__ = ("map", "width", "height", "source_version")
+
+    def __init__(self, tiles: ChunkedMap, log_size: int = 256) -> None:
+        """Wrap `tiles`; `log_size` is as for `OpacityLayer`."""
+        super().__init__(log_size)
+        self.map = tiles
+        self.width = tiles.width
+        self.height = tiles.height
+        self.source_version = tiles.version
+
+    # ---------- probes ----------
+
+    def is_opaque(self, x: int, y: int) -> bool:
+        """Return True if (x, y) blocks light; off-map cells are opaque."""
+        return not self.map.is_floor(x, y)
+
+    def is_clear(self, x: int, y: int) -> bool:
+        """Return True if (x, y) is transparent/walkable; off-map cells are not."""
+        return self.map.is_floor(x, y)
+
+    def crop(self, x0: int, y0: int, w: int, h: int) -> TileGrid:
+        """Return the `w`×`h` window at (x0, y0) as a `TileGrid`; off-map cells are walls."""
+        return self.map.crop(x0, y0, w, h)
+
+    # ---------- updates ----------
+
+    def refresh(self, grid: WorldMap, rect: Rect | None = None) -> None:
+        """Log `rect` (default: the whole map) as dirty; cells are read live from the map.
+
+        Raises:
+            ValueError: If `grid` has a different size than the layer.
+        """
+        _check_size(grid, self.width, self.height)
+        self.source_version = grid.version
+        self._mark(_clip(rect, self.width, self.height))
+
+    def sync(self, grid: WorldMap) -> bool:
+        """Log the whole map as dirty if `grid` was edited behind the layer's back.
+
+        Returns:
+            True if the whole map was marked dirty.
+        """
+        if grid.version == self.source_version:
+            return False
+        self.refresh(grid)
+        return True
+
+
+def _check_size(grid: WorldMap, width: int, height: int) -> None:
+    if (grid.width, grid.height) != (width, height):
+        raise ValueError(f"grid is {grid.width}x{grid.height}, layer is {width}x{height}")
+
+
+def _clip(rect: Rect | None, width: int, height: int) -> Rect:
+    """Return `rect` (default: the whole map) clipped to the map."""
+    x0, y0, x1, y1 = rect if rect is not None else (0, 0, width, height)
+    return max(0, x0), max(0, y0), min(width, x1), min(height, y1)
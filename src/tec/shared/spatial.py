@@ -0,0 +1,157 @@
+"""Uniform-grid spatial hash of entity positions.
+
+`SpatialHash` answers "who is on / near this tile" without scanning the
+`Position` table. It keeps two dict-of-dicts indexes over the same entries:
+
+- per tile, for O(1) `at(x, y)` lookups;
+- per chunk (`chunk` x `chunk` tiles), for `in_rect` and `in_radius`, which
+  only visit chunks overlapping the query box.
+
+Buckets are insertion-ordered dicts, so results come back in a stable
+order. The hash does not observe `Position` components; whoever moves an
+entity calls `move` (the simulation does so whenever `try_move` succeeds).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from tec.shared.world import EID
+
+Cell = tuple[int, int]
+Bucket = dict[EID, None]
+
+
+class SpatialHash:
+    """Entity positions bucketed by tile and by chunk.
+
+    Attributes:
+        chunk: Chunk edge length in tiles (a power of two).
+    """
+
+    __slots__ = ("chunk", "_shift", "_where", "_tiles", "_chunks")
+
+    def __init__(self, chunk: int = 8) -> None:
+        """Create an empty index.
+
+        Raises:
+            ValueError: If `chunk` is not a positive power of two.
+        """
+        if chunk <= 0 or chunk & (chunk - 1):
+            raise ValueError(f"chunk must be a positive power of two, got {chunk}")
+        self.chunk = chunk
+        self._shift = chunk.bit_length() - 1
+        self._where: dict[EID, Cell] = {}
+        self._tiles: dict[Cell, Bucket] = {}
+        self._chunks: dict[Cell, Bucket] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, eid: object) -> bool:
+        return eid in self._where
+
+    def position(self, eid: EID) -> Cell:
+        """Return the tile `eid` is indexed at."""
+        return self._where[eid]
+
+    # ---------- updates ----------
+
+    def insert(self, eid: EID, x: int, y: int) -> None:
+        """Index `eid` at (x, y), moving it if it is already indexed."""
+        if eid in self._where:
+            self.move(eid, x, y)
+            return
+        self._where[eid] = (x, y)
+        self._tiles.setdefault((x, y), {})[eid] = None
+        s = self._shift
+        self._chunks.setdefault((x >> s, y >> s), {})[eid] = None
+
+    def move(self, eid: EID, x: int, y: int) -> None:
+        """Update `eid`'s indexed position to (x, y).
+
+        Raises:
+            KeyError: If `eid` is not indexed.
+        """
+        old = self._where[eid]
+        if old == (x, y):
+            return
+        self._where[eid] = (x, y)
+        _discard(self._tiles, old, eid)
+        self._tiles.setdefault((x, y), {})[eid] = None
+        s = self._shift
+        old_chunk, new_chunk = (old[0] >> s, old[1] >> s), (x >> s, y >> s)
+        if old_chunk != new_chunk:
+            _discard(self._chunks, old_chunk, eid)
+            self._chunks.setdefault(new_chunk, {})[eid] = None
+
+    def remove(self, eid: EID) -> bool:
+        """Drop `eid` from the index; return whether it was indexed."""
+        cell = self._where.pop(eid, None)
+        if cell is None:
+            return False
+        s = self._shift
+        _discard(self._tiles, cell, eid)
+        _discard(self._chunks, (cell[0] >> s, cell[1] >> s), eid)
+        return True
+
+    def rebuild(self, entries: Iterable[tuple[EID, Cell]]) -> None:
+        """Replace the whole index with `(eid, (x, y))` entries."""
+        where: dict[EID, Cell] = dict(entries)
+        tiles: dict[Cell, Bucket] = {}
+        chunks: dict[Cell, Bucket] = {}
+        s = self._shift
+        for eid, (x, y) in where.items():
+            tiles.setdefault((x, y), {})[eid] = None
+            chunks.setdefault((x >> s, y >> s), {})[eid] = None
+        self._where, self._tiles, self._chunks = where, tiles, chunks
+
+    # ---------- queries ----------
+
+    def at(self, x: int, y: int) -> list[EID]:
+        """Return the entities on tile (x, y)."""
+        bucket = self._tiles.get((x, y))
+        return list(bucket) if bucket else []
+
+    def in_rect(self, x0: int, y0: int, x1: int, y1: int) -> list[EID]:
+        """Return the entities with x0 <= x < x1 and y0 <= y < y1."""
+        out: list[EID] = []
+        where, chunks, s = self._where, self._chunks, self._shift
+        cx1, cy1 = (x1 - 1) >> s, (y1 - 1) >> s
+        for cy in range(y0 >> s, cy1 + 1):
+            for cx in range(x0 >> s, cx1 + 1):
+                bucket = chunks.get((cx, cy))
+                if not bucket:
+                    continue
+                # Interior chunks lie wholly inside the rect: no per-entity test.
+                if x0 <= cx << s and (cx + 1) << s <= x1 and y0 <= cy << s and (cy + 1) << s <= y1:
+                    out.extend(bucket)
+                    continue
+                for eid in bucket:
+                    x, y = where[eid]
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        out.append(eid)
+        return out
+
+    def in_radius(self, x: int, y: int, radius: int) -> list[EID]:
+        """Return the entities with dx² + dy² <= radius² (the FOV cutoff)."""
+        out: list[EID] = []
+        where, chunks, s = self._where, self._chunks, self._shift
+        r2 = radius * radius
+        for cy in range((y - radius) >> s, ((y + radius) >> s) + 1):
+            for cx in range((x - radius) >> s, ((x + radius) >> s) + 1):
+                bucket = chunks.get((cx, cy))
+                if not bucket:
+                    continue
+                for eid in bucket:
+                    ex, ey = where[eid]
+                    if (ex - x) * (ex - x) + (ey - y) * (ey - y) <= r2:
+                        out.append(eid)
+        return out
+
+
+def _discard(index: dict[Cell, Bucket], cell: Cell, eid: EID) -> None:
+    bucket = index[cell]
+    del bucket[eid]
+    if not bucket:
+        del index[cell]
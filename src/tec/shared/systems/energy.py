@@ -0,0 +1,25 @@
+"""Energy accrual: every actor gains its speed in energy each tick."""
+
+from collections.abc import MutableMapping
+from operator import add
+
+from tec.shared.columns import ColumnTable, overwrite
+from tec.shared.components import Actor
+from tec.shared.world import EID
+
+
+def accrue_energy(actors: MutableMapping[EID, Actor]) -> None:
+    """Add each actor's `speed` to its `energy`.
+
+    Args:
+        actors: The world's `Actor` table. A `ColumnTable` is updated with one
+            pass over its `energy`/`speed` columns, written back in place; any
+            other table falls back to a per-component loop. Both round
+            identically (one float add).
+    """
+    if isinstance(actors, ColumnTable):
+        energy = actors.column("energy")
+        overwrite(energy, map(add, energy, actors.column("speed")))
+        return
+    for act in actors.values():
+        act.energy += act.speed
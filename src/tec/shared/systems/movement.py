@@ -1,20 +1,40 @@
 """Movement system utilities."""
 
+from tec.shared.chunks import ChunkedMap
 from tec.shared.components import Position
+from tec.shared.grid import TileGrid, TileLike
+from tec.shared.opacity import ChunkedOpacity, OpacityLayer
 
 
-def try_move(pos: Position, dx: int, dy: int, tiles: list[list[bool]]) -> None:
+def try_move(
+    pos: Position, dx: int, dy: int, tiles: TileLike | ChunkedMap | OpacityLayer | ChunkedOpacity
+) -> bool:
     """Attempt to move an entity by (dx, dy) if the target tile is walkable.
 
     Args:
         pos: Mutable position component to update.
         dx: Delta x in tiles (-1, 0, +1).
         dy: Delta y in tiles (-1, 0, +1).
-        tiles: World tile grid; True=floor, False=wall.
+        tiles: The simulation's `OpacityLayer` or `ChunkedOpacity`, or a tile
+            grid, `ChunkedMap` or legacy nested list; floor cells are walkable.
+
+    Returns:
+        Whether `pos` changed, so callers can update indexes such as `SpatialHash`.
 
     Notes:
         Does nothing if the target is out of bounds or a wall.
     """
     nx, ny = pos.x + dx, pos.y + dy
-    if 0 <= ny < len(tiles) and 0 <= nx < len(tiles[0]) and tiles[ny][nx]:
+    if isinstance(tiles, OpacityLayer):
+        # the padding only covers one cell around the map; larger steps must not wrap
+        ok = 0 <= nx < tiles.width and 0 <= ny < tiles.height and tiles.is_clear(nx, ny)
+    elif isinstance(tiles, ChunkedOpacity):
+        ok = tiles.is_clear(nx, ny)  # bounds-checked chunk read
+    elif isinstance(tiles, TileGrid | ChunkedMap):
+        ok = tiles.is_floor(nx, ny)
+    else:
+        # legacy nested rows: read the one cell rather than converting the whole map
+        ok = 0 <= ny < len(tiles) and 0 <= nx < len(tiles[ny]) and bool(tiles[ny][nx])
+    if ok:
         pos.x, pos.y = nx, ny
+    return ok
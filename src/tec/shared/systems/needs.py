@@ -1,8 +1,23 @@
 """Simple needs progression updated each tick."""
 
+from collections.abc import Iterable, MutableMapping
+from itertools import repeat
+from operator import add
+
+from tec.shared.columns import ColumnTable, overwrite
 from tec.shared.components import Actor, Needs
+from tec.shared.world import EID
 
 # Very simple v0: tick needs slowly so we can visualize in HUD later.
+HUNGER_PER_TICK = 0.001
+THIRST_PER_TICK = 0.002
+EXPOSURE_PER_TICK = 0.0005
+
+_RATES = (
+    ("hunger", HUNGER_PER_TICK),
+    ("thirst", THIRST_PER_TICK),
+    ("exposure", EXPOSURE_PER_TICK),
+)
 
 
 def tick_needs(needs: Needs, actor: Actor) -> None:
@@ -15,6 +30,33 @@ def tick_needs(needs: Needs, actor: Actor) -> None:
     Notes:
         Tuning is intentionally conservative until a full needs system lands.
     """
-    needs.hunger += 0.001
-    needs.thirst += 0.002
-    needs.exposure += 0.0005
+    needs.hunger += HUNGER_PER_TICK
+    needs.thirst += THIRST_PER_TICK
+    needs.exposure += EXPOSURE_PER_TICK
+
+
+def tick_needs_many(needs: MutableMapping[EID, Needs], eids: Iterable[EID] | None = None) -> None:
+    """Apply `tick_needs` to many entities at once, with identical results.
+
+    Args:
+        needs: The world's `Needs` table.
+        eids: Entities to update (each must have `Needs`); None means all.
+            On a `ColumnTable`, updating all entities is one pass per column
+            and a subset touches the column slots directly.
+    """
+    if isinstance(needs, ColumnTable):
+        if eids is None:
+            for name, rate in _RATES:
+                col = needs.column(name)
+                overwrite(col, map(add, col, repeat(rate, len(col))))
+            return
+        slots = [needs.slots[eid] for eid in eids]
+        for name, rate in _RATES:
+            col = needs.column(name)
+            for slot in slots:
+                col[slot] += rate
+        return
+    for comp in needs.values() if eids is None else map(needs.__getitem__, eids):
+        comp.hunger += HUNGER_PER_TICK
+        comp.thirst += THIRST_PER_TICK
+        comp.exposure += EXPOSURE_PER_TICK
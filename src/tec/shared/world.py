@@ -1,50 +1,271 @@
-"""Minimal ECS-style world with typed component tables."""
+"""Minimal ECS-style world with typed component tables.
+
+Multi-component lookups go through `Query` objects: `World.query(A, B)`
+registers one per distinct component set, and `add`/`remove` keep every
+registered query's membership current. Iterating a query walks its member
+dict directly, so per-tick systems pay for matching entities only.
+
+Entity ids are generational: `generation << 32 | index`. `destroy` strips an
+entity's components, bumps the generation stored for its index and puts the
+index on a free list for `create` to reuse, so a stale id held elsewhere
+never aliases the entity that later takes its slot (`alive` tells them
+apart). First-generation ids equal their index: 1, 2, 3, ...
+"""
 
 from __future__ import annotations
 
-from collections.abc import Iterable, MutableMapping
+import copy
+from collections import deque
+from collections.abc import Iterable, Iterator, MutableMapping
 from dataclasses import dataclass, field
-from typing import TypeVar
+from typing import TypeVar, cast
 
 EID = int
 T = TypeVar("T")
 
+INDEX_BITS = 32
+INDEX_MASK = (1 << INDEX_BITS) - 1
+# keeps ids within a signed 64-bit integer (e.g. `ColumnTable.eids`)
+GENERATION_MASK = (1 << 31) - 1
+
+
+def eid_index(eid: EID) -> int:
+    """Return the slot index part of an entity id."""
+    return eid & INDEX_MASK
+
+
+def eid_generation(eid: EID) -> int:
+    """Return the generation part of an entity id."""
+    return eid >> INDEX_BITS
+
+
+class Query:
+    """Live set of entities that have every component in `ctypes`.
+
+    Members iterate in the order they started matching. Iteration does not
+    copy; take `list(query)` first if the loop adds or removes components of
+    the queried types.
+
+    Attributes:
+        ctypes: Component classes an entity needs to be a member.
+    """
+
+    __slots__ = ("ctypes", "_members")
+
+    def __init__(self, ctypes: tuple[type[object], ...]) -> None:
+        self.ctypes = ctypes
+        self._members: dict[EID, None] = {}
+
+    def __iter__(self) -> Iterator[EID]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, eid: object) -> bool:
+        return eid in self._members
+
+    def __repr__(self) -> str:
+        names = ", ".join(t.__name__ for t in self.ctypes)
+        return f"Query({names}; {len(self._members)} entities)"
+
 
 @dataclass
 class World:
-    """Entity id allocator and component storage."""
+    """Entity id allocator and component storage.
+
+    Attributes:
+        next_id: Next never-used index `create` hands out once `free` is empty.
+        tables: Component storage, one `eid -> component` table per type.
+        queries: Registered queries by component set (see `query`).
+        generations: Current generation of each index (index 0 is unused).
+        free: Indices released by `destroy`, reused oldest first.
+    """
 
     next_id: int = 1
     tables: dict[type[object], MutableMapping[EID, object]] = field(default_factory=dict)
+    queries: dict[frozenset[type[object]], Query] = field(default_factory=dict)
+    generations: list[int] = field(default_factory=lambda: [0])
+    free: deque[int] = field(default_factory=deque)
+    _queries_by_type: dict[type[object], list[Query]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _released: set[int] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._released = set(self.free)
 
     def create(self) -> EID:
-        """Allocate and return a fresh entity id."""
-        eid = self.next_id
+        """Allocate and return an entity id, reusing a destroyed index if any.
+
+        Raises:
+            OverflowError: If all 2**32 - 1 indices are live.
+        """
+        if self.free:
+            index = self.free.popleft()
+            self._released.discard(index)
+            return self.generations[index] << INDEX_BITS | index
+        index = self.next_id
+        if index > INDEX_MASK:
+            raise OverflowError("entity index space exhausted")
         self.next_id += 1
-        return eid
+        self.generations.extend([0] * (index + 1 - len(self.generations)))
+        return index
+
+    def create_many(self, count: int) -> list[EID]:
+        """Allocate `count` entity ids (free indices first, then fresh ones)."""
+        reused = min(count, len(self.free))
+        gens = self.generations
+        popleft = self.free.popleft
+        eids = []
+        for _ in range(reused):
+            index = popleft()
+            self._released.discard(index)
+            eids.append(gens[index] << INDEX_BITS | index)
+        fresh = count - reused
+        if fresh:
+            start = self.next_id
+            if start + fresh - 1 > INDEX_MASK:
+                raise OverflowError("entity index space exhausted")
+            self.next_id += fresh
+            gens.extend([0] * (self.next_id - len(gens)))
+            eids.extend(range(start, start + fresh))
+        return eids
+
+    def alive(self, eid: EID) -> bool:
+        """Return whether `eid` was created and not destroyed since."""
+        index = eid & INDEX_MASK
+        return (
+            0 < index < self.next_id
+            and self.generations[index] == eid >> INDEX_BITS
+            and index not in self._released
+        )
+
+    def destroy(self, eid: EID) -> bool:
+        """Remove all of `eid`'s components and release its index.
+
+        Returns:
+            False (and does nothing) if `eid` is stale or unknown.
+        """
+        if not self.alive(eid):
+            return False
+        for ctype in self.tables:
+            self.remove(eid, ctype)
+        index = eid & INDEX_MASK
+        self.generations[index] = (self.generations[index] + 1) & GENERATION_MASK
+        self.free.append(index)
+        self._released.add(index)
+        return True
 
     def add(self, eid: EID, comp: object) -> None:
-        """Attach a component instance to an entity."""
-        self.tables.setdefault(type(comp), {})[eid] = comp
+        """Attach a component instance to an entity, replacing any of the same type."""
+        ctype = type(comp)
+        table = self.tables.setdefault(ctype, {})
+        fresh = eid not in table
+        table[eid] = comp
+        if fresh:
+            for q in self._queries_by_type.get(ctype, ()):
+                if self._matches(eid, q.ctypes):
+                    q._members[eid] = None
+
+    def add_many(self, eids: Iterable[EID], comps: Iterable[object]) -> None:
+        """Attach `comps[i]` to `eids[i]`; cheaper than repeated `add` for one type."""
+        ctype: type[object] | None = None
+        table: MutableMapping[EID, object] = {}
+        queries: list[Query] = []
+        for eid, comp in zip(eids, comps, strict=True):
+            if type(comp) is not ctype:
+                ctype = type(comp)
+                table = self.tables.setdefault(ctype, {})
+                queries = self._queries_by_type.get(ctype, [])
+            fresh = eid not in table
+            table[eid] = comp
+            if fresh:
+                for q in queries:
+                    if self._matches(eid, q.ctypes):
+                        q._members[eid] = None
+
+    def remove(self, eid: EID, ctype: type[object]) -> bool:
+        """Detach `eid`'s `ctype` component; return whether it had one."""
+        table = self.tables.get(ctype)
+        if table is None or eid not in table:
+            return False
+        del table[eid]
+        for q in self._queries_by_type.get(ctype, ()):
+            q._members.pop(eid, None)
+        return True
 
     def get(self, ctype: type[T]) -> MutableMapping[EID, T]:
         """Get (and create if missing) the table for a component type."""
         return self.tables.setdefault(ctype, {})  # type: ignore[return-value]
 
-    def entities_with(self, *ctypes: type[object]) -> Iterable[EID]:
-        """Yield entity ids that have all of the given component types.
+    def use_columns(self, *ctypes: type[object]) -> None:
+        """Store the given numeric components column-wise (see `tec.shared.columns`).
+
+        Existing instances are copied into the new tables. Afterwards
+        `get(ctype)[eid]` returns a live row view rather than the object that
+        was added; use `detached` for an independent copy.
+
+        Raises:
+            TypeError: If a component is not a dataclass of int/float fields.
+        """
+        from tec.shared.columns import ColumnTable
+
+        for ctype in ctypes:
+            if isinstance(self.tables.get(ctype), ColumnTable):
+                continue
+            table: ColumnTable[object] = ColumnTable(ctype)
+            table.update(self.tables.get(ctype, {}))
+            self.tables[ctype] = table
+
+    def detached(self, ctype: type[T], eid: EID) -> T:
+        """Return a copy of `eid`'s component that later writes don't affect."""
+        from tec.shared.columns import ColumnTable
+
+        table = self.get(ctype)
+        if isinstance(table, ColumnTable):
+            return cast(T, table.detach(eid))
+        return copy.copy(table[eid])
+
+    def query(self, *ctypes: type[object]) -> Query:
+        """Return the live query for entities with all of `ctypes`.
+
+        The first call for a component set scans the smallest of its tables;
+        later calls (in any argument order) return the same object, which
+        `add` and `remove` keep up to date. Components written straight into
+        a table with `get(ctype)[eid] = ...` are not seen by queries.
+
+        Raises:
+            ValueError: If no component types are given.
+        """
+        if not ctypes:
+            raise ValueError("query needs at least one component type")
+        key = frozenset(ctypes)
+        q = self.queries.get(key)
+        if q is not None:
+            return q
+        q = self.queries[key] = Query(tuple(ctypes))
+        for ctype in key:
+            self._queries_by_type.setdefault(ctype, []).append(q)
+        smallest = min((self.get(t) for t in key), key=len)
+        for eid in smallest:
+            if self._matches(eid, q.ctypes):
+                q._members[eid] = None
+        return q
+
+    def entities_with(self, *ctypes: type[object]) -> Query | tuple[EID, ...]:
+        """Return the entity ids that have all of the given component types.
 
         Args:
             *ctypes: Component classes to match.
 
         Returns:
-            Iterable of entity ids possessing all listed components.
+            The registered `Query` for `ctypes` (empty tuple if none given).
         """
         if not ctypes:
-            return []
-        tables = [self.get(t) for t in ctypes]
-        tables.sort(key=lambda t: len(t))
-        ids = set(tables[0].keys())
-        for t in tables[1:]:
-            ids &= set(t.keys())
-        return ids
+            return ()
+        return self.query(*ctypes)
+
+    def _matches(self, eid: EID, ctypes: tuple[type[object], ...]) -> bool:
+        tables = self.tables
+        return all(eid in tables.get(t, ()) for t in ctypes)
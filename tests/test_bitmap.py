@@ -0,0 +1,33 @@
+from tec.shared.bitmap import Bitmap
+from tec.shared.fov import shadowcast
+from tec.shared.mapgen import generate_map
+
+
+def test_bitmap_set_semantics() -> None:
+    bm = Bitmap(10, 4)
+    for cell in [(0, 0), (9, 3), (4, 1), (4, 1), (-1, 0), (10, 2), (3, 7)]:
+        bm.add(cell)
+    assert len(bm) == 3
+    assert sorted(bm) == [(0, 0), (4, 1), (9, 3)]
+    assert (4, 1) in bm and (5, 1) not in bm and (-1, 0) not in bm
+    bm.discard((4, 1))
+    assert (4, 1) not in bm
+
+
+def test_bitmap_union_and_windows() -> None:
+    a = Bitmap.from_cells(8, 3, [(0, 0), (7, 2)])
+    b = Bitmap.from_cells(8, 3, [(1, 0), (7, 2)])
+    a.update(b)
+    assert sorted(a) == [(0, 0), (1, 0), (7, 2)]
+    assert a.row_str(0, 0, 4) == "1100"
+    # Windows may hang over the map edge; those cells read as unset.
+    assert a.row_str(0, -2, 4) == "0011"
+    assert a.window_str(6, 1, 3, 2) == "000" + "010"
+    assert a.window_bytes(0, 0, 3, 1) == b"\x01\x01\x00"
+
+
+def test_shadowcast_fills_bitmap_like_set() -> None:
+    grid = generate_map(30, 15, seed=9)
+    vis = shadowcast(15, 7, 8, grid.is_opaque)
+    bm = shadowcast(15, 7, 8, grid.is_opaque, Bitmap(30, 15))
+    assert set(bm) == {(x, y) for x, y in vis if grid.in_bounds(x, y)}
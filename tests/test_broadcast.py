@@ -0,0 +1,57 @@
+import asyncio
+import json
+from typing import cast
+
+from tec.server.net import JsonServer
+from tec.server.sim import Simulation
+
+
+class _Writer:
+    """Collects bytes written by the server (the subset of StreamWriter it uses)."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def types(self) -> list[str]:
+        out = [json.loads(chunk)["type"] for chunk in self.chunks]
+        self.chunks.clear()
+        return out
+
+
+def test_inputs_coalesce_into_one_broadcast_per_tick() -> None:
+    async def scenario() -> None:
+        sim = Simulation()
+        server = JsonServer(sim)
+        writers = [_Writer(), _Writer()]
+        outboxes = []
+        for fake in writers:
+            writer = cast(asyncio.StreamWriter, fake)
+            outboxes.append(server._attach(writer, sim.spawn_player(), "json"))
+        for outbox in outboxes:
+            await outbox.flush()
+        assert writers[0].types() == ["WELCOME", "POS", "STATS", "MAP", "VIEW"]
+        writers[1].types()
+
+        # Key-repeat spam: many inputs, one update at the tick's broadcast.
+        eid = server.sessions[cast(asyncio.StreamWriter, writers[0])]
+        for _ in range(5):
+            msg = {"type": "MOVE", "dx": 1, "dy": 0}
+            await server.dispatch(msg, cast(asyncio.StreamWriter, writers[0]), eid)
+        assert outboxes[0].depth == 0
+        sim.tick()
+        server.broadcast()
+        for outbox in outboxes:
+            await outbox.flush()
+        assert writers[0].types().count("STATS") == 1
+        assert writers[1].types() == []  # idle session: nothing changed, nothing sent
+
+    asyncio.run(scenario())
@@ -0,0 +1,112 @@
+import json
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import tec.server.sim as sim_module
+from tec.server import persist
+from tec.server.net import JsonServer
+from tec.server.sim import Simulation
+from tec.settings import SETTINGS
+from tec.shared.bitmap import Bitmap
+from tec.shared.chunks import ChunkedMap
+from tec.shared.fov import shadowcast_grid
+
+
+def _chunked(
+    monkeypatch: pytest.MonkeyPatch, size: int, chunk: int = 32, resident: int = 64
+) -> None:
+    patched = replace(
+        SETTINGS,
+        chunked_map=True,
+        map_width=size,
+        map_height=size,
+        map_chunk=chunk,
+        max_resident_chunks=resident,
+    )
+    monkeypatch.setattr(sim_module, "SETTINGS", patched)
+    monkeypatch.setattr(persist, "SETTINGS", patched)
+
+
+def test_large_world_starts_in_bounded_time_and_memory(monkeypatch: pytest.MonkeyPatch) -> None:
+    _chunked(monkeypatch, 10_000, chunk=64)
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        sim = Simulation()
+        eid = sim.spawn_player()
+        sim.tick()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert isinstance(sim.tiles, ChunkedMap)
+    assert sim.tiles.stats()["generated"] <= 9  # the chunks around the player, not 24k of them
+    assert sim.position(eid) in sim.visible_for(eid)
+    assert elapsed < 2.0
+    assert peak < 4 * 2**20  # a materialised 10000x10000 grid alone is ~95 MiB
+
+
+def test_moves_fov_and_eviction_follow_the_player(monkeypatch: pytest.MonkeyPatch) -> None:
+    _chunked(monkeypatch, 512)
+    sim = Simulation()
+    tiles = sim.tiles
+    assert isinstance(tiles, ChunkedMap)
+    eid = sim.spawn_player()
+    x0, y = sim.position(eid)
+    for _ in range(400):  # east along the corridor through the middle chunk row
+        if not sim.action_queues[eid]:
+            sim.enqueue_move(eid, 1, 0)
+        sim.tick()
+        assert len(tiles.resident()) <= 9
+    x, y1 = sim.position(eid)
+    assert y1 == y and x > x0 + 2 * tiles.chunk
+    assert tiles.evicted > 0
+
+    r = sim.effective_radius(eid)
+    whole = tiles.crop(0, 0, tiles.width, tiles.height)
+    assert sim.visible_for(eid) == shadowcast_grid(
+        x, y, r, whole, Bitmap(whole.width, whole.height)
+    )
+
+    sim.set_tile(x + 1, y, False)
+    assert not sim.tiles.is_floor(x + 1, y)
+    assert (x + 2, y) not in sim.visible_for(eid)
+
+
+def test_views_carry_their_own_base_instead_of_a_map(monkeypatch: pytest.MonkeyPatch) -> None:
+    _chunked(monkeypatch, 4096)
+    sim = Simulation()
+    server = JsonServer(sim)
+    eid = sim.spawn_player()
+    (raw,) = server._view_update(eid)
+    view = json.loads(raw)
+    assert view["type"] == "VIEW" and "base_version" not in view
+    assert (
+        view["base"] == sim.tiles.base_window(view["x"], view["y"], view["w"], view["h"]).decode()
+    )
+    with pytest.raises(ValueError):
+        sim.snapshot()  # never copied whole, so no sim thread either
+
+
+def test_save_keeps_edited_chunks_only(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    _chunked(monkeypatch, 2048)
+    sim = Simulation()
+    eid = sim.spawn_player()
+    x, y = sim.position(eid)
+    sim.set_tile(x, y - 1, True)
+    sim.set_tile(1500, 1500, True)
+    sim.tick()
+    path = tmp_path / "world.bin"
+    persist.save(sim, path)
+    assert path.stat().st_size < 64 * 1024 + 2 * 2048 * 256  # two chunks plus explored rows
+
+    loaded = persist.load(path)
+    assert isinstance(loaded.tiles, ChunkedMap)
+    assert loaded.tiles.stats()["edited"] == 2
+    for x0, y0 in ((x - 40, y - 40), (1480, 1480)):
+        assert loaded.tiles.crop(x0, y0, 80, 80) == sim.tiles.crop(x0, y0, 80, 80)
+    assert loaded.position(eid) == (x, y)
@@ -0,0 +1,42 @@
+from tec.shared.chunks import ChunkedMap
+
+
+def test_chunks_are_lazy_deterministic_and_connected() -> None:
+    huge = ChunkedMap(1_000_000, 1_000_000, seed=5)
+    assert huge.stats()["generated"] == 0  # nothing built up front
+
+    a = ChunkedMap(100, 70, seed=5, chunk=32)
+    b = ChunkedMap(100, 70, seed=5, chunk=32)
+    b.is_floor(99, 69)  # visit in a different order
+    assert a.crop(0, 0, 100, 70) == b.crop(0, 0, 100, 70)
+    assert a.crop(0, 0, 100, 70) != ChunkedMap(100, 70, seed=6, chunk=32).crop(0, 0, 100, 70)
+
+    mid = 16
+    assert all(a.is_floor(x, mid) for x in range(1, 99))  # corridors join the chunks
+    assert not any(a.is_floor(x, 0) or a.is_floor(x, 69) for x in range(100))
+    assert not a.is_floor(0, mid) and not a.is_floor(99, mid)
+
+
+def test_lru_eviction_regenerates_but_keeps_edits() -> None:
+    world = ChunkedMap(256, 256, seed=9, chunk=32, max_resident=2)
+    before = world.crop(0, 0, 32, 32)
+    world.set(5, 5, not world.is_floor(5, 5))
+    edited = world.crop(0, 0, 32, 32)
+    assert edited != before
+    for cx in range(1, 5):
+        world.is_floor(cx * 32, 40)
+    assert len(world.resident()) == 2 and world.evicted >= 2
+    assert world.crop(0, 0, 32, 32) == edited
+
+    world.is_floor(200, 200)
+    assert world.evict_far([(210, 210)], margin=0) == 1
+    assert world.resident() == [(6, 6)]
+
+
+def test_windows_match_the_materialised_map() -> None:
+    world = ChunkedMap(96, 80, seed=3, chunk=16)
+    grid = world.crop(0, 0, 96, 80)
+    assert world.crop(-3, 70, 20, 15) == grid.crop(-3, 70, 20, 15)
+    assert world.base_window(10, 10, 30, 20) == grid.base_window(10, 10, 30, 20)
+    assert all(world.row_span(y, 40, 33) == grid.row_span(y, 40, 33) for y in range(80))
+    assert world.is_floor(24, 8)  # on the vertical corridor of chunk (1, 0)
@@ -0,0 +1,68 @@
+import struct
+from array import array
+from dataclasses import replace
+
+import pytest
+
+from tec.server import sim as sim_module
+from tec.server.sim import Simulation
+from tec.settings import SETTINGS
+from tec.shared.columns import ColumnTable, overwrite
+from tec.shared.components import Actor, PlayerTag, Position
+from tec.shared.world import World
+
+
+def test_column_table_round_trip_and_swap_remove() -> None:
+    table: ColumnTable[Position] = ColumnTable(Position)
+    for eid in (1, 2, 3):
+        table[eid] = Position(eid, eid * 10)
+    del table[1]  # last slot (eid 3) moves into the hole
+    assert list(table) == [3, 2]
+    assert table.slots == {3: 0, 2: 1}
+    assert list(table.column("y")) == [30, 20]
+    assert table[3] == Position(3, 30)
+    assert 1 not in table
+    with pytest.raises(KeyError):
+        table[1]
+
+
+def test_rows_are_live_views_and_detach_copies() -> None:
+    world = World()
+    eid = world.create()
+    world.add(eid, Actor(energy=1.5))
+    world.use_columns(Actor)
+    row = world.get(Actor)[eid]
+    row.energy += 2.0
+    copy = world.detached(Actor, eid)
+    row.energy = 0.0
+    assert isinstance(copy, Actor) and copy.energy == 3.5
+    assert world.get(Actor)[eid].energy == 0.0
+    with pytest.raises(TypeError):
+        world.use_columns(PlayerTag)
+
+
+def test_columnar_sim_moves_like_object_storage(monkeypatch: pytest.MonkeyPatch) -> None:
+    paths = []
+    for columnar in (False, True):
+        monkeypatch.setattr(sim_module, "SETTINGS", replace(SETTINGS, columnar_components=columnar))
+        sim = Simulation()
+        eid = sim.spawn_player()
+        assert isinstance(sim.world.get(Position), ColumnTable) == columnar
+        for dx, dy in ((1, 0), (0, 1), (-1, 0)):
+            sim.enqueue_move(eid, dx, dy)
+        path = []
+        for _ in range(30):
+            sim.tick()
+            path.append((sim.position(eid), sim.actor(eid).energy))
+        paths.append(path)
+        assert sim.snapshot().actor(eid) == sim.world.detached(Actor, eid)
+    assert paths[0] == paths[1]
+
+
+def test_overwrite_writes_into_the_existing_column() -> None:
+    col = array("d", [1.0, 2.0, 3.0])
+    buffer = col.buffer_info()
+    overwrite(col, (v * 2 for v in col))
+    assert col == array("d", [2.0, 4.0, 6.0]) and col.buffer_info() == buffer
+    with pytest.raises(struct.error):
+        overwrite(col, [1.0])
@@ -0,0 +1,59 @@
+import dataclasses
+
+import pytest
+
+from tec.server import sim as sim_module
+from tec.server.sim import Simulation
+from tec.settings import SETTINGS
+from tec.shared.bitmap import Bitmap
+from tec.shared.components import Position
+from tec.shared.fov import shadowcast
+
+
+def _expected(sim: Simulation, eid: int) -> Bitmap:
+    pos = sim.world.get(Position)[eid]
+    cells = shadowcast(pos.x, pos.y, sim.effective_radius(eid), sim.tiles.is_opaque)
+    return Bitmap.from_cells(sim.tiles.width, sim.tiles.height, cells)
+
+
+def test_tick_casts_once_per_unique_origin() -> None:
+    sim = Simulation()
+    a, b, c = sim.spawn_player(), sim.spawn_player(), sim.spawn_player()
+    pos_c = sim.world.get(Position)[c]
+    pos_c.x, pos_c.y = pos_c.x - 1, pos_c.y
+
+    sim.update_fov()
+    assert sim.fov_cache.misses == 2  # a and b share the spawn tile
+    assert sim.visible[a] is sim.visible[b]
+    for eid in (a, b, c):
+        assert sim.visible[eid] == _expected(sim, eid)
+
+    # Nothing moved: the next pass reuses published results without lookups.
+    sim.update_fov()
+    assert (sim.fov_cache.hits, sim.fov_cache.misses) == (0, 2)
+    assert sim.visible_for(a) is sim.visible[a]
+
+
+def test_visible_for_recomputes_after_map_edit() -> None:
+    sim = Simulation()
+    eid = sim.spawn_player()
+    sim.update_fov()
+    before = sim.visible_for(eid)
+    sim.tiles.set(0, 0, True)
+    assert sim.visible_for(eid) is not before
+    assert sim.fov_cache.misses == 2
+
+
+def test_process_pool_matches_inline(monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = dataclasses.replace(SETTINGS, fov_workers=2, fov_parallel_min=1)
+    monkeypatch.setattr(sim_module, "SETTINGS", settings)
+    sim = Simulation()
+    eids = [sim.spawn_player() for _ in range(4)]
+    for i, eid in enumerate(eids):
+        sim.world.get(Position)[eid].x += i
+    try:
+        sim.update_fov()
+    finally:
+        sim.close()
+    for eid in eids:
+        assert sim.visible[eid] == _expected(sim, eid)
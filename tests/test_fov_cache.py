@@ -0,0 +1,36 @@
+from tec.server.net import JsonServer
+from tec.server.sim import Simulation
+from tec.shared.fov import FovCache
+
+
+def test_fov_cache_lru_and_counters() -> None:
+    cache: FovCache[str] = FovCache(capacity=2)
+    calls: list[int] = []
+
+    def compute(tag: int) -> str:
+        calls.append(tag)
+        return f"fov{tag}"
+
+    assert cache.lookup(1, 1, 5, 1, lambda: compute(1)) == "fov1"
+    assert cache.lookup(1, 1, 5, 1, lambda: compute(1)) == "fov1"
+    assert cache.lookup(2, 1, 5, 1, lambda: compute(2)) == "fov2"
+    assert cache.lookup(3, 1, 5, 1, lambda: compute(3)) == "fov3"  # evicts (1,1)
+    assert cache.lookup(1, 1, 5, 1, lambda: compute(1)) == "fov1"
+    assert calls == [1, 2, 3, 1]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 4, 2)
+    assert cache.hit_ratio == 0.2
+
+
+def test_players_on_spawn_share_one_fov() -> None:
+    sim = Simulation()
+    server = JsonServer(sim)
+    a, b = sim.spawn_player(), sim.spawn_player()
+    for eid in (a, b):
+        server._view_update(eid)
+    stats = server.fov_stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+
+    # Editing the map bumps its version, so the next lookup recomputes.
+    sim.tiles.set(0, 0, True)
+    server._view_update(a)
+    assert server.fov_stats()["misses"] == 2
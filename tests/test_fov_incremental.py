@@ -0,0 +1,45 @@
+import random
+
+from tec.server.sim import Simulation
+from tec.shared.bitmap import Bitmap
+from tec.shared.components import Position
+from tec.shared.fov import FovTracker, shadowcast_grid
+from tec.shared.mapgen import generate_map
+from tec.shared.systems.movement import try_move
+
+
+def test_tracker_steps_report_exact_added_and_removed() -> None:
+    grid = generate_map(100, 40, 1337)
+    tracker = FovTracker()
+    pos = Position(50, 20)
+    rng = random.Random(5)
+    seen: set[tuple[int, int]] = set()
+    for step in range(60):
+        radius = 9 if step < 40 else 6
+        key = (pos.x, pos.y, radius, grid.version)
+
+        def cast(x: int = pos.x, y: int = pos.y, r: int = radius) -> Bitmap:
+            return shadowcast_grid(x, y, r, grid, Bitmap(grid.width, grid.height))
+
+        delta = tracker.update(key, cast)
+        now = set(delta.visible)
+        assert set(delta.added) == now - seen
+        assert set(delta.removed) == seen - now
+        seen = now
+        try_move(pos, rng.choice([-1, 0, 1]), rng.choice([-1, 0, 1]), grid)
+
+    assert tracker.full == 2  # first cast and the radius change
+    assert tracker.steps + tracker.reused == 58
+
+
+def test_explored_grows_from_added_cells() -> None:
+    sim = Simulation()
+    eid = sim.spawn_player()
+    pos = sim.world.get(Position)[eid]
+    union = Bitmap(sim.tiles.width, sim.tiles.height)
+    for dx in (1, 1, 0, -1, -1, -1):
+        try_move(pos, dx, 1, sim.tiles)
+        union.update(sim.visible_for(eid))
+        delta = sim.fov_delta(eid)
+        assert delta is not None and delta.visible is sim.visible[eid]
+    assert sim.explored[eid] == union
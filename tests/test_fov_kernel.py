@@ -0,0 +1,36 @@
+import random
+
+from tec.shared.bitmap import Bitmap
+from tec.shared.fov import shadowcast, shadowcast_grid
+from tec.shared.grid import TileGrid
+from tec.shared.mapgen import generate_map
+
+
+def test_grid_kernel_matches_reference_on_random_grids() -> None:
+    rng = random.Random(2024)
+    for _ in range(300):
+        w, h = rng.randint(1, 40), rng.randint(1, 40)
+        density = rng.random()
+        data = bytearray(1 if rng.random() < density else 0 for _ in range(w * h))
+        grid = TileGrid(w, h, data)
+        px, py = rng.randint(-2, w + 1), rng.randint(-2, h + 1)
+        radius = rng.randint(-1, 25)
+
+        expected = shadowcast(px, py, radius, grid.is_opaque)
+        assert shadowcast_grid(px, py, radius, grid) == expected
+        bitmap = shadowcast_grid(px, py, radius, grid, Bitmap(w, h))
+        assert bitmap == Bitmap.from_cells(w, h, expected)
+
+
+def test_grid_kernel_hides_cells_behind_wall() -> None:
+    # Same scenario as test_fov_masking: a vertical wall at x == 2.
+    grid = TileGrid.from_rows([[True, True, False, True, True]] * 5)
+    vis = shadowcast_grid(1, 2, 8, grid)
+    assert all((x, y) in vis for y in range(5) for x in range(3))
+    assert (3, 2) not in vis and (4, 2) not in vis
+
+
+def test_grid_kernel_on_generated_map() -> None:
+    grid = generate_map(100, 40, 1337)
+    for x, y in [(50, 20), (10, 5), (95, 38)]:
+        assert shadowcast_grid(x, y, 9, grid) == shadowcast(x, y, 9, grid.is_opaque)
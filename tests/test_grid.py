@@ -0,0 +1,54 @@
+from tec.shared.grid import TileGrid, as_grid
+from tec.shared.mapgen import generate_map
+
+
+def test_grid_round_trips_nested_lists() -> None:
+    rows = [
+        [True, False, True],
+        [False, True, False],
+    ]
+    grid = TileGrid.from_rows(rows)
+    assert (grid.width, grid.height) == (3, 2)
+    assert grid.to_rows() == rows
+    # Legacy indexing keeps working on the zero-copy row views.
+    assert len(grid) == 2 and len(grid[0]) == 3
+    assert grid[1][1] and not grid[1][0]
+    assert as_grid(grid) is grid
+
+
+def test_grid_bounds_checked_lookup() -> None:
+    grid = TileGrid.from_rows([[True, True], [True, False]])
+    assert grid.is_floor(0, 0)
+    assert not grid.is_floor(1, 1)
+    assert not grid.is_floor(-1, 0) and not grid.is_floor(2, 0)
+    assert grid.is_opaque(5, 5) and grid.is_opaque(1, 1)
+
+
+def test_grid_crop_pads_off_map_with_walls() -> None:
+    grid = TileGrid(3, 3, bytearray(b"\x01" * 9))
+    window = grid.crop(-1, 1, 3, 3)
+    assert window.to_rows() == [
+        [False, True, True],
+        [False, True, True],
+        [False, False, False],
+    ]
+    assert grid.column(0) == b"\x01\x01\x01"
+    assert grid.base_glyphs() == b"." * 9
+
+
+def test_generate_map_returns_grid() -> None:
+    grid = generate_map(20, 10, seed=3)
+    assert (grid.width, grid.height) == (20, 10)
+    assert grid.is_floor(10, 5)  # walk starts at the center
+    assert generate_map(20, 10, seed=3) == grid
+
+
+def test_grid_version_tracks_edits_and_base_cache() -> None:
+    grid = TileGrid.from_rows([[True, False], [False, True]])
+    v0 = grid.version
+    assert grid.base_glyphs() == b".##."
+    assert grid.base_glyphs() is grid.base_glyphs()  # encoded once per version
+    grid.set(1, 0, True)
+    assert grid.version != v0
+    assert grid.base_glyphs() == b"..#."
+    assert grid.base_window(1, 1, 2, 2) == b".###"
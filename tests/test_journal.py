@@ -0,0 +1,181 @@
+import asyncio
+import random
+import struct
+from pathlib import Path
+
+import pytest
+
+from tec.server import persist
+from tec.server.journal import MOVE, SPAWN, WAIT, ActionJournal, read_batches
+from tec.server.replay import replay
+from tec.server.sim import Simulation
+from tec.shared.components import Actor, Needs
+
+
+def _play(sim: Simulation, ticks: int, seed: int = 7) -> None:
+    """Drive `sim` with random inputs, flushing its journal after every tick."""
+    rng = random.Random(seed)
+    eids: list[int] = []
+    for _ in range(ticks):
+        if len(eids) < 4 or rng.random() < 0.05:
+            eids.append(sim.spawn_player())
+        if rng.random() < 0.03:
+            sim.despawn(eids.pop(rng.randrange(len(eids))))
+        if rng.random() < 0.05:
+            sim.set_tile(rng.randrange(1, 99), rng.randrange(1, 39), rng.random() < 0.5)
+        for eid in eids:
+            if rng.random() < 0.3:
+                sim.enqueue_move(eid, rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))
+            elif rng.random() < 0.1:
+                sim.enqueue_wait(eid)
+        sim.tick()
+        if sim.journal is not None:
+            sim.journal.flush(sim.ticks)
+
+
+def _state(sim: Simulation) -> list[object]:
+    w = sim.world
+    return [
+        sim.ticks,
+        sim.time_s,
+        sim.tiles,
+        w.next_id,
+        w.generations,
+        {e: (sim.position(e), w.detached(Actor, e), w.detached(Needs, e)) for e in w.get(Actor)},
+        list(sim.action_queues.items()),
+    ]
+
+
+def test_journal_round_trip_batches_by_tick(tmp_path: Path) -> None:
+    path = tmp_path / "inputs.journal"
+    journal = ActionJournal(path)
+    journal.record(1, SPAWN, 1)
+    journal.record(1, MOVE, 1, -1, 1)
+    journal.record(3, WAIT, 1)
+    assert journal.flush(3) > 0
+    assert journal.flush(3) == 0  # nothing new, mark already written
+    journal.close()
+    assert list(read_batches(path)) == [
+        (1, [(SPAWN, 1, 0, 0), (MOVE, 1, -1, 1)]),
+        (3, [(WAIT, 1, 0, 0)]),
+        (3, []),
+    ]
+    assert (journal.batches, journal.records) == (2, 3)
+
+
+def test_truncated_tail_is_ignored_and_dropped_on_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "inputs.journal"
+    with_tail = ActionJournal(path)
+    with_tail.record(1, SPAWN, 1)
+    with_tail.record(2, WAIT, 1)
+    with_tail.close()
+    path.write_bytes(path.read_bytes()[:-5])  # crash in the middle of the last batch
+    assert list(read_batches(path)) == [(1, [(SPAWN, 1, 0, 0)])]
+
+    reopened = ActionJournal(path)
+    reopened.record(4, WAIT, 1)
+    reopened.close()
+    assert [tick for tick, _ in read_batches(path)] == [1, 4]
+
+
+def test_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "bogus.journal"
+    path.write_bytes(b"not a journal")
+    with pytest.raises(ValueError):
+        ActionJournal(path)
+    with pytest.raises(ValueError):
+        list(read_batches(path))
+
+
+def test_replay_from_scratch_reproduces_the_session(tmp_path: Path) -> None:
+    path = tmp_path / "inputs.journal"
+    journal = ActionJournal(path)
+    live = Simulation(journal=journal)
+    _play(live, 200)
+    journal.close()
+
+    replayed = Simulation()
+    stats = replay(replayed, path)
+    assert _state(replayed) == _state(live)
+    assert stats.ticks == 200 and stats.inputs > 0 and stats.ticks_per_s > 0
+
+
+def test_crash_recovery_replays_only_inputs_after_the_checkpoint(tmp_path: Path) -> None:
+    path = tmp_path / "inputs.journal"
+    world = tmp_path / "world.bin"
+    journal = ActionJournal(path)
+    live = Simulation(journal=journal)
+    _play(live, 80, seed=1)
+    persist.save(live, world)  # checkpoint, then keep playing until the "crash"
+    _play(live, 70, seed=2)
+    journal.close()
+
+    recovered = persist.load(world)
+    replay(recovered, path)
+    assert _state(recovered) == _state(live)
+    assert recovered.journal is None
+
+
+def test_checkpoint_rotates_the_journal_to_post_checkpoint_inputs(tmp_path: Path) -> None:
+    path = tmp_path / "inputs.journal"
+    world = tmp_path / "world.bin"
+    journal = ActionJournal(path)
+    live = Simulation(journal=journal)
+    checkpointer = persist.Checkpointer(live, world, every_ticks=1_000)
+
+    async def scenario() -> None:
+        _play(live, 80, seed=1)
+        checkpointer.checkpoint()  # captured at tick 80, written while play goes on
+        _play(live, 30, seed=2)
+        await checkpointer.flush()
+        _play(live, 40, seed=3)
+
+    asyncio.run(scenario())
+    journal.close()  # "crash": no final save
+    assert checkpointer.written == 1 and checkpointer.errors == 0
+    batches = list(read_batches(path))
+    assert batches and min(tick for tick, _ in batches) == 81
+    assert any(records for _, records in batches)
+
+    recovered = persist.load(world)
+    assert recovered.ticks == 80
+    replay(recovered, path)
+    assert _state(recovered) == _state(live)
+
+    reopened = ActionJournal(path)  # the rotated file is still appendable
+    reopened.record(200, WAIT, 1)
+    reopened.close()
+    assert list(read_batches(path))[-1] == (200, [(WAIT, 1, 0, 0)])
+
+
+def test_replay_until_tick_runs_past_the_journal(tmp_path: Path) -> None:
+    path = tmp_path / "inputs.journal"
+    journal = ActionJournal(path)
+    live = Simulation(journal=journal)
+    _play(live, 30)
+    journal.close()
+
+    replayed = Simulation()
+    replay(replayed, path, until_tick=50)
+    for _ in range(20):
+        live.tick()
+    assert _state(replayed) == _state(live)
+
+
+def test_rejected_inputs_leave_queue_and_journal_consistent(tmp_path: Path) -> None:
+    path = tmp_path / "inputs.journal"
+    journal = ActionJournal(path)
+    live = Simulation(journal=journal)
+    eid = live.spawn_player()
+    with pytest.raises(ValueError):
+        live.enqueue_move(eid, 2**31, 0)  # off the one-tile grid: rejected up front
+    with pytest.raises(struct.error):
+        live.enqueue_wait(2**70)  # cannot be journaled, so it must not act either
+    assert not live.action_queues[eid] and 2**70 not in live.action_queues
+    live.enqueue_move(eid, 0, 1)
+    _play(live, 20)
+    journal.close()
+
+    replayed = Simulation()
+    replay(replayed, path)
+    assert _state(replayed) == _state(live)
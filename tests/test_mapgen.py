@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import pytest
+
+from tec.shared.mapcache import cache_path, cached_map, load_map
+from tec.shared.mapgen import generate_map, generate_map_reference
+
+
+@pytest.mark.parametrize(
+    ("width", "height", "seed"), [(100, 40, 1337), (64, 64, 7), (37, 11, 0), (3, 3, 5), (1, 6, 2)]
+)
+def test_fast_generator_is_bit_identical(width: int, height: int, seed: int) -> None:
+    assert generate_map(width, height, seed) == generate_map_reference(width, height, seed)
+
+
+def test_cache_round_trip_and_rejects_foreign_files(tmp_path: Path) -> None:
+    grid = cached_map(60, 30, 11, tmp_path)
+    path = cache_path(tmp_path, 60, 30, 11)
+    assert path.exists() and grid == generate_map(60, 30, 11)
+    assert cached_map(60, 30, 11, tmp_path) == grid
+    assert load_map(path, 60, 30, 12) is None  # same size, other seed
+    assert load_map(path, 30, 60, 11) is None
+
+    path.write_bytes(path.read_bytes()[:-1])  # truncated file: regenerated and rewritten
+    assert load_map(path, 60, 30, 11) is None
+    assert cached_map(60, 30, 11, tmp_path) == grid
+    assert load_map(path, 60, 30, 11) == grid
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
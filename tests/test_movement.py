@@ -1,4 +1,9 @@
+import pytest
+
+from tec.server.sim import Simulation
 from tec.shared.components import Actor, Position
+from tec.shared.grid import TileGrid
+from tec.shared.opacity import OpacityLayer
 from tec.shared.systems.movement import try_move
 from tec.shared.world import World
 
@@ -18,3 +23,40 @@ def test_try_move_blocks_walls() -> None:
     assert (p.x, p.y) == (1, 1)
     try_move(p, 0, 1, tiles)  # into wall (should not move)
     assert (p.x, p.y) == (1, 1)
+
+
+def test_try_move_on_opacity_layer_rejects_off_map_and_wrapping_steps() -> None:
+    grid = TileGrid(5, 4, bytearray(b"\x01" * 20))  # all floor; the layer pads it with walls
+    layer = OpacityLayer(grid)
+    p = Position(2, 2)
+    for dx, dy in ((100_000, 0), (0, -100_000), (-(grid.width + 2), 0), (grid.width + 1, -1)):
+        assert not try_move(p, dx, dy, layer)
+        assert (p.x, p.y) == (2, 2)
+    assert try_move(p, -2, 0, layer)  # in-map targets still work for any delta
+    assert (p.x, p.y) == (0, 2)
+
+
+def test_simulation_rejects_moves_larger_than_one_tile() -> None:
+    sim = Simulation()
+    eid = sim.spawn_player()
+    for dx, dy in ((100_000, 0), (-(sim.tiles.width + 2), 0), (0, 2)):
+        with pytest.raises(ValueError):
+            sim.enqueue_move(eid, dx, dy)
+    assert not sim.action_queues[eid]
+    sim.tick()  # nothing queued, nothing to crash on
+    assert sim.tiles.is_floor(*sim.position(eid))
+
+
+def test_try_move_on_nested_rows_reads_only_the_target_cell(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def no_conversion(rows: object) -> TileGrid:
+        raise AssertionError("try_move converted the whole map")
+
+    monkeypatch.setattr(TileGrid, "from_rows", staticmethod(no_conversion))
+    rows = [[False, False, False, False], [False, True, True, False], [False, False, False]]
+    p = Position(1, 1)
+    assert try_move(p, 1, 0, rows) and (p.x, p.y) == (2, 1)
+    assert not try_move(p, 1, 1, rows)  # past the end of a short row
+    assert not try_move(p, 0, -2, rows) and not try_move(p, 0, 5, rows)
+    assert (p.x, p.y) == (2, 1)
@@ -0,0 +1,64 @@
+import random
+
+from tec.server.sim import Simulation
+from tec.shared.components import Position
+from tec.shared.fov import shadowcast_grid
+from tec.shared.grid import TileGrid
+from tec.shared.opacity import OpacityLayer
+
+
+def test_layer_mirrors_grid_with_opaque_border() -> None:
+    grid = TileGrid.from_rows([[True, False, True], [True, True, False]])
+    layer = OpacityLayer(grid)
+    for y in range(-1, 3):
+        for x in range(-1, 4):
+            assert layer.is_opaque(x, y) == grid.is_opaque(x, y)
+            assert layer.is_clear(x, y) == grid.is_floor(x, y)
+
+
+def test_change_feed_reports_dirty_rects() -> None:
+    grid = TileGrid(10, 10)
+    layer = OpacityLayer(grid, log_size=2)
+    start = layer.version
+    grid.set(3, 4, True)
+    layer.refresh(grid, (3, 4, 4, 5))
+    assert layer.changes_since(start) == [(3, 4, 4, 5)]
+    assert layer.is_clear(3, 4)
+    assert layer.dirty_since(start, 0, 0, 4, 5) and not layer.dirty_since(start, 5, 5, 9, 9)
+    assert layer.changes_since(layer.version) == []
+    layer.refresh(grid, (0, 0, 1, 1))
+    layer.refresh(grid, (1, 1, 2, 2))
+    assert layer.changes_since(start) is None  # history dropped: assume everything changed
+
+
+def test_kernel_on_layer_matches_grid() -> None:
+    rng = random.Random(11)
+    for _ in range(100):
+        w, h = rng.randint(1, 30), rng.randint(1, 30)
+        grid = TileGrid(w, h, bytearray(rng.random() < 0.7 for _ in range(w * h)))
+        layer = OpacityLayer(grid)
+        px, py, r = rng.randint(-1, w), rng.randint(-1, h), rng.randint(0, 20)
+        assert shadowcast_grid(px, py, r, layer) == shadowcast_grid(px, py, r, grid)
+
+
+def test_map_edits_only_recast_viewers_in_range() -> None:
+    sim = Simulation()
+    eid = sim.spawn_player()
+    pos = sim.world.get(Position)[eid]
+    sim.update_fov()
+    misses = sim.fov_cache.misses
+
+    far_x = 0 if pos.x > sim.tiles.width // 2 else sim.tiles.width - 1
+    sim.set_tile(far_x, 0, True)
+    sim.update_fov()
+    assert sim.fov_cache.misses == misses
+
+    sim.set_tile(pos.x + 1, pos.y, not sim.tiles.is_floor(pos.x + 1, pos.y))
+    sim.update_fov()
+    assert sim.fov_cache.misses == misses + 1
+    assert sim.opacity.is_opaque(pos.x + 1, pos.y) == sim.tiles.is_opaque(pos.x + 1, pos.y)
+
+    # Edits made directly on the grid are picked up by a full resync.
+    sim.tiles.set(far_x, 0, False)
+    sim.update_fov()
+    assert sim.fov_cache.misses == misses + 2
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import cast
+
+import pytest
+
+from tec.server.outbox import POLICY_DISCONNECT, Outbox
+
+
+class _SlowWriter:
+    """Stream stand-in whose drain() blocks until released."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.closed = False
+        self.release = asyncio.Event()
+
+    def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+
+    async def drain(self) -> None:
+        await self.release.wait()
+        self.release.clear()
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_keyed_messages_coalesce_and_overflow_drops() -> None:
+    async def scenario() -> None:
+        outbox = Outbox(cast(asyncio.StreamWriter, _SlowWriter()), lambda kf: [], max_queue=3)
+        for i in range(5):
+            outbox.send(b"pos%d" % i, key="pos")
+        assert (outbox.depth, outbox.coalesced) == (1, 4)
+        for i in range(4):
+            outbox.send(b"log%d" % i)
+        assert outbox.dropped == 2 and outbox.depth == 3
+        assert outbox.stats()["max_depth"] == 3
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_policy_closes_lagging_client() -> None:
+    async def scenario() -> None:
+        writer = _SlowWriter()
+        outbox = Outbox(cast(asyncio.StreamWriter, writer), lambda kf: [], 1, POLICY_DISCONNECT)
+        outbox.send(b"a")
+        outbox.send(b"b")
+        assert outbox.closed and writer.closed
+
+    asyncio.run(scenario())
+
+
+def test_slow_client_gets_only_the_latest_view() -> None:
+    async def scenario() -> None:
+        writer = _SlowWriter()
+        renders: list[bool] = []
+        frame = [0]
+
+        def render(keyframe: bool) -> list[bytes]:
+            renders.append(keyframe)
+            return [b"view%d" % frame[0]]
+
+        outbox = Outbox(cast(asyncio.StreamWriter, writer), render)
+        task = asyncio.create_task(outbox.run())
+        outbox.mark_view(keyframe=True)
+        await asyncio.sleep(0)  # first flush: writes, then blocks in drain
+        for frame[0] in range(1, 6):  # five ticks while the socket is stuck
+            outbox.mark_view()
+        writer.release.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        writer.release.set()
+        await asyncio.sleep(0)
+        assert writer.chunks == [b"view0", b"view5"]
+        assert renders == [True, False] and outbox.coalesced == 4
+        outbox.close()
+        await task
+
+    asyncio.run(scenario())
+
+
+def test_failing_render_closes_the_session_and_is_logged(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    def render(keyframe: bool) -> list[bytes]:
+        raise KeyError("despawned mid-tick")
+
+    async def scenario() -> None:
+        writer = _SlowWriter()
+        outbox = Outbox(cast(asyncio.StreamWriter, writer), render)
+        task = asyncio.create_task(outbox.run())
+        outbox.mark_view(keyframe=True)
+        await asyncio.wait_for(task, 1.0)  # the writer task ends instead of dying silently
+        assert outbox.closed and writer.closed
+        outbox.send(b"log")
+        assert outbox.depth == 0  # nothing piles up behind a dead writer
+
+    with caplog.at_level(logging.ERROR, logger="tec.server.outbox"):
+        asyncio.run(scenario())
+    assert "session writer failed" in caplog.text
@@ -0,0 +1,118 @@
+import asyncio
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from tec.server import persist
+from tec.server import sim as sim_module
+from tec.server.persist import Checkpointer
+from tec.server.sim import Simulation
+from tec.settings import SETTINGS
+from tec.shared.columns import ColumnTable
+from tec.shared.components import Actor, Needs, PlayerTag, Position
+
+
+def _played() -> tuple[Simulation, list[int]]:
+    sim = Simulation()
+    eids = [sim.spawn_player() for _ in range(3)]
+    sim.despawn(eids.pop(1))
+    eids.append(sim.spawn_player())  # reuses the freed index
+    sim.world.add(eids[0], PlayerTag("ada"))
+    x, y = sim.position(eids[0])
+    sim.set_tile(x + 2, y, not sim.tiles.is_floor(x + 2, y))
+    for eid in eids:
+        sim.enqueue_move(eid, 1, 0)
+        sim.enqueue_move(eid, 0, 1)
+    for _ in range(6):
+        sim.tick()
+    return sim, eids
+
+
+def _state(sim: Simulation, eids: list[int]) -> list[object]:
+    w = sim.world
+    return [
+        sim.ticks,
+        sim.time_s,
+        sim.tiles,
+        w.next_id,
+        w.generations,
+        list(w.free),
+        [(sim.position(e), w.detached(Actor, e), w.detached(Needs, e)) for e in eids],
+        dict(w.get(PlayerTag)),
+        {e: sim.explored[e] for e in eids},
+        list(sim.action_queues.items()),
+    ]
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_round_trip_restores_world_and_keeps_simulating_identically(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, columnar: bool
+) -> None:
+    patched = replace(SETTINGS, columnar_components=columnar)
+    monkeypatch.setattr(sim_module, "SETTINGS", patched)
+    monkeypatch.setattr(persist, "SETTINGS", patched)
+    sim, eids = _played()
+    sim.enqueue_wait(eids[1])
+    sim.enqueue_move(eids[1], 0, -1)
+    path = tmp_path / "world.bin"
+    persist.save(sim, path)
+    restored = persist.load(path)
+    assert _state(restored, eids) == _state(sim, eids)
+    assert isinstance(restored.world.get(Position), ColumnTable) == columnar
+    here = sim.position(eids[0])
+    assert sorted(restored.spatial.at(*here)) == sorted(sim.spatial.at(*here))
+
+    for s in (sim, restored):
+        for eid in eids:
+            s.enqueue_move(eid, -1, 0)
+        for _ in range(4):
+            s.tick()
+    assert _state(restored, eids) == _state(sim, eids)
+
+
+def test_load_rejects_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "bogus.bin"
+    path.write_bytes(b"not a world file")
+    with pytest.raises(ValueError):
+        persist.load(path)
+
+
+def test_checkpointer_writes_in_background(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        sim, eids = _played()
+        path = tmp_path / "ckpt" / "world.bin"
+        checkpointer = Checkpointer(sim, path, every_ticks=2)
+        sim.tick()
+        checkpointer.poll()  # not due yet
+        sim.tick()
+        checkpointer.poll()
+        sim.tick()
+        sim.tick()
+        checkpointer.poll()  # due again; the first write may still be running
+        await checkpointer.flush()
+        assert checkpointer.written + checkpointer.skipped == 2 and checkpointer.errors == 0
+        assert persist.load(path).ticks in (sim.ticks - 2, sim.ticks)
+
+    asyncio.run(scenario())
+
+
+def test_from_snapshot_rebuilds_the_published_tick(tmp_path: Path) -> None:
+    sim, eids = _played()
+    sim.despawn(eids.pop())
+    snap = sim.snapshot()
+    sim.tick()  # the live world moves on; the snapshot does not
+    path = tmp_path / "world.bin"
+    persist.save(persist.from_snapshot(snap, sim.tick_len), path)
+    restored = persist.load(path)
+    assert restored.ticks == snap.tick and restored.time_s == snap.time_s
+    assert (restored.world.generations, list(restored.world.free)) == (
+        list(snap.generations),
+        list(snap.free),
+    )
+    for eid in eids:
+        assert restored.position(eid) == snap.position(eid)
+        assert restored.world.detached(Actor, eid) == snap.actor(eid)
+        assert restored.world.detached(Needs, eid) == snap.needs[eid]
+        assert restored.explored[eid] == snap.explored_for(eid)
+    assert restored.spawn_player() == sim.spawn_player()  # same free-list reuse order
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from tec.server.net import JsonServer
+from tec.server.protocol import (
+    FRAME_HEADER,
+    bin_json,
+    bin_pos,
+    bin_stats,
+    bin_view,
+    build_view,
+    decode_frame,
+    ev_map,
+    ev_pos,
+    ev_stats,
+    ev_view_delta,
+    ev_view_frame,
+    ev_welcome,
+)
+from tec.server.sim import Simulation
+from tec.shared.fov import shadowcast
+from tec.shared.mapgen import generate_map
+
+
+def _body(frame: bytes) -> bytes:
+    (length,) = FRAME_HEADER.unpack_from(frame)
+    assert len(frame) == FRAME_HEADER.size + length
+    return frame[FRAME_HEADER.size :]
+
+
+def test_pos_and_stats_round_trip() -> None:
+    assert decode_frame(_body(bin_pos(-3, 12))) == json.loads(ev_pos(-3, 12))
+    args = (1.25, 0.1 + 0.2, 12.5, 1 / 3)
+    assert decode_frame(_body(bin_stats(*args))) == json.loads(ev_stats(*args))
+
+
+def test_view_round_trips_against_json_shape() -> None:
+    grid = generate_map(40, 20, seed=5)
+    vis = shadowcast(20, 10, 6, grid.is_opaque)
+    explored = set(vis) | {(x, 3) for x in range(40)}
+    # Odd width exercises the nibble padding.
+    frame = build_view(3, 2, grid, vis, explored, w=31, h=15)
+    for seq, base_version in ((None, None), (7, None), (8, grid.version)):
+        expected = json.loads(ev_view_frame(frame, seq, base_version))
+        packed = bin_view(frame, seq, base_version)
+        assert decode_frame(_body(packed)) == expected
+        assert len(packed) < len(ev_view_frame(frame, seq, base_version)) // 2
+
+
+def test_other_events_travel_as_json_frames() -> None:
+    grid = generate_map(12, 8, seed=1)
+    a = build_view(0, 0, grid, set(), set())
+    b = build_view(0, 0, grid, {(1, 1)}, {(1, 1)})
+    for event in (ev_welcome("hi"), ev_map(grid), ev_view_delta(a, b, 1, 2)):
+        assert decode_frame(_body(bin_json(event))) == json.loads(event)
+
+
+def test_login_negotiates_binary() -> None:
+    async def negotiate(line: bytes) -> tuple[str, object]:
+        server = JsonServer(Simulation())
+        reader = asyncio.StreamReader()
+        reader.feed_data(line)
+        return await server._negotiate(reader)
+
+    login = {"type": "LOGIN", "name": "p", "proto": "bin1"}
+    assert asyncio.run(negotiate(json.dumps(login).encode() + b"\n")) == ("bin1", None)
+    # A client that opens with an action stays on JSON and keeps its message.
+    move = {"type": "MOVE", "dx": 1, "dy": 0}
+    assert asyncio.run(negotiate(json.dumps(move).encode() + b"\n")) == ("json", move)
@@ -0,0 +1,59 @@
+import asyncio
+
+from tec.server.scheduler import FixedStepLoop
+
+
+class _FakeTime:
+    """Manual clock: sleeping and ticking advance it deterministically."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_deadlines_do_not_drift_with_tick_cost() -> None:
+    fake = _FakeTime()
+    starts: list[float] = []
+
+    def tick() -> None:
+        starts.append(fake.now)
+        fake.now += 0.03  # work takes 30% of the period
+
+    loop = FixedStepLoop(0.1, tick, clock=fake.clock, sleep=fake.sleep)
+    asyncio.run(loop.run(max_batches=10))
+    assert [round(t, 6) for t in starts] == [round(0.1 * (i + 1), 6) for i in range(10)]
+    assert loop.stats.overruns == 0 and loop.stats.skipped == 0
+    assert abs(loop.stats.load(0.1) - 0.3) < 1e-9
+    assert loop.stats.jitter_counts[0] == 10
+
+
+def test_stall_catches_up_then_skips_with_accounting() -> None:
+    fake = _FakeTime()
+    costs = iter([0.75] + [0.0] * 20)  # one tick stalls for 7.5 periods
+    broadcasts: list[int] = []
+    ticks = [0]
+
+    def tick() -> None:
+        ticks[0] += 1
+        fake.now += next(costs)
+
+    loop = FixedStepLoop(
+        0.1,
+        tick,
+        lambda: broadcasts.append(ticks[0]),
+        max_catchup=3,
+        clock=fake.clock,
+        sleep=fake.sleep,
+    )
+    asyncio.run(loop.run(max_batches=3))
+    # 7 deadlines passed during the stall: 3 run back to back, 4 skipped.
+    assert loop.stats.overruns == 1
+    assert loop.stats.skipped == 4
+    assert broadcasts == [1, 4, 5]  # one broadcast per batch, not per tick
+    assert loop.stats.max_duration_s == 0.75
+    assert sum(loop.stats.jitter_counts[-1:]) == 1  # the late wake-up landed in >100 ms
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import cast
+
+import pytest
+
+from tec.server.journal import ActionJournal
+from tec.server.net import JsonServer
+from tec.server.runner import SimThread
+from tec.server.sim import Simulation
+from tec.shared.components import Position
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def test_snapshot_is_isolated_from_later_ticks() -> None:
+    sim = Simulation()
+    eid = sim.spawn_player()
+    snap = sim.snapshot()
+    x, y = snap.position(eid)
+    explored = len(snap.explored_for(eid))
+
+    floor = snap.tiles.is_floor(x + 1, y)
+    sim.set_tile(x + 1, y, not floor)
+    sim.world.get(Position)[eid].x += 1
+    sim.tick()
+    assert snap.position(eid) == (x, y)
+    assert snap.tiles.is_floor(x + 1, y) == floor
+    assert len(snap.explored_for(eid)) == explored
+    assert sim.snapshot().explored_for(eid) is not snap.explored_for(eid)
+
+
+def test_sim_thread_applies_inputs_and_publishes_snapshots() -> None:
+    async def scenario() -> None:
+        sim = Simulation(tick_len=0.01)
+        runner = SimThread(sim, asyncio.get_running_loop())
+        server = JsonServer(sim, runner)
+        published: list[int] = []
+        runner.on_publish = lambda: published.append(runner.snapshot.tick)
+        runner.start()
+        try:
+            eid = await runner.spawn_player()
+            start = runner.snapshot.position(eid)
+            x, y = start
+            dx = 1 if sim.opacity.is_clear(x + 1, y) else -1
+            move = {"type": "MOVE", "dx": dx, "dy": 0}
+            await server.dispatch(move, cast(asyncio.StreamWriter, _Writer()), eid)
+            deadline = time.monotonic() + 2.0
+            while runner.snapshot.position(eid) == start and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            assert runner.snapshot.position(eid) == (x + dx, y)
+
+            # The network side renders purely from the published snapshot.
+            outbox = server._attach(cast(asyncio.StreamWriter, _Writer()), eid, "json")
+            await outbox.flush()
+            writer = cast(_Writer, outbox.writer)
+            types = [json.loads(chunk)["type"] for chunk in writer.chunks]
+            assert types == ["WELCOME", "POS", "STATS", "MAP", "VIEW"]
+        finally:
+            runner.stop()
+        assert published and published == sorted(published)
+
+    asyncio.run(scenario())
+
+
+def test_stop_reports_a_thread_that_is_still_ticking() -> None:
+    async def scenario() -> None:
+        sim = Simulation(tick_len=0.01)
+        busy = threading.Event()
+
+        def slow_batch() -> None:
+            if not busy.is_set():
+                busy.set()
+                time.sleep(0.3)
+
+        runner = SimThread(sim, asyncio.get_running_loop(), after_batch=slow_batch)
+        runner.start()
+        busy.wait(2.0)
+        assert not runner.stop(timeout=0.01)  # mid-batch: `sim` is not safe to read
+        assert runner.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failing_command_is_dropped_and_the_thread_keeps_ticking(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    async def scenario() -> None:
+        journal = ActionJournal(tmp_path / "inputs.journal")
+        sim = Simulation(tick_len=0.01, journal=journal)
+        runner = SimThread(sim, asyncio.get_running_loop())
+        runner.start()
+        try:
+            runner.enqueue_wait(2**70)  # the journal cannot encode this id
+            eid = await runner.spawn_player()  # the thread is still serving commands
+            tick = runner.snapshot.tick
+            deadline = time.monotonic() + 2.0
+            while runner.snapshot.tick == tick and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            assert runner.snapshot.tick > tick and eid in runner.snapshot.positions
+        finally:
+            assert runner.stop()
+            journal.close()
+        assert 2**70 not in sim.action_queues
+
+    with caplog.at_level(logging.ERROR, logger="tec.server.runner"):
+        asyncio.run(scenario())
+    assert "dropped a command" in caplog.text
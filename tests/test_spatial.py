@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from tec.server.sim import Simulation
+from tec.shared.spatial import SpatialHash
+
+
+def test_queries_match_linear_scan_through_moves_and_removals() -> None:
+    rng = random.Random(7)
+    index = SpatialHash(chunk=4)
+    where: dict[int, tuple[int, int]] = {}
+    for eid in range(1, 301):
+        where[eid] = (rng.randrange(-20, 60), rng.randrange(-20, 60))
+        index.insert(eid, *where[eid])
+    for eid in rng.sample(sorted(where), 100):
+        where[eid] = (rng.randrange(-20, 60), rng.randrange(-20, 60))
+        index.move(eid, *where[eid])
+    for eid in rng.sample(sorted(where), 50):
+        del where[eid]
+        assert index.remove(eid)
+    assert len(index) == len(where)
+
+    for _ in range(50):
+        x, y, r = rng.randrange(-25, 65), rng.randrange(-25, 65), rng.randrange(0, 12)
+        near = {e for e, (ex, ey) in where.items() if (ex - x) ** 2 + (ey - y) ** 2 <= r * r}
+        assert set(index.in_radius(x, y, r)) == near
+        box = {e for e, (ex, ey) in where.items() if x <= ex < x + r and y <= ey < y + 2 * r}
+        assert sorted(index.in_rect(x, y, x + r, y + 2 * r)) == sorted(box)
+        assert set(index.at(x, y)) == {e for e, p in where.items() if p == (x, y)}
+
+    rebuilt = SpatialHash(chunk=4)
+    rebuilt.rebuild(where.items())
+    assert sorted(rebuilt.in_rect(-20, -20, 60, 60)) == sorted(where)
+    with pytest.raises(ValueError):
+        SpatialHash(chunk=6)
+
+
+def test_simulation_keeps_index_in_sync_with_moves() -> None:
+    sim = Simulation()
+    eid = sim.spawn_player()
+    x, y = sim.position(eid)
+    assert sim.spatial.at(x, y) == [eid]
+    dx = 1 if sim.opacity.is_clear(x + 1, y) else -1
+    sim.enqueue_move(eid, dx, 0)
+    for _ in range(5):
+        sim.tick()
+    assert sim.position(eid) == (x + dx, y)
+    assert sim.spatial.at(x + dx, y) == [eid] and sim.spatial.at(x, y) == []
+    sim.despawn(eid)
+    assert eid not in sim.spatial
@@ -0,0 +1,38 @@
+from tec.shared.components import Actor, Needs
+from tec.shared.systems.energy import accrue_energy
+from tec.shared.systems.needs import tick_needs, tick_needs_many
+from tec.shared.world import World
+
+
+def _world(columnar: bool) -> World:
+    world = World()
+    eids = world.create_many(5)
+    world.add_many(eids, [Actor(energy=0.1 * i, speed=0.3 + 0.07 * i) for i in range(5)])
+    world.add_many(eids, [Needs(hunger=0.01 * i) for i in range(5)])
+    if columnar:
+        world.use_columns(Actor, Needs)
+    return world
+
+
+def test_batch_systems_match_scalar_path_exactly() -> None:
+    scalar = _world(False)
+    actors, needs = scalar.get(Actor), scalar.get(Needs)
+    for _ in range(50):
+        for act in actors.values():
+            act.energy += act.speed
+        for eid in (2, 4):
+            tick_needs(needs[eid], actors[eid])
+    for _ in range(20):
+        for eid in needs:
+            tick_needs(needs[eid], actors[eid])
+    expected = [(actors[e], needs[e]) for e in actors]
+
+    for columnar in (False, True):
+        world = _world(columnar)
+        for _ in range(50):
+            accrue_energy(world.get(Actor))
+            tick_needs_many(world.get(Needs), [2, 4])
+        for _ in range(20):
+            tick_needs_many(world.get(Needs))
+        got = [(world.detached(Actor, e), world.detached(Needs, e)) for e in world.get(Actor)]
+        assert got == expected  # bit-identical floats, not approximately equal
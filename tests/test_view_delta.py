@@ -0,0 +1,76 @@
+import json
+from dataclasses import replace
+
+from tec.server.net import JsonServer
+from tec.server.protocol import apply_runs, diff_runs
+from tec.server.sim import Simulation
+from tec.settings import SETTINGS
+from tec.shared.components import Position
+
+
+def test_diff_runs_round_trip() -> None:
+    old = "....####  ,,%%"
+    new = "..#.####  ..%,"
+    runs = diff_runs(old, new)
+    assert runs == [(2, "#"), (10, ".."), (13, ",")]
+    assert apply_runs(old, runs) == new
+    # JSON turns tuples into lists; applying must still work.
+    assert apply_runs(old, json.loads(json.dumps(runs))) == new
+    assert diff_runs(new, new) == []
+
+
+def _server_with_player() -> tuple[JsonServer, int]:
+    sim = Simulation()
+    server = JsonServer(sim)
+    eid = sim.spawn_player()
+    return server, eid
+
+
+def test_idle_session_sends_nothing_after_keyframe() -> None:
+    server, eid = _server_with_player()
+    first = [json.loads(raw)["type"] for raw in server._view_update(eid)]
+    assert first == ["MAP", "VIEW"]
+    assert server._pos_update(eid) is not None
+    # Nothing moved and nothing changed: no POS, no VIEW.
+    assert server._view_update(eid) == []
+    assert server._pos_update(eid) is None
+
+
+def test_changed_cells_go_out_as_delta() -> None:
+    server, eid = _server_with_player()
+    keyframe = json.loads(server._view_update(eid)[-1])
+    # Pretend the client's frame predates one explored cell on the player's row.
+    pos = server.sim.world.get(Position)[eid]
+    cache = server.views[eid]
+    assert cache.frame is not None
+    vx0, vy0 = cache.frame.x, cache.frame.y
+    i = (pos.y - vy0) * cache.frame.w + (pos.x + 1 - vx0)
+    cache.frame = replace(cache.frame, mem=cache.frame.mem[:i] + "0" + cache.frame.mem[i + 1 :])
+    keyframe["mem"] = cache.frame.mem
+
+    (raw,) = server._view_update(eid)
+    delta = json.loads(raw)
+    assert delta["type"] == "VIEW_DELTA"
+    assert delta["ref"] == keyframe["seq"] and delta["seq"] == keyframe["seq"] + 1
+    assert "tiles" not in delta and delta["mem"] == [[i, "1"]]
+    assert len(raw) < 200  # a few cells, not the whole viewport
+    assert cache.frame is not None
+    assert apply_runs(keyframe["mem"], delta["mem"]) == cache.frame.mem
+
+
+def test_map_change_resends_map_and_keyframe() -> None:
+    server, eid = _server_with_player()
+    server._view_update(eid)
+    pos = server.sim.world.get(Position)[eid]
+    x, y = pos.x + 1, pos.y
+    server.sim.tiles.set(x, y, not server.sim.tiles.is_floor(x, y))
+    types = [json.loads(raw)["type"] for raw in server._view_update(eid)]
+    assert types == ["MAP", "VIEW"]
+
+
+def test_keyframe_every_n_frames() -> None:
+    server, eid = _server_with_player()
+    server._view_update(eid)
+    server.views[eid].since_key = SETTINGS.view_keyframe_every
+    (raw,) = server._view_update(eid)
+    assert json.loads(raw)["type"] == "VIEW"
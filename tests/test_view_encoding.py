@@ -0,0 +1,46 @@
+import random
+
+from tec.server.protocol import _encode_tile, build_view
+from tec.shared.bitmap import Bitmap
+from tec.shared.grid import TileGrid
+
+
+def _reference_tiles(
+    grid: TileGrid,
+    x0: int,
+    y0: int,
+    w: int,
+    h: int,
+    vis: set[tuple[int, int]],
+    exp: set[tuple[int, int]],
+) -> str:
+    # The original per-cell encoder, kept as the oracle.
+    return "".join(
+        _encode_tile(grid.is_floor(x0 + c, y0 + r), x0 + c, y0 + r, True, vis, exp)
+        for r in range(h)
+        for c in range(w)
+    )
+
+
+def test_batched_encoder_matches_per_cell_encoder() -> None:
+    rng = random.Random(1234)
+    for _ in range(200):
+        mw, mh = rng.randint(1, 40), rng.randint(1, 20)
+        grid = TileGrid(mw, mh, bytearray(rng.getrandbits(1) for _ in range(mw * mh)))
+        cells = [(rng.randint(-3, mw + 2), rng.randint(-3, mh + 2)) for _ in range(mw * mh // 2)]
+        vis = set(cells[: len(cells) // 2])
+        exp = set(cells[len(cells) // 3 :])
+        x0, y0 = rng.randint(-4, mw), rng.randint(-4, mh)
+        w, h = rng.randint(0, mw + 4), rng.randint(0, mh + 4)
+
+        expected = _reference_tiles(grid, x0, y0, w, h, vis, exp)
+        frame = build_view(x0, y0, grid, vis, exp, w, h)
+        assert frame.tiles == expected
+        # Bitmaps only hold on-map cells; the encoder must agree with sets there too.
+        vis_bm = Bitmap.from_cells(mw, mh, vis)
+        exp_bm = Bitmap.from_cells(mw, mh, exp)
+        on_map = _reference_tiles(grid, x0, y0, w, h, set(vis_bm), set(exp_bm))
+        assert build_view(x0, y0, grid, vis_bm, exp_bm, w, h).tiles == on_map
+        assert frame.mem == "".join(
+            "1" if (x0 + c, y0 + r) in exp else "0" for r in range(h) for c in range(w)
+        )
@@ -0,0 +1,36 @@
+import json
+
+from tec.server.net import JsonServer
+from tec.server.protocol import ev_view
+from tec.server.sim import Simulation
+from tec.settings import SETTINGS
+from tec.shared.grid import TileGrid
+
+
+def test_ev_view_crops_to_window() -> None:
+    # 4x3 map, floor everywhere except a wall column at x==2.
+    tiles = TileGrid.from_rows([[True, True, False, True]] * 3)
+    msg = json.loads(ev_view(1, 1, tiles, visible=None, explored={(2, 1)}, w=2, h=2).decode())
+    assert (msg["x"], msg["y"], msg["w"], msg["h"]) == (1, 1, 2, 2)
+    assert msg["tiles"] == ".#.#"
+    assert msg["base"] == ".#.#"
+    assert msg["mem"] == "0100"
+
+
+def test_server_view_payload_is_viewport_sized() -> None:
+    # Regression: VIEW used to carry the whole map in tiles/base/mem.
+    sim = Simulation()
+    server = JsonServer(sim)
+    eid = sim.spawn_player()
+
+    server._view_update(eid)  # first update also carries the MAP
+    server.views[eid].frame = None  # force another keyframe
+    (raw,) = server._view_update(eid)
+    msg = json.loads(raw.decode())
+    cells = SETTINGS.view_w * SETTINGS.view_h
+    assert msg["type"] == "VIEW"
+    assert (msg["w"], msg["h"]) == (SETTINGS.view_w, SETTINGS.view_h)
+    for key in ("tiles", "mem"):
+        assert len(msg[key]) == cells
+    # Two viewport strings plus a small fixed envelope; never the full map.
+    assert len(raw) < 2 * cells + 200
@@ -0,0 +1,51 @@
+from tec.server.sim import Simulation
+from tec.shared.components import Actor, Needs, Position
+from tec.shared.world import World, eid_generation, eid_index
+
+
+def test_destroy_recycles_index_with_new_generation() -> None:
+    world = World()
+    a, b = world.create(), world.create()
+    assert (a, b) == (1, 2)
+    world.add(a, Position(0, 0))
+    world.add(a, Actor())
+    q = world.query(Position, Actor)
+
+    assert world.destroy(a)
+    assert not world.destroy(a)
+    assert not world.alive(a) and a not in q and a not in world.get(Position)
+
+    c = world.create()
+    assert eid_index(c) == eid_index(a) and eid_generation(c) == 1
+    assert world.alive(c) and not world.alive(a)
+    assert world.create() == 3  # free list empty again: fresh index
+
+
+def test_create_many_and_add_many() -> None:
+    world = World()
+    first = world.create()
+    world.destroy(first)
+    eids = world.create_many(4)
+    assert [eid_index(e) for e in eids] == [1, 2, 3, 4]
+    assert all(world.alive(e) for e in eids)
+
+    q = world.query(Position, Needs)
+    world.add_many(eids, [Position(i, i) for i in range(4)])
+    world.add_many(eids[:2], [Needs(), Needs()])
+    assert list(q) == eids[:2]
+    assert world.get(Position)[eids[3]] == Position(3, 3)
+
+
+def test_despawn_drops_all_per_entity_state() -> None:
+    sim = Simulation()
+    eid = sim.spawn_player()
+    sim.enqueue_wait(eid)
+    sim.tick()
+    assert eid in sim.visible and eid in sim.explored
+    assert sim.despawn(eid)
+    assert not sim.despawn(eid)
+    for table in (sim.action_queues, sim.visible, sim.explored, sim.fov_trackers, sim.fov_deltas):
+        assert eid not in table
+    sim.tick()
+    assert eid not in sim.snapshot().positions
+    assert sim.spawn_player() != eid  # same index, next generation
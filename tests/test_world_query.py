@@ -0,0 +1,43 @@
+from tec.server.sim import Simulation
+from tec.shared.components import Actor, Needs, Position
+from tec.shared.world import World
+
+
+def test_query_tracks_add_and_remove_in_stable_order() -> None:
+    world = World()
+    a, b, c = world.create(), world.create(), world.create()
+    for eid in (a, b, c):
+        world.add(eid, Position(0, 0))
+    world.add(c, Actor())
+    world.add(a, Actor())
+
+    q = world.query(Position, Actor)
+    assert world.query(Actor, Position) is q
+    assert world.entities_with(Actor, Position) is q
+    assert list(q) == [c, a]
+
+    world.add(b, Actor())
+    world.add(a, Actor(energy=5.0))  # replacing a component keeps its place
+    assert list(q) == [c, a, b]
+
+    assert world.remove(a, Position)
+    assert not world.remove(a, Position)
+    assert list(q) == [c, b] and a not in q
+    world.add(a, Position(1, 1))
+    assert list(q) == [c, b, a]
+    assert list(world.query(Needs)) == []
+    assert world.entities_with() == ()
+
+
+def test_tick_only_moves_entities_matching_the_movement_query() -> None:
+    sim = Simulation()
+    player = sim.spawn_player()
+    ghost = sim.world.create()  # acts but has nowhere to be
+    sim.world.add(ghost, Actor())
+    sim.enqueue_wait(ghost)
+    sim.enqueue_wait(player)
+    for _ in range(3):
+        sim.tick()
+    assert list(sim.world.query(Actor, Position)) == [player]
+    assert not sim.action_queues[player]
+    assert sim.action_queues[ghost]  # never matched, so never acted
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Compare the reference `shadowcast` with the grid kernel `shadowcast_grid`.
+
+Usage:
+    PYTHONPATH=src python tools/bench_fov.py [--repeat N]
+
+Prints the mean time per call for each kernel on a generated map and on an
+open field, collecting into a `Bitmap` as the server does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from tec.shared.bitmap import Bitmap
+from tec.shared.fov import shadowcast, shadowcast_grid
+from tec.shared.grid import TileGrid
+from tec.shared.mapgen import generate_map
+
+
+def _cases() -> list[tuple[str, TileGrid, int, int, int]]:
+    """Return (label, grid, x, y, radius) benchmark scenarios."""
+    dungeon = generate_map(100, 40, 1337)
+    field = TileGrid(100, 100, bytearray(b"\x01" * 10_000))
+    return [
+        ("dungeon 100x40 r=9", dungeon, 50, 20, 9),
+        ("dungeon 100x40 r=14", dungeon, 50, 20, 14),
+        ("open 100x100 r=20", field, 50, 50, 20),
+    ]
+
+
+def _time_us(grid: TileGrid, x: int, y: int, r: int, repeat: int) -> tuple[float, float]:
+    """Return mean µs per call for (shadowcast, shadowcast_grid)."""
+
+    def ref() -> None:
+        shadowcast(x, y, r, grid.is_opaque, Bitmap(grid.width, grid.height))
+
+    def fast() -> None:
+        shadowcast_grid(x, y, r, grid, Bitmap(grid.width, grid.height))
+
+    return (
+        timeit.timeit(ref, number=repeat) / repeat * 1e6,
+        timeit.timeit(fast, number=repeat) / repeat * 1e6,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=300, help="calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'case':<22}{'shadowcast':>14}{'grid kernel':>14}{'speedup':>10}")
+    for label, grid, x, y, r in _cases():
+        ref_us, fast_us = _time_us(grid, x, y, r, args.repeat)
+        print(f"{label:<22}{ref_us:>11.0f} µs{fast_us:>11.0f} µs{ref_us / fast_us:>9.1f}×")
+
+
+if __name__ == "__main__":
+    main()
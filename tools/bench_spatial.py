@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compare `SpatialHash` queries with a linear scan of positions.
+
+Usage:
+    PYTHONPATH=src python tools/bench_spatial.py [--repeat N]
+
+Scatters N entities over a 1024x1024 field and prints the mean time of a
+tile lookup, a radius-8 query and a viewport-sized rectangle query, for a
+scan over `(eid, Position)` pairs and for the hash (plus its rebuild time).
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from collections.abc import Callable
+
+from tec.shared.components import Position
+from tec.shared.spatial import SpatialHash
+
+SIZE = 1024
+COUNTS = (1_000, 10_000, 100_000)
+
+
+def _us(fn: Callable[[], object], repeat: int) -> float:
+    """Return mean µs per call of `fn`."""
+    return timeit.timeit(fn, number=repeat) / repeat * 1e6
+
+
+def _bench(count: int, repeat: int) -> list[tuple[str, float | None, float]]:
+    """Return (query, scan µs or None, hash µs) rows for `count` entities."""
+    rng = random.Random(count)
+    positions = {
+        eid: Position(rng.randrange(SIZE), rng.randrange(SIZE)) for eid in range(1, count + 1)
+    }
+    index = SpatialHash()
+    index.rebuild((eid, (p.x, p.y)) for eid, p in positions.items())
+    x, y, r = SIZE // 2, SIZE // 2, 8
+    x0, y0, x1, y1 = x - 36, y - 15, x + 37, y + 16  # default 73x31 viewport
+
+    def scan_at() -> list[int]:
+        return [e for e, p in positions.items() if p.x == x and p.y == y]
+
+    def scan_radius() -> list[int]:
+        return [e for e, p in positions.items() if (p.x - x) ** 2 + (p.y - y) ** 2 <= r * r]
+
+    def scan_rect() -> list[int]:
+        return [e for e, p in positions.items() if x0 <= p.x < x1 and y0 <= p.y < y1]
+
+    def rebuild() -> None:
+        SpatialHash().rebuild((eid, (p.x, p.y)) for eid, p in positions.items())
+
+    return [
+        ("tile", _us(scan_at, repeat), _us(lambda: index.at(x, y), repeat)),
+        ("radius 8", _us(scan_radius, repeat), _us(lambda: index.in_radius(x, y, r), repeat)),
+        ("rect 73x31", _us(scan_rect, repeat), _us(lambda: index.in_rect(x0, y0, x1, y1), repeat)),
+        ("rebuild", None, _us(rebuild, max(1, repeat // 10))),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'entities':>9}  {'query':<12}{'scan':>14}{'hash':>14}{'speedup':>10}")
+    for count in COUNTS:
+        for label, scan_us, hash_us in _bench(count, args.repeat):
+            if scan_us is None:
+                print(f"{count:>9}  {label:<12}{'-':>14}{hash_us:>11.1f} µs")
+                continue
+            ratio = scan_us / hash_us
+            print(f"{count:>9}  {label:<12}{scan_us:>11.1f} µs{hash_us:>11.1f} µs{ratio:>9.0f}×")
+
+
+if __name__ == "__main__":
+    main()
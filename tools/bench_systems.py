@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Compare per-tick energy/needs cost for dict and columnar component tables.
+
+Usage:
+    PYTHONPATH=src python tools/bench_systems.py [--entities N] [--repeat N]
+
+Builds N actors with `Actor` and `Needs` and prints the mean time of one
+`accrue_energy` pass, one `tick_needs_many` pass over everyone and one over
+a quarter of the entities (the usual "those who acted this tick" subset),
+for the default dict tables and for `World.use_columns` storage.
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+from tec.shared.components import Actor, Needs
+from tec.shared.systems.energy import accrue_energy
+from tec.shared.systems.needs import tick_needs_many
+from tec.shared.world import World
+
+
+def _us(fn: Callable[[], object], repeat: int) -> float:
+    """Return mean µs per call of `fn`."""
+    return timeit.timeit(fn, number=repeat) / repeat * 1e6
+
+
+def _bench(count: int, columnar: bool, repeat: int) -> list[tuple[str, float]]:
+    """Return (system, µs per tick) rows for `count` entities."""
+    world = World()
+    eids = world.create_many(count)
+    world.add_many(eids, [Actor(speed=0.5 + (i % 7) * 0.1) for i in range(count)])
+    world.add_many(eids, [Needs() for _ in range(count)])
+    if columnar:
+        world.use_columns(Actor, Needs)
+    actors, needs = world.get(Actor), world.get(Needs)
+    acted = eids[::4]
+    return [
+        ("accrue_energy", _us(lambda: accrue_energy(actors), repeat)),
+        ("needs (all)", _us(lambda: tick_needs_many(needs), repeat)),
+        ("needs (1/4)", _us(lambda: tick_needs_many(needs, acted), repeat)),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=10_000, help="actors to simulate")
+    parser.add_argument("--repeat", type=int, default=200, help="ticks per measurement")
+    args = parser.parse_args()
+
+    rows = zip(
+        _bench(args.entities, False, args.repeat),
+        _bench(args.entities, True, args.repeat),
+        strict=True,
+    )
+    print(f"{args.entities} entities, µs per tick")
+    print(f"{'system':<16}{'dict':>12}{'columnar':>12}")
+    for (label, dict_us), (_, col_us) in rows:
+        print(f"{label:<16}{dict_us:>12.0f}{col_us:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Measure simulation tick throughput by replaying a recorded session.
+
+Usage:
+    PYTHONPATH=src python tools/bench_ticks.py [--players N] [--ticks N]
+
+Records a session of N players sending random moves and waits into an
+input journal (saving the starting world first), then restores that
+world and replays the journal with no sockets and no sleeping. Prints
+ticks per second for the live run and the replay, and checks that the
+replayed world ends up identical to the recorded one.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from tec.server import persist
+from tec.server.journal import ActionJournal
+from tec.server.replay import replay
+from tec.server.sim import Simulation
+from tec.shared.components import Actor, Needs
+
+
+def _record(sim: Simulation, players: int, ticks: int) -> float:
+    """Play `ticks` random ticks for `players` players; return seconds spent ticking."""
+    rng = random.Random(players)
+    eids = [sim.spawn_player() for _ in range(players)]
+    steps = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+    spent = 0.0
+    for _ in range(ticks):
+        for eid in eids:
+            if rng.random() < 0.5:
+                sim.enqueue_move(eid, *rng.choice(steps))
+            elif rng.random() < 0.2:
+                sim.enqueue_wait(eid)
+        start = perf_counter()
+        sim.tick()
+        spent += perf_counter() - start
+        if sim.journal is not None:
+            sim.journal.flush(sim.ticks)
+    return spent
+
+
+def _fingerprint(sim: Simulation) -> list[object]:
+    w = sim.world
+    return [
+        sim.ticks,
+        sim.tiles,
+        {e: (sim.position(e), w.detached(Actor, e), w.detached(Needs, e)) for e in w.get(Actor)},
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=200, help="simulated players")
+    parser.add_argument("--ticks", type=int, default=500, help="ticks to record and replay")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        world, inputs = Path(tmp) / "world.bin", Path(tmp) / "inputs.journal"
+        live = Simulation()
+        persist.save(live, world)
+        journal = ActionJournal(inputs)
+        live.journal = journal
+        live_s = _record(live, args.players, args.ticks)
+        journal.close()
+
+        replayed = persist.load(world)
+        stats = replay(replayed, inputs)
+        size = inputs.stat().st_size
+
+    print(f"players {args.players}, ticks {args.ticks}, {journal.records} inputs, {size} B journal")
+    print(f"{'live':<8}{args.ticks / live_s:>12.0f} ticks/s  (tick time only)")
+    print(f"{'replay':<8}{stats.ticks_per_s:>12.0f} ticks/s  (including journal decode)")
+    same = _fingerprint(replayed) == _fingerprint(live)
+    print(f"final state {'matches' if same else 'DIFFERS'}")
+    if not same:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()